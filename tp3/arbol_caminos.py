@@ -0,0 +1,55 @@
+from array import array
+
+class ArbolCaminos:
+    """Árbol de caminos mínimos desde un conjunto de orígenes de un
+    GrafoCompacto, guardado por id en dos arreglos: la distancia de cada
+    vértice (-1 si no se alcanzó) y su padre (-1 si es un origen o no se
+    alcanzó). Ocupa entre 8 y 12 bytes por vértice del grafo, en lugar
+    de los dos diccionarios de (distancias, padres)."""
+
+    def __init__(self, grafo, distancias, padres):
+        """Constructor de la clase ArbolCaminos. Recibe el GrafoCompacto
+        y los arreglos de distancias y padres indexados por id."""
+        self.grafo = grafo
+        self.distancias = distancias
+        self.padres = padres
+
+    def distancia(self, v):
+        """Recibe la clave de un vértice y devuelve su distancia a los
+        orígenes, o None si no se alcanzó."""
+        distancia = self.distancias[self.grafo.indice(v)]
+        return distancia if distancia >= 0 else None
+
+    def camino(self, destinos):
+        """Recibe una lista de vértices destino y devuelve el camino
+        hasta el destino más cercano a los orígenes, o None si ninguno
+        fue alcanzado. Entre destinos a la misma distancia se queda con
+        el primero de la lista."""
+        distancias = self.distancias
+        mejor = -1
+        for v in destinos:
+            i = self.grafo.indice(v)
+            if distancias[i] >= 0 and (mejor == -1 or distancias[i] < distancias[mejor]):
+                mejor = i
+        if mejor == -1:
+            return None
+        camino = []
+        while mejor != -1:
+            camino.append(self.grafo.clave(mejor))
+            mejor = self.padres[mejor]
+        camino.reverse()
+        return camino
+
+    def __len__(self):
+        """Devuelve la cantidad de vértices del grafo sobre el que se
+        calculó el árbol."""
+        return len(self.padres)
+
+def arreglos_arbol(n, distancias, padres, alcanzados):
+    """Recibe la cantidad de vértices, las listas de distancias y padres
+    de una búsqueda por ids y los ids alcanzados, y devuelve el par de
+    arreglos (distancias, padres) de un ArbolCaminos."""
+    resultado = array("q", [-1]) * n
+    for v in alcanzados:
+        resultado[v] = distancias[v]
+    return resultado, array("i", padres)
@@ -0,0 +1,385 @@
+#!/usr/bin/python3
+import io
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import contextlib
+import biblioteca as b
+from grafo import Grafo
+from flycombi import cargar_red, procesar_comando, procesar_lote, Sesion, TIEMPO, PRECIO
+from landmarks import Landmarks, CANTIDAD_LANDMARKS
+from servidor import Servidor
+
+# Cantidad de consultas de camino mínimo por defecto
+CONSULTAS = 200
+# Cantidad de veces que la suite repite cada prueba; se guarda la mejor
+REPETICIONES = 3
+# Aumento relativo del tiempo a partir del cual se marca una regresión
+TOLERANCIA = 0.25
+# Aumento mínimo en segundos para marcar una regresión, para no
+# reportar el ruido de las pruebas muy rápidas
+MINIMO_REGRESION = 0.005
+# Cantidad máxima de aeropuertos para medir la centralidad exacta y la
+# aproximada; en redes más grandes esas pruebas se omiten
+MAXIMO_CENTRALIDAD = 2000
+MAXIMO_CENTRALIDAD_APROXIMADA = 20000
+# Cantidad máxima de aeropuertos para medir la construcción de la
+# jerarquía de contracciones, que en redes grandes tarda minutos
+MAXIMO_JERARQUIA = 20000
+# Largo del recorrido de vacaciones y segundos disponibles para buscarlo
+LARGO_VACACIONES = 6
+SEGUNDOS_VACACIONES = 2
+# Cantidad de ciudades del itinerario de la suite
+CIUDADES_ITINERARIO = 20
+# Cantidad de clientes simultáneos y de procesos trabajadores en la
+# prueba del servidor
+CLIENTES_SERVIDOR = 4
+TRABAJADORES_SERVIDOR = 2
+
+def medir(funcion, *argumentos):
+    """Ejecuta la función con los argumentos recibidos y devuelve un
+    par (resultado, segundos transcurridos)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return resultado, time.perf_counter() - inicio
+
+def imprimir(nombre, segundos, cantidad=1):
+    """Imprime el tiempo total de una prueba y, si corresponde, el
+    tiempo promedio por operación."""
+    linea = "{:<48}{:>12.3f} s".format(nombre, segundos)
+    if cantidad > 1:
+        linea += "{:>12.3f} ms/op".format(segundos * 1000 / cantidad)
+    print(linea)
+
+def comparar_landmarks(grafo, ciudades, consultas, cantidad_landmarks):
+    """Compara Dijkstra contra A* con landmarks sobre consultas entre
+    pares de ciudades al azar, para cada peso, verificando que ambos
+    encuentren la misma distancia. Devuelve False si alguna difiere."""
+    lista = list(ciudades)
+    pares = [(random.choice(lista), random.choice(lista)) for _ in range(consultas)]
+    correcto = True
+    for nombre, peso in (("rapido", TIEMPO), ("barato", PRECIO)):
+        landmarks, segundos = medir(Landmarks, grafo, peso, cantidad_landmarks)
+        imprimir("landmarks {} ({})".format(nombre, cantidad_landmarks), segundos)
+        resultados = {}
+        for motor, buscar in (("dijkstra", b.camino_minimo_multiple), ("alt", None)):
+            distancias = []
+            inicio = time.perf_counter()
+            for origen, destino in pares:
+                if buscar is None:
+                    camino, distancia = landmarks.camino_minimo(ciudades[origen], ciudades[destino])
+                else:
+                    camino, distancia = buscar(grafo, ciudades[origen], ciudades[destino], peso)
+                distancias.append(distancia)
+            imprimir("{} {}".format(motor, nombre), time.perf_counter() - inicio, consultas)
+            resultados[motor] = distancias
+        if resultados["dijkstra"] != resultados["alt"]:
+            print("ERROR: las distancias de alt {} no coinciden con dijkstra".format(nombre))
+            correcto = False
+    return correcto
+
+def comparar_colas(grafo, ciudades, consultas):
+    """Compara, para cada peso, el tiempo de Dijkstra usando siempre un
+    heap contra el de la cola que elige cola_prioridad, en consultas
+    punto a punto entre pares de ciudades al azar y en árboles completos
+    desde una ciudad. Devuelve False si la cola elegida es más lenta que
+    el heap en más de TOLERANCIA."""
+    lista = list(ciudades)
+    pares = [(random.choice(lista), random.choice(lista)) for _ in range(consultas)]
+    arboles = pares[:max(1, consultas // 20)]
+    pruebas = (
+        ("punto a punto", pares,
+         lambda origen, destino, peso: b.camino_minimo_multiple(
+             grafo, ciudades[origen], ciudades[destino], peso)),
+        ("arbol completo", arboles,
+         lambda origen, destino, peso: b.caminos_minimos_desde(grafo, ciudades[origen], peso)),
+    )
+    maximo = b.MAXIMO_PESO_BUCKETS
+    correcto = True
+    for nombre_peso, peso in (("rapido", TIEMPO), ("barato", PRECIO)):
+        for nombre, consultas_prueba, buscar in pruebas:
+            tiempos = {}
+            # Sin límite de peso para los buckets, cola_prioridad siempre
+            # elige el heap
+            for cola, limite in (("heap", -1), ("elegida", maximo)):
+                b.MAXIMO_PESO_BUCKETS = limite
+                inicio = time.perf_counter()
+                for origen, destino in consultas_prueba:
+                    buscar(origen, destino, peso)
+                tiempos[cola] = time.perf_counter() - inicio
+                imprimir("dijkstra {} {} {}".format(nombre, nombre_peso, cola),
+                         tiempos[cola], len(consultas_prueba))
+            b.MAXIMO_PESO_BUCKETS = maximo
+            if tiempos["elegida"] > tiempos["heap"] * (1 + TOLERANCIA):
+                print("ERROR: la cola elegida es más lenta que el heap en {} {}".format(
+                    nombre, nombre_peso))
+                correcto = False
+    return correcto
+
+def _peso_total(arbol, peso):
+    """Devuelve un par (suma de pesos, cantidad de aristas) de un
+    árbol no dirigido."""
+    total, aristas = 0, 0
+    for v in arbol:
+        for w, pesos in arbol.obtener_adyacentes(v).items():
+            if v < w:
+                total += pesos[peso]
+                aristas += 1
+    return total, aristas
+
+def comparar_arboles(grafo):
+    """Compara Kruskal contra Prim para el árbol de tendido mínimo por
+    precio. Si ambos cubren la misma cantidad de aristas (la red es
+    conexa) verifica que tengan el mismo peso. Devuelve False si no."""
+    resultados = {}
+    for algoritmo in (b.KRUSKAL, b.PRIM):
+        arbol, segundos = medir(b.optimizar_rutas, grafo, PRECIO, algoritmo)
+        imprimir("arbol minimo " + algoritmo, segundos)
+        resultados[algoritmo] = _peso_total(arbol, PRECIO)
+    (peso_kruskal, aristas_kruskal), (peso_prim, aristas_prim) = resultados[b.KRUSKAL], resultados[b.PRIM]
+    if aristas_kruskal == aristas_prim and peso_kruskal != peso_prim:
+        print("ERROR: los árboles de kruskal y prim tienen distinto peso")
+        return False
+    return True
+
+def mejor_tiempo(funcion, *argumentos):
+    """Ejecuta la función REPETICIONES veces y devuelve el menor tiempo
+    en segundos."""
+    return min(medir(funcion, *argumentos)[1] for _ in range(REPETICIONES))
+
+def viaje_acotado(grafo, origen):
+    """Busca un viaje de LARGO_VACACIONES lugares desde el origen, con
+    SEGUNDOS_VACACIONES segundos como máximo."""
+    try:
+        return b.obtener_viaje(grafo, origen, LARGO_VACACIONES, max_segundos=SEGUNDOS_VACACIONES)
+    except b.PresupuestoAgotado:
+        return None
+
+def pruebas_biblioteca(grafo, ciudades):
+    """Devuelve una lista de pares (nombre, función sin parámetros) con
+    una prueba de cada función de la biblioteca sobre la red."""
+    aeropuertos = list(grafo)
+    origen, destino = random.choice(aeropuertos), random.choice(aeropuertos)
+    ciudad_origen, ciudad_destino = random.sample(sorted(ciudades), 2)
+    centralidades = {v: 1 for v in aeropuertos}
+    recorrido, _ = b.escalas_minimas_bfs(grafo, origen, destino)
+    recorrido = recorrido or [origen]
+    dag = Grafo(dirigido=True)
+    for ciudad in random.sample(sorted(ciudades), min(len(ciudades), 1000)):
+        dag.agregar_vertice(ciudad, None)
+    vertices = list(dag)
+    for i in range(1, len(vertices)):
+        dag.agregar_arista(vertices[random.randrange(i)], vertices[i], None)
+    pruebas = [
+        ("obtener_camino_minimo", lambda: b.obtener_camino_minimo(grafo, TIEMPO, origen, destino)),
+        ("obtener_camino_minimo todos", lambda: b.obtener_camino_minimo(grafo, TIEMPO, origen)),
+        ("camino_minimo_multiple", lambda: b.camino_minimo_multiple(
+            grafo, ciudades[ciudad_origen], ciudades[ciudad_destino], PRECIO)),
+        ("camino_minimo_bidireccional", lambda: b.camino_minimo_bidireccional(
+            grafo, PRECIO, ciudades[ciudad_origen], ciudades[ciudad_destino])),
+        ("caminos_minimos_desde", lambda: b.caminos_minimos_desde(grafo, ciudades[ciudad_origen], TIEMPO)),
+        ("escalas_minimas_bfs", lambda: b.escalas_minimas_bfs(grafo, origen, destino)),
+        ("escalas_minimas_bfs todos", lambda: b.escalas_minimas_bfs(grafo, origen)),
+        ("obtener_pagerank", lambda: b.obtener_pagerank(grafo)),
+        ("obtener_pagerank_personalizado", lambda: b.obtener_pagerank_personalizado(
+            grafo, ciudades[ciudad_origen])),
+        ("obtener_frecuencias", lambda: b.obtener_frecuencias(grafo, dict(centralidades), 2)),
+        ("obtener_n_mayores", lambda: b.obtener_n_mayores(centralidades, 10)),
+        ("obtener_viaje", lambda: viaje_acotado(grafo, origen)),
+        ("optimizar_rutas kruskal", lambda: b.optimizar_rutas(grafo, PRECIO, b.KRUSKAL)),
+        ("optimizar_rutas prim", lambda: b.optimizar_rutas(grafo, PRECIO, b.PRIM)),
+        ("exportar_aerolinea", lambda: b.exportar_aerolinea(grafo, io.StringIO())),
+        ("exportar_archivo_kml", lambda: b.exportar_archivo_kml(grafo, recorrido, io.StringIO())),
+        ("orden_topologico", lambda: b.orden_topologico(dag)),
+    ]
+    if len(grafo) <= MAXIMO_CENTRALIDAD:
+        pruebas.append(("betweeness_centrality", lambda: b.betweeness_centrality(grafo)))
+    if len(grafo) <= MAXIMO_CENTRALIDAD_APROXIMADA:
+        pruebas.append(("obtener_centralidad_aproximada",
+                        lambda: b.obtener_centralidad_aproximada(grafo, semilla=0)))
+    return pruebas
+
+def pruebas_comandos(grafo, ciudades, directorio):
+    """Devuelve una lista de pares (nombre, linea) con una prueba de
+    cada comando de flycombi sobre la red. Los archivos que necesitan
+    o generan los comandos se ubican en el directorio recibido."""
+    nombres = sorted(ciudades)
+    origen, destino = random.sample(nombres, 2)
+    itinerario = os.path.join(directorio, "itinerario.csv")
+    visitar = random.sample(nombres, min(len(nombres), CIUDADES_ITINERARIO))
+    with open(itinerario, "w") as archivo:
+        archivo.write(",".join(visitar) + "\n")
+        for i in range(1, len(visitar)):
+            archivo.write("{},{}\n".format(visitar[i - 1], visitar[i]))
+    pruebas = [
+        ("camino_mas rapido", "camino_mas rapido,{},{}".format(origen, destino)),
+        ("camino_mas barato", "camino_mas barato,{},{}".format(origen, destino)),
+        ("camino_escalas", "camino_escalas {},{}".format(origen, destino)),
+        ("pagerank", "pagerank 10"),
+        ("pagerank_personalizado", "pagerank_personalizado 10,{}".format(origen)),
+        ("nueva_aerolinea", "nueva_aerolinea " + os.path.join(directorio, "aerolinea.csv")),
+        ("vacaciones", "vacaciones {},{},{}".format(origen, LARGO_VACACIONES, SEGUNDOS_VACACIONES)),
+        ("itinerario", "itinerario " + itinerario),
+        ("exportar_kml", "exportar_kml " + os.path.join(directorio, "recorrido.kml")),
+        ("crear_landmarks", "crear_landmarks rapido,{}".format(CANTIDAD_LANDMARKS)),
+    ]
+    if len(grafo) <= MAXIMO_CENTRALIDAD:
+        pruebas.append(("centralidad", "centralidad 10"))
+    if len(grafo) <= MAXIMO_CENTRALIDAD_APROXIMADA:
+        pruebas.append(("centralidad_aprox", "centralidad_aprox 10"))
+    if len(grafo) <= MAXIMO_JERARQUIA:
+        # cargar_jerarquia lee el archivo que guarda crear_jerarquia
+        jerarquia = os.path.join(directorio, "jerarquia.ch")
+        pruebas.append(("crear_jerarquia", "crear_jerarquia rapido," + jerarquia))
+        pruebas.append(("cargar_jerarquia", "cargar_jerarquia rapido," + jerarquia))
+    return pruebas
+
+def consultas_camino(ciudades, cantidad):
+    """Devuelve una lista de cantidad lineas de comandos de camino
+    mínimo (de los tres tipos) entre pares de ciudades al azar."""
+    nombres = sorted(ciudades)
+    comandos = ("camino_mas rapido,{},{}\n", "camino_mas barato,{},{}\n", "camino_escalas {},{}\n")
+    return [comandos[i % len(comandos)].format(*random.sample(nombres, 2)) for i in range(cantidad)]
+
+def _ejecutar_lineas(grafo, ciudades, lineas):
+    """Ejecuta las lineas de a una con una sesión nueva, como el
+    programa principal sin --lote, descartando lo que imprime."""
+    sesion = Sesion()
+    ultimo = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        for linea in lineas:
+            ultimo = procesar_comando(grafo, ciudades, linea, ultimo, sesion)
+
+def _ejecutar_lote(grafo, ciudades, lineas):
+    """Ejecuta las lineas con procesar_lote y una sesión nueva, como el
+    programa principal con --lote."""
+    return procesar_lote(grafo, ciudades, lineas, Sesion())
+
+async def _atender_clientes(servidor, ruta, lineas, clientes):
+    """Atiende con el servidor, en el socket Unix de la ruta recibida, a
+    la cantidad de clientes indicada, que envían todas las lineas a la
+    vez y esperan la respuesta completa."""
+    async def cliente():
+        lector, escritor = await asyncio.open_unix_connection(ruta)
+        escritor.write("".join(lineas).encode("utf-8"))
+        escritor.write_eof()
+        await lector.read()
+        escritor.close()
+    atencion = await asyncio.start_unix_server(servidor.atender, ruta)
+    async with atencion:
+        await asyncio.gather(*(cliente() for _ in range(clientes)))
+    os.remove(ruta)
+
+def _ronda_servidor(servidor, ruta, lineas):
+    """Atiende una ronda de CLIENTES_SERVIDOR clientes simultáneos."""
+    asyncio.run(_atender_clientes(servidor, ruta, lineas, CLIENTES_SERVIDOR))
+
+def medir_servidor(grafo, ciudades, lineas, directorio):
+    """Levanta un Servidor sobre la red y devuelve el menor tiempo en
+    segundos para responder las lineas a CLIENTES_SERVIDOR clientes
+    simultáneos. La primera ronda, en la que se inician los procesos
+    trabajadores, no se mide."""
+    servidor = Servidor(grafo, ciudades, TRABAJADORES_SERVIDOR)
+    ruta = os.path.join(directorio, "servidor.sock")
+    try:
+        _ronda_servidor(servidor, ruta, lineas)
+        return mejor_tiempo(_ronda_servidor, servidor, ruta, lineas)
+    finally:
+        servidor.cerrar()
+
+def _ejecutar_comando(grafo, ciudades, linea, ultimo):
+    """Ejecuta un comando con una sesión nueva, descartando lo que
+    imprime."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return procesar_comando(grafo, ciudades, linea, ultimo, Sesion())
+
+def ejecutar_suite(grafo, ciudades):
+    """Mide cada prueba de la biblioteca y cada comando sobre la red, e
+    imprime los tiempos. Devuelve un diccionario nombre: segundos."""
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, funcion in pruebas_biblioteca(grafo, ciudades):
+            resultados["biblioteca " + nombre] = mejor_tiempo(funcion)
+            imprimir("biblioteca " + nombre, resultados["biblioteca " + nombre])
+        # exportar_kml exporta el resultado del comando anterior
+        ultimo = _ejecutar_comando(grafo, ciudades, "camino_escalas {},{}".format(
+            *random.sample(sorted(ciudades), 2)), False)
+        for nombre, linea in pruebas_comandos(grafo, ciudades, directorio):
+            resultados["comando " + nombre] = mejor_tiempo(_ejecutar_comando, grafo, ciudades,
+                                                           linea, ultimo)
+            imprimir("comando " + nombre, resultados["comando " + nombre])
+        lineas = consultas_camino(ciudades, CONSULTAS)
+        for nombre, funcion in (("secuencial", _ejecutar_lineas), ("lote", _ejecutar_lote)):
+            resultados[nombre + " caminos"] = mejor_tiempo(funcion, grafo, ciudades, lineas)
+            imprimir(nombre + " caminos", resultados[nombre + " caminos"], len(lineas))
+        lineas_servidor = lineas + ["pagerank 10\n"]
+        resultados["servidor"] = medir_servidor(grafo, ciudades, lineas_servidor, directorio)
+        imprimir("servidor ({} clientes)".format(CLIENTES_SERVIDOR), resultados["servidor"],
+                 len(lineas_servidor) * CLIENTES_SERVIDOR)
+    return resultados
+
+def guardar_resultados(resultados, grafo, ruta):
+    """Guarda en la ruta recibida, en formato JSON, los resultados de la
+    suite junto con el tamaño de la red."""
+    aristas = sum(len(grafo.obtener_adyacentes(v)) for v in grafo)
+    datos = {"aeropuertos": len(grafo), "aristas": aristas, "resultados": resultados}
+    with open(ruta, "w") as archivo:
+        json.dump(datos, archivo, indent=4, sort_keys=True)
+
+def comparar_resultados(resultados, ruta_anteriores):
+    """Compara los resultados con los guardados en la ruta recibida e
+    imprime las pruebas que empeoraron más de TOLERANCIA (y más de
+    MINIMO_REGRESION segundos). Devuelve False si hubo alguna."""
+    with open(ruta_anteriores) as archivo:
+        anteriores = json.load(archivo)["resultados"]
+    correcto = True
+    for nombre, segundos in sorted(resultados.items()):
+        if nombre not in anteriores:
+            continue
+        antes = anteriores[nombre]
+        if segundos > antes * (1 + TOLERANCIA) and segundos - antes > MINIMO_REGRESION:
+            print("REGRESION: {} pasó de {:.3f} s a {:.3f} s (+{:.0f}%)".format(
+                nombre, antes, segundos, (segundos / antes - 1) * 100))
+            correcto = False
+    return correcto
+
+def suite(argumentos):
+    """Uso: benchmark.py --suite aeropuertos.csv vuelos.csv resultados.json [anteriores.json]"""
+    if len(argumentos) not in (3, 4):
+        print(suite.__doc__)
+        return
+    (grafo, ciudades), segundos = medir(cargar_red, argumentos[0], argumentos[1])
+    imprimir("carga de la red", segundos)
+    random.seed(0)
+    resultados = ejecutar_suite(grafo, ciudades)
+    resultados["carga de la red"] = segundos
+    guardar_resultados(resultados, grafo, argumentos[2])
+    if len(argumentos) == 4 and not comparar_resultados(resultados, argumentos[3]):
+        sys.exit(1)
+
+def main():
+    """Uso: benchmark.py aeropuertos.csv vuelos.csv [consultas] [landmarks]
+       benchmark.py --suite aeropuertos.csv vuelos.csv resultados.json [anteriores.json]"""
+    if len(sys.argv) > 1 and sys.argv[1] == "--suite":
+        suite(sys.argv[2:])
+        return
+    if len(sys.argv) < 3:
+        print(main.__doc__)
+        return
+    consultas = int(sys.argv[3]) if len(sys.argv) > 3 else CONSULTAS
+    cantidad_landmarks = int(sys.argv[4]) if len(sys.argv) > 4 else CANTIDAD_LANDMARKS
+    (grafo, ciudades), segundos = medir(cargar_red, sys.argv[1], sys.argv[2])
+    imprimir("carga de la red", segundos)
+    random.seed(0)
+    correcto = comparar_landmarks(grafo, ciudades, consultas, cantidad_landmarks)
+    correcto = comparar_colas(grafo, ciudades, consultas) and correcto
+    correcto = comparar_arboles(grafo) and correcto
+    if not correcto:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from array import array
+import perfil
+
+# Parámetros de la heurística de cambio de dirección (Beamer et al.): se
+# pasa a expandir de abajo hacia arriba cuando las aristas de la
+# frontera superan a 1 / ALFA de las de los vértices sin descubrir, y se
+# vuelve a expandir de arriba hacia abajo cuando la frontera tiene menos
+# de 1 / BETA de los vértices
+ALFA = 14
+BETA = 24
+
+def bfs_direccional(n, inicio, destinos, inicio_t, destinos_t, origenes, objetivos=None):
+    """Recibe los arreglos CSR de un grafo de n vértices (los de sus
+    aristas salientes y los de las entrantes), una lista de ids de
+    vértices origen y opcionalmente un conjunto de ids objetivo. Aplica
+    un bfs por niveles desde todos los orígenes a la vez: cada nivel se
+    expande de arriba hacia abajo (recorriendo las aristas de la
+    frontera) o de abajo hacia arriba (buscando, para cada vértice sin
+    descubrir, alguna arista entrante desde la frontera, y cortando en
+    la primera), según cuál revise menos aristas. Si hay objetivos, se
+    detiene al terminar el nivel en el que descubre el primero.
+    Devuelve una tupla (distancias, padres, orden, encontrado): los
+    arreglos de escalas y padre de cada id (-1 si no se alcanzó, o si es
+    un origen en el caso de padres), la lista de ids alcanzados en orden
+    de nivel y el primer objetivo alcanzado, o -1."""
+    distancias = array("i", [-1]) * n
+    padres = array("i", [-1]) * n
+    frontera = []
+    for s in origenes:
+        if distancias[s] < 0:
+            distancias[s] = 0
+            frontera.append(s)
+    orden = list(frontera)
+    encontrado = _primer_objetivo(frontera, objetivos)
+    # Aristas entrantes de los vértices sin descubrir: las que revisaría,
+    # a lo sumo, una expansión de abajo hacia arriba
+    aristas_pendientes = len(destinos_t) - sum(inicio_t[v + 1] - inicio_t[v] for v in frontera)
+    pendientes = None
+    ascendente = False
+    nivel = niveles_ascendentes = frontera_maxima = 0
+    while frontera and encontrado == -1:
+        frontera_maxima = max(frontera_maxima, len(frontera))
+        if not ascendente:
+            aristas_frontera = sum(inicio[v + 1] - inicio[v] for v in frontera)
+            ascendente = aristas_frontera * ALFA > aristas_pendientes
+        else:
+            ascendente = len(frontera) * BETA >= n
+        siguiente = []
+        if ascendente:
+            niveles_ascendentes += 1
+            if pendientes is None:
+                pendientes = [v for v in range(n) if distancias[v] < 0]
+            restantes = []
+            for v in pendientes:
+                if distancias[v] >= 0:
+                    continue
+                for k in range(inicio_t[v], inicio_t[v + 1]):
+                    u = destinos_t[k]
+                    if distancias[u] == nivel:
+                        distancias[v] = nivel + 1
+                        padres[v] = u
+                        siguiente.append(v)
+                        break
+                else:
+                    restantes.append(v)
+            pendientes = restantes
+        else:
+            for v in frontera:
+                for k in range(inicio[v], inicio[v + 1]):
+                    w = destinos[k]
+                    if distancias[w] < 0:
+                        distancias[w] = nivel + 1
+                        padres[w] = v
+                        siguiente.append(w)
+        aristas_pendientes -= sum(inicio_t[v + 1] - inicio_t[v] for v in siguiente)
+        orden += siguiente
+        encontrado = _primer_objetivo(siguiente, objetivos)
+        frontera = siguiente
+        nivel += 1
+    if perfil.activo:
+        perfil.contar(bfs_descubiertos=len(orden), bfs_niveles=nivel,
+                      bfs_niveles_ascendentes=niveles_ascendentes)
+        perfil.maximo(bfs_frontera_maxima=frontera_maxima)
+    return distancias, padres, orden, encontrado
+
+def _primer_objetivo(vertices, objetivos):
+    """Devuelve el primero de los vértices que es un objetivo, o -1."""
+    if objetivos:
+        for v in vertices:
+            if v in objetivos:
+                return v
+    return -1
+
+def bfs_compacto(compacto, origenes, objetivos=None, invertido=False):
+    """Recibe un GrafoCompacto, una lista de ids de vértices origen,
+    opcionalmente un conjunto de ids objetivo y si se deben recorrer las
+    aristas invertidas, y aplica bfs_direccional sobre sus arreglos."""
+    salientes = compacto.inicio, compacto.destinos
+    entrantes = compacto.entrantes()
+    if invertido:
+        salientes, entrantes = entrantes, salientes
+    return bfs_direccional(len(compacto), *salientes, *entrantes, origenes, objetivos)
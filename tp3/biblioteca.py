@@ -1,11 +1,27 @@
-import random
+import perfil
 from grafo import Grafo
-from heap import Heap
+from heap import Heap, HeapIndexado, ColaBuckets
 from cola import Cola
+from grafo_compacto import compactar, GrafoCompacto
+from conjuntos_disjuntos import ConjuntosDisjuntos
+from pagerank import calcular_pagerank
+from bfs import bfs_compacto
+from arbol_caminos import ArbolCaminos, arreglos_arbol
+from viajes import buscar_viaje, PresupuestoAgotado
+from kml import escribir_kml, segmentos_recorrido
+from centralidad import betweeness_brandes, betweeness_aproximada, ERROR, CONFIANZA
 
 INFINITO = float("inf")
 D = 0.85 # Coeficiente de amortiguación para Pagerank
 E = 0.0001 # Diferencia de convergencia para Pagerank
+MAX_ITERACIONES = 100 # Cantidad máxima de iteraciones para Pagerank
+# Algoritmos para el árbol de tendido mínimo
+KRUSKAL = "kruskal"
+PRIM = "prim"
+# Peso máximo de una arista para que Dijkstra use una ColaBuckets en
+# lugar de un heap en las búsquedas completas: cada búsqueda crea peso
+# máximo + 1 buckets
+MAXIMO_PESO_BUCKETS = 4096
 
 def reconstruir_camino(destino, padres):
     """Devuelve una lista ordenada con el camino desde origen
@@ -18,200 +34,491 @@ def reconstruir_camino(destino, padres):
     camino.reverse()
     return camino
 
-def obtener_camino_minimo(grafo, peso, origen, destino=None):
+def obtener_camino_minimo(grafo, peso, origen, destino=None, landmarks=None):
     """Recibe un grafo, la clave del vértice origen y la del destino,
     el tipo de peso a tener en cuenta, y devuelve un camino mínimo
-    aplicando el algoritmo de Dijkstra. Si no se recibe un destino,
-    devuelve los caminos mínimos desde origen hasta todos los demás
-    vértices del grafo."""
+    aplicando el algoritmo de Dijkstra, junto con su distancia (o
+    (None, INFINITO) si no hay camino). Si el grafo no es dirigido la
+    búsqueda es bidireccional. Si además se reciben Landmarks
+    construidos para ese peso, se aplica A* guiado por ellos (si fueron
+    construidos para otro, se levanta ValueError).
+    Si no se recibe un destino, devuelve los caminos mínimos desde
+    origen hasta todos los demás vértices del grafo, de la forma
+    (distancias, padres)."""
+    if destino is None:
+        distancias, padres, _ = _dijkstra(grafo, peso, [origen])
+        for v in grafo:
+            if v not in distancias:
+                distancias[v] = INFINITO
+        return distancias, padres
+    if landmarks is not None:
+        if landmarks.peso != peso:
+            raise ValueError("Los landmarks no fueron construidos para ese peso")
+        return landmarks.camino_minimo([origen], [destino])
+    return camino_minimo_multiple(grafo, [origen], [destino], peso)
+
+def _perfil_dijkstra(colas, origenes):
+    """Suma al perfil los contadores de una búsqueda de Dijkstra: las
+    operaciones de sus heaps, los vértices asentados (cada uno se
+    desencola una única vez) y las aristas relajadas (cada relajación
+    exitosa encola o actualiza, además de los orígenes)."""
+    encolados = sum(q.encolados for q in colas)
+    actualizados = sum(q.actualizados for q in colas)
+    desencolados = sum(q.desencolados for q in colas)
+    perfil.contar(heap_encolados=encolados,
+                  heap_actualizados=actualizados,
+                  heap_desencolados=desencolados,
+                  vertices_asentados=desencolados,
+                  aristas_relajadas=encolados + actualizados - origenes)
+
+def _perfil_bfs(orden):
+    """Suma al perfil los contadores de un bfs a partir del diccionario
+    vertice: nivel de los vértices descubiertos."""
+    tamanios = {}
+    for nivel in orden.values():
+        tamanios[nivel] = tamanios.get(nivel, 0) + 1
+    perfil.contar(bfs_descubiertos=len(orden), bfs_niveles=len(tamanios))
+    perfil.maximo(bfs_frontera_maxima=max(tamanios.values(), default=0))
+
+def _dijkstra(grafo, peso, origenes, destinos=()):
+    """Aplica el algoritmo de Dijkstra partiendo de todos los orígenes
+    a la vez (con distancia 0), deteniéndose al visitar el primer
+    vértice de destinos. Devuelve los diccionarios (distancias, padres)
+    de los vértices alcanzados y el destino visitado, o None."""
+    if isinstance(grafo, GrafoCompacto):
+        return _dijkstra_compacto(grafo, peso, origenes, destinos)
     distancias, padres = {}, {}
-    for v in grafo:
-        distancias[v] = INFINITO
-    distancias[origen] = 0
-    padres[origen] = None
-    q = Heap()
-    q.encolar(origen, distancias[origen])
+    q = HeapIndexado()
+    for origen in origenes:
+        distancias[origen] = 0
+        padres[origen] = None
+        q.encolar_o_actualizar(origen, 0)
     while not q.esta_vacio():
         v = q.desencolar()
-        if v == destino:
-            return (reconstruir_camino(destino, padres), distancias[v])
-        for w in grafo.obtener_adyacentes(v):
-            if distancias[v] + grafo.obtener_peso_union(v, w)[peso] < distancias[w]:
-                distancias[w] = distancias[v] + grafo.obtener_peso_union(v, w)[peso]
+        if v in destinos:
+            if perfil.activo:
+                _perfil_dijkstra((q,), len(origenes))
+            return distancias, padres, v
+        # Los vértices ya asentados nunca mejoran su distancia, así que
+        # cada vértice entra al heap una única vez y después sólo se
+        # actualiza su prioridad
+        for w, pesos in grafo.obtener_adyacentes(v).items():
+            distancia = distancias[v] + pesos[peso]
+            if distancia < distancias.get(w, INFINITO):
+                distancias[w] = distancia
                 padres[w] = v
-                q.encolar(w, distancias[w])
+                q.encolar_o_actualizar(w, distancia)
+    if perfil.activo:
+        _perfil_dijkstra((q,), len(origenes))
+    return distancias, padres, None
+
+def cola_prioridad(grafo, peso, completa=False):
+    """Recibe un GrafoCompacto, el índice del peso y si la búsqueda
+    recorre todos los vértices alcanzables, y devuelve una cola de
+    prioridad vacía para Dijkstra sobre sus ids: una ColaBuckets si la
+    búsqueda es completa y todos los pesos de la columna son enteros
+    entre 0 y MAXIMO_PESO_BUCKETS, o un HeapIndexado si no. Las búsquedas
+    que terminan al alcanzar un destino tienen fronteras chicas, y crear
+    y recorrer los buckets vacíos les cuesta más que el heap."""
+    minimo, maximo = grafo.extremos_pesos(peso)
+    if completa and minimo >= 0 and maximo <= MAXIMO_PESO_BUCKETS:
+        return ColaBuckets(maximo, len(grafo))
+    return HeapIndexado(capacidad=len(grafo))
+
+def _dijkstra_compacto(grafo, peso, origenes, destinos):
+    """Igual que _dijkstra, pero recorre los arreglos CSR de un
+    GrafoCompacto por ids enteros (ver _dijkstra_ids). Los diccionarios
+    se arman al final, sólo con los vértices alcanzados."""
+    objetivos = {grafo.indice(v) for v in destinos}
+    distancias, padres, alcanzados, encontrado = _dijkstra_ids(
+        grafo, peso, [grafo.indice(v) for v in origenes], objetivos)
+    claves = grafo.claves
+    return ({claves[v]: distancias[v] for v in alcanzados},
+            {claves[v]: claves[padres[v]] if padres[v] != -1 else None for v in alcanzados},
+            claves[encontrado] if encontrado != -1 else None)
+
+def _dijkstra_ids(grafo, peso, origenes, objetivos=()):
+    """Aplica Dijkstra sobre los arreglos CSR de un GrafoCompacto desde
+    una lista de ids origen, deteniéndose al visitar el primer id de
+    objetivos, con listas de distancias y padres y una cola con mapa de
+    posiciones denso (ver cola_prioridad). Devuelve una tupla
+    (distancias, padres, alcanzados, encontrado): las listas de
+    distancia (INFINITO si no se alcanzó) y padre (-1 si no tiene) de
+    cada id, la lista de ids alcanzados y el objetivo visitado, o -1."""
+    n = len(grafo)
+    inicio, adyacentes, pesos = grafo.inicio, grafo.destinos, grafo.pesos[peso]
+    distancias, padres = [INFINITO] * n, [-1] * n
+    alcanzados = []
+    q = cola_prioridad(grafo, peso, not objetivos)
+    for i in origenes:
+        if distancias[i] == INFINITO:
+            alcanzados.append(i)
+        distancias[i] = 0
+        q.encolar_o_actualizar(i, 0)
+    encontrado = -1
+    while not q.esta_vacio():
+        v = q.desencolar()
+        if v in objetivos:
+            encontrado = v
+            break
+        distancia_v = distancias[v]
+        for k in range(inicio[v], inicio[v + 1]):
+            w = adyacentes[k]
+            distancia = distancia_v + pesos[k]
+            if distancia < distancias[w]:
+                if distancias[w] == INFINITO:
+                    alcanzados.append(w)
+                distancias[w] = distancia
+                padres[w] = v
+                q.encolar_o_actualizar(w, distancia)
+    if perfil.activo:
+        _perfil_dijkstra((q,), len(origenes))
+    return distancias, padres, alcanzados, encontrado
+
+def _bfs_multiple(grafo, origenes, destinos):
+    """Aplica bfs partiendo de todos los orígenes a la vez, deteniéndose
+    al descubrir el primer vértice de destinos. Devuelve los
+    diccionarios (orden, padres) de los vértices alcanzados y el
+    destino descubierto, o None."""
+    if isinstance(grafo, GrafoCompacto):
+        return _bfs_compacto(grafo, origenes, destinos)
+    orden, padres = {}, {}
+    q = Cola()
+    for origen in origenes:
+        orden[origen] = 0
+        padres[origen] = None
+        if origen in destinos:
+            return orden, padres, origen
+        q.encolar(origen)
+    while not q.esta_vacia():
+        v = q.desencolar()
+        for w in grafo.obtener_adyacentes(v):
+            if w in orden:
+                continue
+            orden[w] = orden[v] + 1
+            padres[w] = v
+            if w in destinos:
+                if perfil.activo:
+                    _perfil_bfs(orden)
+                return orden, padres, w
+            q.encolar(w)
+    if perfil.activo:
+        _perfil_bfs(orden)
+    return orden, padres, None
+
+def _bfs_compacto(grafo, origenes, destinos):
+    """Igual que _bfs_multiple, pero sobre los arreglos de un
+    GrafoCompacto con bfs_direccional. Los diccionarios se arman al
+    final, sólo con los vértices alcanzados."""
+    objetivos = {grafo.indice(v) for v in destinos}
+    distancias, padres, alcanzados, encontrado = bfs_compacto(
+        grafo, [grafo.indice(v) for v in origenes], objetivos)
+    claves = grafo.claves
+    return ({claves[v]: distancias[v] for v in alcanzados},
+            {claves[v]: claves[padres[v]] if padres[v] != -1 else None for v in alcanzados},
+            claves[encontrado] if encontrado != -1 else None)
+
+def caminos_minimos_desde(grafo, origenes, peso=None):
+    """Recibe un grafo, una lista de vértices origen y opcionalmente el
+    tipo de peso a tener en cuenta. Devuelve el árbol de caminos mínimos
+    (Dijkstra si se recibe un peso, bfs si no) desde el conjunto de
+    orígenes hasta todos los vértices alcanzables, de la forma
+    (distancias, padres)."""
+    if peso is None:
+        distancias, padres, _ = _bfs_multiple(grafo, origenes, ())
+    else:
+        distancias, padres, _ = _dijkstra(grafo, peso, origenes)
     return distancias, padres
 
+def arbol_caminos_minimos(grafo, origenes, peso=None):
+    """Recibe un grafo, una lista de vértices origen y opcionalmente el
+    tipo de peso a tener en cuenta. Devuelve el árbol de caminos mínimos
+    (Dijkstra si se recibe un peso, bfs si no) desde el conjunto de
+    orígenes como un ArbolCaminos, guardado en arreglos por id."""
+    compacto = compactar(grafo)
+    ids = [compacto.indice(v) for v in origenes]
+    if peso is None:
+        distancias, padres, _, _ = bfs_compacto(compacto, ids)
+        return ArbolCaminos(compacto, distancias, padres)
+    distancias, padres, alcanzados, _ = _dijkstra_ids(compacto, peso, ids)
+    return ArbolCaminos(compacto, *arreglos_arbol(len(compacto), distancias, padres, alcanzados))
+
+def camino_minimo_multiple(grafo, origenes, destinos, peso=None):
+    """Recibe un grafo, una lista de vértices origen, una de vértices
+    destino y opcionalmente el tipo de peso a tener en cuenta. Realiza
+    una única búsqueda (Dijkstra si se recibe un peso, bfs si no) que
+    parte de todos los orígenes a la vez y termina en el primer destino
+    alcanzado, y devuelve un par (camino, distancia) con el mejor camino
+    entre algún origen y algún destino, o (None, INFINITO) si no hay.
+    Si el grafo no es dirigido, la búsqueda es bidireccional: parte a
+    la vez de los orígenes y de los destinos."""
+    if not grafo.es_dirigido:
+        if peso is None:
+            return escalas_minimas_bidireccional(grafo, origenes, destinos)
+        return camino_minimo_bidireccional(grafo, peso, origenes, destinos)
+    destinos = set(destinos)
+    if peso is None:
+        distancias, padres, encontrado = _bfs_multiple(grafo, origenes, destinos)
+    else:
+        distancias, padres, encontrado = _dijkstra(grafo, peso, origenes, destinos)
+    if encontrado is None:
+        return None, INFINITO
+    return reconstruir_camino(encontrado, padres), distancias[encontrado]
+
+def _recorrido(grafo, peso=None):
+    """Recibe un grafo y opcionalmente el índice de un peso, y devuelve
+    las funciones (indice, vecinos, clave, nueva_cola) con las que las
+    búsquedas bidireccionales lo recorren. En un GrafoCompacto trabajan
+    sobre los ids enteros y los arreglos CSR; en un Grafo, sobre las
+    claves. vecinos(v) devuelve los vecinos de v o, si se recibe el
+    peso, pares (vecino, peso)."""
+    if isinstance(grafo, GrafoCompacto):
+        if peso is None:
+            vecinos = grafo.vecinos
+        else:
+            vecinos = lambda v: zip(*grafo.vecinos(v, peso))
+        return grafo.indice, vecinos, grafo.clave, lambda: cola_prioridad(grafo, peso)
+    if peso is None:
+        vecinos = grafo.obtener_adyacentes
+    else:
+        vecinos = lambda v: ((w, pesos[peso]) for w, pesos in grafo.obtener_adyacentes(v).items())
+    identidad = lambda v: v
+    return identidad, vecinos, identidad, HeapIndexado
+
+def _unir_caminos(encuentro, padres_ida, padres_vuelta):
+    """Recibe el vértice donde se encontraron las dos búsquedas y sus
+    diccionarios de padres, y devuelve el camino completo desde el
+    origen de la ida hasta el de la vuelta."""
+    camino = reconstruir_camino(encuentro, padres_ida)
+    v = padres_vuelta[encuentro]
+    while v is not None:
+        camino.append(v)
+        v = padres_vuelta[v]
+    return camino
+
+def camino_minimo_bidireccional(grafo, peso, origenes, destinos):
+    """Recibe un grafo no dirigido, el tipo de peso a tener en cuenta y
+    una lista de vértices origen y otra de vértices destino. Aplica
+    Dijkstra desde ambos conjuntos a la vez hasta que las búsquedas se
+    encuentran, y devuelve un par (camino, distancia) con el mejor
+    camino entre algún origen y algún destino, o (None, INFINITO) si no
+    hay camino."""
+    indice, vecinos, clave, nueva_cola = _recorrido(grafo, peso)
+    extremos = ([indice(v) for v in origenes], [indice(v) for v in destinos])
+    comunes = set(extremos[0]).intersection(extremos[1])
+    for v in extremos[0]:
+        if v in comunes:
+            return [clave(v)], 0
+    distancias = ({v: 0 for v in extremos[0]}, {v: 0 for v in extremos[1]})
+    padres = ({v: None for v in extremos[0]}, {v: None for v in extremos[1]})
+    colas = (nueva_cola(), nueva_cola())
+    for lado in (0, 1):
+        for v in distancias[lado]:
+            colas[lado].encolar(v, 0)
+    mejor, encuentro = INFINITO, None
+    while not colas[0].esta_vacio() and not colas[1].esta_vacio():
+        minimo_ida, minimo_vuelta = colas[0].prioridad_minima(), colas[1].prioridad_minima()
+        if minimo_ida + minimo_vuelta >= mejor:
+            # Ningún camino que pase por vértices aún no visitados
+            # puede mejorar al encontrado
+            break
+        lado = 0 if minimo_ida <= minimo_vuelta else 1
+        v = colas[lado].desencolar()
+        propias, ajenas = distancias[lado], distancias[1 - lado]
+        distancia_v = propias[v]
+        for w, peso_arista in vecinos(v):
+            distancia = distancia_v + peso_arista
+            if distancia < propias.get(w, INFINITO):
+                propias[w] = distancia
+                padres[lado][w] = v
+                colas[lado].encolar_o_actualizar(w, distancia)
+            if w in ajenas and propias[w] + ajenas[w] < mejor:
+                mejor, encuentro = propias[w] + ajenas[w], w
+    if perfil.activo:
+        _perfil_dijkstra(colas, len(distancias[0]) + len(distancias[1]))
+    if encuentro is None:
+        return None, INFINITO
+    return [clave(v) for v in _unir_caminos(encuentro, padres[0], padres[1])], mejor
+
 def escalas_minimas_bfs(grafo, origen, destino=None):
     """Recibe un grafo, la clave del vertice origen y la del destino,
     y devuelve un camino con la minima cantidad de escalas aplicando
-    el algoritmo bfs. Si no se recibe un destino, devuelve los caminos
+    el algoritmo bfs, junto con la cantidad de escalas (o (None,
+    INFINITO) si no hay camino). Si el grafo no es dirigido la búsqueda
+    es bidireccional. Si no se recibe un destino, devuelve los caminos
     con menor cantidad de escalas desde origen hasta todos los demás
-    vértices del grafo."""
-    visitados = []
-    padres, orden = {}, {}
-    q = Cola()
-    visitados.append(origen)
-    padres[origen] = None
-    orden[origen] = 0
-    q.encolar(origen)
-    while not q.esta_vacia():
-        v = q.desencolar()
-        for w in grafo.obtener_adyacentes(v):
-            if w not in visitados:
-                visitados.append(w)
-                padres[w] = v
-                orden[w] = orden[v] + 1
-                q.encolar(w)
-            if w == destino:
-                return reconstruir_camino(destino, padres), orden[w]
-    return orden, padres
+    vértices del grafo, de la forma (orden, padres)."""
+    if destino is None:
+        orden, padres, _ = _bfs_multiple(grafo, [origen], ())
+        return orden, padres
+    return camino_minimo_multiple(grafo, [origen], [destino])
+
+def escalas_minimas_bidireccional(grafo, origenes, destinos):
+    """Recibe un grafo no dirigido y una lista de vértices origen y otra
+    de vértices destino. Aplica bfs desde ambos conjuntos, expandiendo
+    en cada paso el nivel completo de la frontera más chica, y devuelve
+    un par (camino, escalas) con el mejor camino entre algún origen y
+    algún destino, o (None, INFINITO) si no hay camino."""
+    indice, vecinos, clave, _ = _recorrido(grafo)
+    fronteras = [[indice(v) for v in origenes], [indice(v) for v in destinos]]
+    comunes = set(fronteras[0]).intersection(fronteras[1])
+    for v in fronteras[0]:
+        if v in comunes:
+            return [clave(v)], 0
+    padres = ({v: None for v in fronteras[0]}, {v: None for v in fronteras[1]})
+    orden = ({v: 0 for v in fronteras[0]}, {v: 0 for v in fronteras[1]})
+    while fronteras[0] and fronteras[1]:
+        lado = 0 if len(fronteras[0]) <= len(fronteras[1]) else 1
+        if perfil.activo:
+            perfil.contar(bfs_niveles=1)
+            perfil.maximo(bfs_frontera_maxima=len(fronteras[lado]))
+        propios, ajenos = orden[lado], orden[1 - lado]
+        siguiente = []
+        mejor, encuentro = INFINITO, None
+        for v in fronteras[lado]:
+            for w in vecinos(v):
+                if w in ajenos and propios[v] + 1 + ajenos[w] < mejor:
+                    mejor, encuentro = propios[v] + 1 + ajenos[w], (v, w)
+                if w in propios:
+                    continue
+                propios[w] = propios[v] + 1
+                padres[lado][w] = v
+                siguiente.append(w)
+        if encuentro is not None:
+            # Se completa el nivel antes de cortar para quedarse con
+            # el mejor punto de encuentro
+            ida, vuelta = encuentro if lado == 0 else reversed(encuentro)
+            camino = reconstruir_camino(ida, padres[0])
+            while vuelta is not None:
+                camino.append(vuelta)
+                vuelta = padres[1][vuelta]
+            return [clave(v) for v in camino], mejor
+        fronteras[lado] = siguiente
+    return None, INFINITO
 
-def betweeness_centrality(grafo):
+def betweeness_centrality(grafo, peso=None, procesos=None):
     """Recibe un grafo y devuelve un diccionario cent de la forma
-    vertice:centralidad que sirve para encontrar el mas central"""
-    cent = {}
-    for v in grafo: cent[v] = 0
-    for v in grafo:
-        distancias, padres = escalas_minimas_bfs(grafo, v)
-        cent_aux = {}
-        for w in grafo: cent_aux[w] = 0
-        vertices_ordenados = sorted(distancias, key=lambda i: distancias[i], reverse=True)
-        for w in vertices_ordenados:
-            if w == v: continue
-            cent_aux[padres[w]] += 1 + cent_aux[w]
-        for w in grafo:
-            if w == v: continue
-            cent[w] += cent_aux[w]
-    return cent
-
-def obtener_centralidad_aproximada(grafo):
-    """Recibe un grafo y realiza random walks sobre él, y devuelve
-    la centralidad aproximada de cada vértice."""
-    centralidades = {}
-    for v in grafo:
-        centralidades[v] = 0
-    for v in grafo:
-        w = random.choice([w for w in grafo.obtener_adyacentes(v)])
-        centralidades[w] += 1
-    return centralidades
+    vertice:centralidad que sirve para encontrar el mas central.
+    Opcionalmente recibe el índice del peso a considerar (si no, se
+    cuentan escalas) y la cantidad de procesos entre los que se reparten
+    los vértices fuente. Aplica el algoritmo de Brandes, teniendo en
+    cuenta todos los caminos mínimos entre cada par de vértices."""
+    return betweeness_brandes(grafo, peso, procesos)
+
+def obtener_centralidad_aproximada(grafo, error=ERROR, confianza=CONFIANZA, semilla=None,
+                                   procesos=None):
+    """Recibe un grafo y devuelve la centralidad aproximada de cada
+    vértice, estimada a partir de una muestra de caminos mínimos entre
+    pares de vértices al azar. Opcionalmente recibe el error máximo
+    admitido sobre la centralidad normalizada, la probabilidad de no
+    superarlo, una semilla para la muestra y la cantidad de procesos a
+    utilizar si el grafo es tan chico que conviene el cálculo exacto."""
+    return betweeness_aproximada(grafo, error, confianza, procesos=procesos, semilla=semilla)
 
 def obtener_pagerank(grafo):
     """Recibe un grafo, aplica el algoritmo de Pagerank y devuelve
-    un diccionario con la forma vertice: centralidad_pagerank."""
-    pagerank = {}
-    for v in grafo:
-        pagerank[v] = (1 - D) / len(grafo)
-    converge = False
-    while not converge:
-        pagerank_actual = {}
-        converge = True
-        for v in grafo:
-            pagerank_actual[v] = 0
-            for w in grafo.obtener_adyacentes(v):
-                pagerank_actual[v] += D * pagerank[w]/len(grafo.obtener_adyacentes(w))
-            if abs(pagerank_actual[v] - pagerank[v]) > E:
-                converge = False
-        pagerank = pagerank_actual
-    return pagerank
+    un diccionario con la forma vertice: centralidad_pagerank.
+    La masa de los vértices sin adyacentes se reparte entre todos, y
+    la iteración termina cuando la diferencia (en norma L1) entre dos
+    pasos es menor a E, o tras MAX_ITERACIONES pasos."""
+    return calcular_pagerank(grafo, D, E, MAX_ITERACIONES)
+
+def obtener_pagerank_personalizado(grafo, teleporte, inicial=None):
+    """Recibe un grafo y un conjunto de vértices (o un diccionario
+    vertice: peso) hacia los que se teletransporta el recorrido
+    aleatorio, y devuelve un diccionario vertice: pagerank sesgado hacia
+    ellos. Opcionalmente recibe un resultado anterior de Pagerank desde
+    el cual comenzar a iterar."""
+    return calcular_pagerank(grafo, D, E, MAX_ITERACIONES, teleporte, inicial)
 
 def obtener_frecuencias(grafo, centralidades, peso):
     """Recibe un grafo, un diccionario de centralidades y el índice
     del peso que contiene la cantidad de vuelos entre un aeropuerto y otro,
     y multiplica la centralidad de cada vértice por su frecuencia."""
-    frecuencias = {}
+    if isinstance(grafo, GrafoCompacto):
+        frecuencias = grafo.sumas_pesos(peso)
+        for v in centralidades:
+            centralidades[v] *= frecuencias[grafo.indice(v)]
+        return
     for v in centralidades:
-        frecuencias[v] = 0
-        for w in grafo.obtener_adyacentes(v):
-            frecuencias[v] += grafo.obtener_peso_union(v, w)[peso]
-        centralidades[v] *= frecuencias[v]
-
-def obtener_viaje(grafo, origen, n):
-    """Recibe un grafo, un origen y un número entero n.
-    Devuelve un viaje de n lugares que comienza y finaliza
-    en origen."""
-    recorrido = [origen]
-    visitados = set()
-    distancias = {}
-    for v in grafo:
-        camino, distancia = escalas_minimas_bfs(grafo, v, origen)
-        distancias[v] = distancia
-    if not _obtener_viaje(grafo, origen, n, recorrido, visitados, distancias):
-        return None
-    return recorrido
-
-def _obtener_viaje(grafo, origen, n, recorrido, visitados, distancias):
-    """Función auxiliar para obtener un viaje de n lugares."""
-    ultimo = recorrido[-1]
-    if len(recorrido) == n:
-        if origen not in grafo.obtener_adyacentes(ultimo):
-            return False
-        recorrido.append(origen)
-        return True
-    if distancias[ultimo] >= n - len(recorrido) + 1:
-        # Si la distancia mínima (en escalas) es mayor a la cantidad
-        # de lugares restantes para completar el recorrido,
-        # no va a haber solución por este camino
-        return False
-    for v in grafo.obtener_adyacentes(ultimo):
-        if v in visitados:
-            continue
-        recorrido.append(v)
-        visitados.add(v)
-        if _obtener_viaje(grafo, origen, n, recorrido, visitados, distancias):
-            return True
-        recorrido.pop()
-        visitados.remove(v)
-    return False
+        centralidades[v] *= sum(pesos[peso] for pesos in grafo.obtener_adyacentes(v).values())
+
+def obtener_viaje(grafo, origen, n, max_nodos=None, max_segundos=None):
+    """Recibe un grafo, un origen, un número entero n y opcionalmente
+    un presupuesto (vértices a expandir y segundos disponibles).
+    Devuelve un viaje de n lugares distintos que comienza y finaliza
+    en origen, o None si no existe. Levanta PresupuestoAgotado si no
+    se pudo decidir dentro del presupuesto."""
+    return buscar_viaje(grafo, origen, n, max_nodos, max_segundos)
 
 def exportar_archivo_kml(grafo, recorrido, archivo):
     """Recibe una lista con un recorrido y un archivo, y exporta
     a dicho archivo el recorrido en formato kml."""
-    visitados = set()
-    archivo.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-    archivo.write('<kml xmlns="http://www.opengis.net/kml/2.2">\n')
-    archivo.write('    <Document>\n')
-    for i in range(len(recorrido)):
-        if recorrido[i] in visitados: continue
-        visitados.add(recorrido[i])
-        coordenadas = grafo.obtener_dato(recorrido[i])
-        archivo.write('        <Placemark>\n')
-        archivo.write('            <name>{}</name>\n'.format(recorrido[i]))
-        archivo.write('            <Point>\n')
-        archivo.write('                <coordinates>{}</coordinates>\n'.format(coordenadas))
-        archivo.write('            </Point>\n')
-        archivo.write('        </Placemark>\n')
-    for i in range(len(recorrido) - 1):
-        origen = grafo.obtener_dato(recorrido[i])
-        destino = grafo.obtener_dato(recorrido[i+1])
-        archivo.write('        <Placemark>\n')
-        archivo.write('            <LineString>\n')
-        archivo.write('                <coordinates>{} {}</coordinates>\n'.format(origen, destino))
-        archivo.write('            </LineString>\n')
-        archivo.write('        </Placemark>\n')
-    archivo.write('    </Document>\n')
-    archivo.write('</kml>\n')
-
-def optimizar_rutas(grafo, peso):
-    """Recibe un grafo, aplica el algoritmo de Prim y devuelve un
-    árbol de tendido mínimo."""
-    vertice = grafo.obtener_vertice()
-    visitados = {vertice}
-    q = Heap()
-    for w in grafo.obtener_adyacentes(vertice):
-        q.encolar((vertice, w), grafo.obtener_peso_union(vertice, w)[peso])
+    escribir_kml(grafo, segmentos_recorrido(recorrido), archivo)
+
+def optimizar_rutas(grafo, peso, algoritmo=KRUSKAL):
+    """Recibe un grafo y el índice del peso a minimizar, y devuelve un
+    bosque de tendido mínimo, con un árbol por cada componente conexa.
+    Opcionalmente recibe el algoritmo a utilizar: KRUSKAL (por defecto)
+    o PRIM, que sólo cubre la componente de un vértice al azar."""
+    if algoritmo == PRIM:
+        return _optimizar_rutas_prim(grafo, peso)
+    return _optimizar_rutas_kruskal(grafo, peso)
+
+def _optimizar_rutas_kruskal(grafo, peso):
+    """Aplica el algoritmo de Kruskal: ordena las aristas por peso una
+    única vez y las agrega mientras no formen ciclos."""
+    compacto = compactar(grafo)
+    inicio, destinos, pesos = compacto.inicio, compacto.destinos, compacto.pesos[peso]
+    aristas = []
+    for v in range(len(compacto)):
+        for k in range(inicio[v], inicio[v + 1]):
+            # En un grafo no dirigido cada arista está dos veces
+            if compacto.es_dirigido or v < destinos[k]:
+                aristas.append((pesos[k], v, k))
+    aristas.sort()
+    conjuntos = ConjuntosDisjuntos(len(compacto))
     arbol = Grafo()
     for v in grafo:
         arbol.agregar_vertice(v, grafo.obtener_dato(v))
-    while not q.esta_vacio():
-        v, w = q.desencolar()
-        if w in visitados:
-            continue
-        arbol.agregar_arista(v, w, grafo.obtener_peso_union(v, w))
-        visitados.add(w)
-        for u in grafo.obtener_adyacentes(w):
-            if u not in visitados:
-                q.encolar((w, u), grafo.obtener_peso_union(w, u)[peso])
+    faltantes = len(compacto) - 1
+    for _, v, k in aristas:
+        if faltantes == 0:
+            break
+        w = destinos[k]
+        if conjuntos.unir(v, w):
+            arbol.agregar_arista(compacto.clave(v), compacto.clave(w), compacto.peso_posicion(k))
+            faltantes -= 1
+    return arbol
+
+def _optimizar_rutas_prim(grafo, peso):
+    """Aplica el algoritmo de Prim desde un vértice al azar y devuelve
+    el árbol de tendido mínimo de su componente. El heap tiene cada
+    vértice fuera del árbol una única vez, con el peso de la arista más
+    liviana que lo une al árbol, y se actualiza al encontrar una mejor."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    inicio, destinos, pesos = compacto.inicio, compacto.destinos, compacto.pesos[peso]
+    en_arbol = bytearray(n)
+    # Posición de la arista más liviana que une cada vértice al árbol
+    aristas = [-1] * n
+    padres = [-1] * n
+    q = HeapIndexado(capacidad=n)
+    v = compacto.indice(grafo.obtener_vertice())
+    arbol = Grafo()
+    for clave in grafo:
+        arbol.agregar_vertice(clave, grafo.obtener_dato(clave))
+    while True:
+        en_arbol[v] = 1
+        for k in range(inicio[v], inicio[v + 1]):
+            u = destinos[k]
+            if not en_arbol[u] and q.encolar_o_actualizar(u, pesos[k]):
+                aristas[u], padres[u] = k, v
+        if q.esta_vacio():
+            break
+        v = q.desencolar()
+        arbol.agregar_arista(compacto.clave(padres[v]), compacto.clave(v),
+                             compacto.peso_posicion(aristas[v]))
     return arbol
 
 def exportar_aerolinea(grafo, archivo, rutas=None):
@@ -219,7 +526,7 @@ def exportar_aerolinea(grafo, archivo, rutas=None):
     exporta al archivo los vuelos existentes en la aerolínea, de la
     forma aeropuerto_i,aeropuerto_j,tiempo,precio,cantidad_vuelos.
     Adicionalmente recibe una lista y guarda en ella las rutas
-    entre vértices."""
+    entre vértices, como pares (aeropuerto_i, aeropuerto_j)."""
     visitados = set()
     for v in grafo:
         visitados.add(v)
@@ -228,8 +535,7 @@ def exportar_aerolinea(grafo, archivo, rutas=None):
             tiempo, precio, vuelos = grafo.obtener_peso_union(v, w)
             archivo.write(",".join([v, w, str(tiempo), str(precio), str(vuelos)])+"\n")
             if rutas != None:
-                rutas.append(v)
-                rutas.append(w)
+                rutas.append((v, w))
 
 def obtener_n_mayores(diccionario, n, reverse = False):
     """Recibe un diccionario clave: valor y devuelve una lista con
@@ -251,21 +557,25 @@ def obtener_n_mayores(diccionario, n, reverse = False):
 
 def orden_topologico(grafo):
     """Recibe un grafo dirigido y devuelve una lista con un
-    ordenamiento topológico de los vértices del mismo."""
-    visitados = set()
-    resultado = []
+    ordenamiento topológico de los vértices del mismo, calculado
+    con el algoritmo de Kahn. Levanta ValueError si el grafo tiene
+    ciclos."""
+    grados = {v: 0 for v in grafo}
     for v in grafo:
-        if v in visitados:
-            continue
-        _orden_topologico(grafo, v, resultado, visitados)
-    resultado.reverse()
-    return resultado
-
-def _orden_topologico(grafo, origen, lista, visitados):
-    """Función auxiliar para orden_topologico."""
-    visitados.add(origen)
-    for v in grafo.obtener_adyacentes(origen):
-        if v in visitados:
-            continue
-        _orden_topologico(grafo, v, lista, visitados)
-    lista.append(origen)
\ No newline at end of file
+        for w in grafo.obtener_adyacentes(v):
+            grados[w] += 1
+    q = Cola()
+    for v in grafo:
+        if grados[v] == 0:
+            q.encolar(v)
+    resultado = []
+    while not q.esta_vacia():
+        v = q.desencolar()
+        resultado.append(v)
+        for w in grafo.obtener_adyacentes(v):
+            grados[w] -= 1
+            if grados[w] == 0:
+                q.encolar(w)
+    if len(resultado) < len(grados):
+        raise ValueError("El grafo tiene ciclos")
+    return resultado
\ No newline at end of file
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+# Cantidad máxima de elementos guardados entre todos los resultados
+MAX_ELEMENTOS = 2000000
+# Cantidad máxima de vértices guardados entre todos los árboles de
+# caminos mínimos: unos 300 árboles de una red de 50.000 aeropuertos,
+# que como ArbolCaminos ocupan a lo sumo 12 bytes por vértice (180 MB)
+MAX_VERTICES_ARBOLES = 15000000
+# Cantidad máxima de orígenes de los que se cuentan las consultas
+MAX_ORIGENES_CONTADOS = 100000
+
+class CacheResultados:
+    """Cache de resultados de cálculos globales sobre un grafo (por
+    ejemplo, el ranking completo de centralidad). Cada resultado queda
+    asociado a la versión del grafo con la que se calculó: si el grafo
+    cambia, se descartan todos. Cuando se supera el máximo de elementos
+    se descartan los resultados usados hace más tiempo."""
+
+    def __init__(self, max_elementos=MAX_ELEMENTOS, tamanio=len):
+        """Constructor de la clase CacheResultados. Recibe la cantidad
+        máxima de elementos a guardar, sumando el tamaño de todos los
+        resultados, y opcionalmente la función que mide el tamaño de
+        un resultado (por defecto, su largo)."""
+        self.max_elementos = max_elementos
+        self.tamanio = tamanio
+        self.resultados = OrderedDict()
+        self.elementos = 0
+        self.grafo = None
+        self.version = None
+
+    def _verificar(self, grafo):
+        """Descarta los resultados si fueron calculados sobre otro grafo
+        o sobre una versión anterior del mismo."""
+        if grafo is not self.grafo or grafo.version != self.version:
+            self.invalidar()
+            self.grafo = grafo
+            self.version = grafo.version
+
+    def consultar(self, grafo, clave):
+        """Recibe un grafo y una clave, y devuelve el resultado guardado
+        para ellos, o None si no hay ninguno."""
+        self._verificar(grafo)
+        if clave not in self.resultados:
+            return None
+        self.resultados.move_to_end(clave)
+        return self.resultados[clave]
+
+    def guardar(self, grafo, clave, resultado):
+        """Recibe un grafo, una clave y un resultado y lo guarda,
+        descartando los resultados menos usados si hace falta. Los
+        resultados más grandes que el máximo no se guardan."""
+        self._verificar(grafo)
+        if clave in self.resultados:
+            self.elementos -= self.tamanio(self.resultados.pop(clave))
+        tamanio = self.tamanio(resultado)
+        if tamanio > self.max_elementos:
+            return
+        while self.elementos + tamanio > self.max_elementos:
+            _, descartado = self.resultados.popitem(last=False)
+            self.elementos -= self.tamanio(descartado)
+        self.resultados[clave] = resultado
+        self.elementos += tamanio
+
+    def obtener(self, grafo, clave, calcular):
+        """Recibe un grafo, una clave y una función sin parámetros que
+        calcula el resultado. Devuelve el resultado guardado, o lo
+        calcula y lo guarda si no lo había."""
+        resultado = self.consultar(grafo, clave)
+        if resultado is None:
+            resultado = calcular()
+            self.guardar(grafo, clave, resultado)
+        return resultado
+
+    def invalidar(self):
+        """Descarta todos los resultados guardados."""
+        self.resultados.clear()
+        self.elementos = 0
+
+    def __len__(self):
+        """Devuelve la cantidad de resultados guardados."""
+        return len(self.resultados)
+
+def crear_cache_arboles(max_vertices=MAX_VERTICES_ARBOLES):
+    """Devuelve una CacheResultados para árboles de caminos mínimos
+    (ArbolCaminos), acotada por la cantidad total de vértices de los
+    árboles."""
+    return CacheResultados(max_vertices)
+
+def crear_contador_consultas(max_origenes=MAX_ORIGENES_CONTADOS):
+    """Devuelve una CacheResultados que guarda cuántas consultas hubo
+    desde cada origen, acotada por la cantidad de orígenes."""
+    return CacheResultados(max_origenes, lambda cantidad: 1)
@@ -0,0 +1,330 @@
+import os
+import math
+import random
+from array import array
+from heapq import heappush, heappop
+import perfil
+from grafo_compacto import compactar, transpuesta
+from memoria_compartida import exportar_red, ejecutar_por_fuentes, sumar
+
+INFINITO = float("inf")
+# Cantidad mínima de vértices para repartir el cálculo entre procesos;
+# por debajo de ella el costo de crear el pool no se justifica
+MINIMO_PARALELO = 1000
+# Valores por defecto de la centralidad aproximada: error máximo sobre
+# la centralidad normalizada y probabilidad de no superarlo
+ERROR = 0.05
+CONFIANZA = 0.9
+# Constante universal de la cota de Riondato y Kornaropoulos para la
+# cantidad de caminos a muestrear (estimada en 0,5 por los autores)
+CONSTANTE_MUESTRAS = 0.5
+# Fracción de los vértices a partir de la cual la muestra de caminos de
+# la centralidad aproximada se reemplaza por el cálculo exacto, que en
+# grafos de ese tamaño es igual de rápido y no tiene error
+FRACCION_EXACTA = 0.75
+
+def preparar_red(grafo, peso=None):
+    """Recibe un grafo y opcionalmente el índice del peso a utilizar,
+    y devuelve una tupla con los arreglos CSR que necesitan los
+    algoritmos de este módulo: (n, inicio, destinos, pesos, inicio_t,
+    destinos_t, pesos_t)."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    inicio, destinos = compacto.inicio, compacto.destinos
+    pesos = compacto.pesos[peso] if peso is not None else None
+    if compacto.es_dirigido:
+        inicio_t, destinos_t, columnas_t = transpuesta(n, inicio, destinos,
+                                                       [pesos] if pesos is not None else [])
+        pesos_t = columnas_t[0] if pesos is not None else None
+    else:
+        inicio_t, destinos_t, pesos_t = inicio, destinos, pesos
+    return n, inicio, destinos, pesos, inicio_t, destinos_t, pesos_t
+
+def _brandes_bfs(red, s, centralidad):
+    """Suma a centralidad la contribución de los caminos mínimos (en
+    cantidad de aristas) que parten de la fuente s."""
+    n, inicio, destinos, _, inicio_t, destinos_t, _ = red
+    sigma = [0] * n
+    distancia = [-1] * n
+    delta = [0.0] * n
+    sigma[s] = 1
+    distancia[s] = 0
+    orden = [s]
+    i = 0
+    while i < len(orden):
+        v = orden[i]
+        i += 1
+        siguiente = distancia[v] + 1
+        for k in range(inicio[v], inicio[v + 1]):
+            w = destinos[k]
+            if distancia[w] < 0:
+                distancia[w] = siguiente
+                orden.append(w)
+            if distancia[w] == siguiente:
+                sigma[w] += sigma[v]
+    for i in range(len(orden) - 1, 0, -1):
+        v = orden[i]
+        anterior = distancia[v] - 1
+        coeficiente = (1 + delta[v]) / sigma[v]
+        for k in range(inicio_t[v], inicio_t[v + 1]):
+            u = destinos_t[k]
+            if distancia[u] == anterior:
+                delta[u] += sigma[u] * coeficiente
+        centralidad[v] += delta[v]
+
+def _brandes_dijkstra(red, s, centralidad):
+    """Suma a centralidad la contribución de los caminos mínimos
+    (según el peso de la red) que parten de la fuente s."""
+    n, inicio, destinos, pesos, inicio_t, destinos_t, pesos_t = red
+    sigma = [0] * n
+    distancia = [INFINITO] * n
+    delta = [0.0] * n
+    visitado = [False] * n
+    sigma[s] = 1
+    distancia[s] = 0
+    orden = []
+    q = [(0, s)]
+    while q:
+        d, v = heappop(q)
+        if visitado[v]:
+            continue
+        visitado[v] = True
+        orden.append(v)
+        for k in range(inicio[v], inicio[v + 1]):
+            w = destinos[k]
+            nueva = d + pesos[k]
+            if nueva < distancia[w]:
+                distancia[w] = nueva
+                sigma[w] = sigma[v]
+                heappush(q, (nueva, w))
+            elif nueva == distancia[w]:
+                sigma[w] += sigma[v]
+    for i in range(len(orden) - 1, 0, -1):
+        v = orden[i]
+        coeficiente = (1 + delta[v]) / sigma[v]
+        for k in range(inicio_t[v], inicio_t[v + 1]):
+            u = destinos_t[k]
+            if visitado[u] and distancia[u] + pesos_t[k] == distancia[v]:
+                delta[u] += sigma[u] * coeficiente
+        centralidad[v] += delta[v]
+
+def acumular_fuentes(red, fuentes):
+    """Recibe una red preparada con preparar_red y un iterable de ids
+    de vértices fuente, y devuelve un arreglo con la centralidad
+    parcial de cada vértice aportada por esas fuentes."""
+    centralidad = [0.0] * red[0]
+    brandes = _brandes_bfs if red[3] is None else _brandes_dijkstra
+    for s in fuentes:
+        brandes(red, s, centralidad)
+    return array("d", centralidad)
+
+def _elegir(azar, candidatos, sigma):
+    """Elige uno de los candidatos con probabilidad proporcional a su
+    cantidad de caminos mínimos."""
+    if len(candidatos) == 1:
+        return candidatos[0]
+    return azar.choices(candidatos, [sigma[x] for x in candidatos])[0]
+
+def _retroceder(inicio, destinos, distancia, sigma, x, azar, centralidad):
+    """Recorre hacia atrás un camino mínimo al azar desde x, usando las
+    aristas invertidas de la búsqueda por escalas (inicio, destinos),
+    y suma 1 a centralidad en cada vértice que encuentra antes de llegar
+    al extremo de la búsqueda (que no se cuenta)."""
+    while distancia[x] > 1:
+        anterior = distancia[x] - 1
+        candidatos = [y for y in destinos[inicio[x]:inicio[x + 1]] if distancia.get(y) == anterior]
+        x = _elegir(azar, candidatos, sigma)
+        centralidad[x] += 1
+
+def _muestrear_bfs(red, u, v, azar, centralidad):
+    """Elige un camino mínimo (en cantidad de aristas) de u a v al azar
+    entre todos ellos, y suma 1 a centralidad en cada vértice
+    intermedio. Aplica BFS bidireccional expandiendo en cada paso el
+    nivel completo del lado de menor grado total, hasta que los dos
+    lados se encuentran, así que visita una parte chica del grafo."""
+    _, inicio, destinos, _, inicio_t, destinos_t, _ = red
+    # Cada lado: distancias, cantidad de caminos mínimos, frontera y
+    # aristas en su sentido de avance
+    lados = [({u: 0}, {u: 1}, [u], inicio, destinos),
+             ({v: 0}, {v: 1}, [v], inicio_t, destinos_t)]
+    encuentros = []
+    while not encuentros:
+        costos = [sum(lado[3][x + 1] - lado[3][x] for x in lado[2]) for lado in lados]
+        actual = 0 if costos[0] <= costos[1] else 1
+        distancia, sigma, frontera, ini, dest = lados[actual]
+        otra = lados[1 - actual][0]
+        if not frontera:
+            return
+        siguiente = []
+        for x in frontera:
+            d = distancia[x] + 1
+            for k in range(ini[x], ini[x + 1]):
+                w = dest[k]
+                if w not in distancia:
+                    distancia[w] = d
+                    sigma[w] = 0
+                    siguiente.append(w)
+                    if w in otra:
+                        encuentros.append(w)
+                if distancia[w] == d:
+                    sigma[w] += sigma[x]
+        lados[actual] = (distancia, sigma, siguiente, ini, dest)
+    (distancia_u, sigma_u, *_), (distancia_v, sigma_v, *_) = lados
+    producto = {w: sigma_u[w] * sigma_v[w] for w in encuentros}
+    w = _elegir(azar, encuentros, producto)
+    if w != u and w != v:
+        centralidad[w] += 1
+    # Del lado de u se retrocede por las aristas entrantes, y del de v
+    # por las salientes
+    _retroceder(inicio_t, destinos_t, distancia_u, sigma_u, w, azar, centralidad)
+    _retroceder(inicio, destinos, distancia_v, sigma_v, w, azar, centralidad)
+
+def _muestrear_dijkstra(red, u, v, azar, centralidad):
+    """Elige un camino mínimo (según el peso de la red) de u a v al azar
+    entre todos ellos, y suma 1 a centralidad en cada vértice
+    intermedio. Aplica Dijkstra desde u hasta asentar v."""
+    _, inicio, destinos, pesos, inicio_t, destinos_t, pesos_t = red
+    distancia = {u: 0}
+    sigma = {u: 1}
+    visitado = set()
+    q = [(0, u)]
+    while q:
+        d, x = heappop(q)
+        if x in visitado:
+            continue
+        visitado.add(x)
+        if x == v:
+            break
+        for k in range(inicio[x], inicio[x + 1]):
+            w = destinos[k]
+            nueva = d + pesos[k]
+            if nueva < distancia.get(w, INFINITO):
+                distancia[w] = nueva
+                sigma[w] = sigma[x]
+                heappush(q, (nueva, w))
+            elif nueva == distancia[w]:
+                sigma[w] += sigma[x]
+    if v not in visitado:
+        return
+    x = v
+    while True:
+        candidatos = [destinos_t[k] for k in range(inicio_t[x], inicio_t[x + 1])
+                      if destinos_t[k] in visitado
+                      and distancia[destinos_t[k]] + pesos_t[k] == distancia[x]]
+        x = _elegir(azar, candidatos, sigma)
+        if x == u:
+            return
+        centralidad[x] += 1
+
+def acumular_muestras(red, pares, azar):
+    """Recibe una red preparada con preparar_red, una lista de pares
+    (u, v) de ids de vértices y un generador de números aleatorios, y
+    devuelve una lista con la cantidad de caminos muestreados que
+    atraviesan cada vértice: para cada par se elige al azar uno de los
+    caminos mínimos de u a v."""
+    centralidad = [0] * red[0]
+    muestrear = _muestrear_bfs if red[3] is None else _muestrear_dijkstra
+    for u, v in pares:
+        muestrear(red, u, v, azar, centralidad)
+    return centralidad
+
+def _contribuciones(red, fuentes, peso):
+    """Tarea de ejecutar_por_fuentes: calcula la centralidad parcial de
+    un bloque de fuentes sobre una RedCompartida."""
+    return acumular_fuentes(red.preparada(peso), fuentes)
+
+def _acumular(compacto, peso, fuentes, procesos):
+    """Recibe un GrafoCompacto, el índice del peso (o None), una lista
+    de ids de vértices fuente y la cantidad de procesos a utilizar, y
+    devuelve el arreglo con la suma de las contribuciones de todas las
+    fuentes. Si se reparte entre procesos, el grafo se comparte con
+    ellos mediante memoria compartida."""
+    if perfil.activo:
+        perfil.contar(fuentes_centralidad=len(fuentes))
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    if procesos <= 1 or len(compacto) < MINIMO_PARALELO:
+        return acumular_fuentes(preparar_red(compacto, peso), fuentes)
+    with exportar_red(compacto) as red:
+        return ejecutar_por_fuentes(red, _contribuciones, fuentes, sumar, (peso,), procesos)
+
+def betweeness_brandes(grafo, peso=None, procesos=None):
+    """Recibe un grafo, opcionalmente el índice del peso a considerar
+    (si no se recibe, se cuentan escalas) y la cantidad de procesos a
+    utilizar (por defecto, uno por núcleo). Aplica el algoritmo de
+    Brandes, repartiendo los vértices fuente entre los procesos, y
+    devuelve un diccionario vertice: centralidad."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    total = _acumular(compacto, peso, range(n), procesos)
+    return {compacto.clave(v): total[v] for v in range(n)}
+
+def cota_diametro(compacto, peso=None):
+    """Recibe un GrafoCompacto y opcionalmente el índice del peso, y
+    devuelve una cota de su diámetro en vértices: la mayor cantidad de
+    vértices de un camino mínimo. Si el grafo no es dirigido y se
+    cuentan escalas, la excentricidad de cualquier vértice es al menos
+    la mitad del diámetro de su componente, así que alcanza con un BFS
+    desde un vértice de cada componente. En otro caso devuelve la
+    cantidad de vértices."""
+    n = len(compacto)
+    if compacto.es_dirigido or peso is not None:
+        return n
+    inicio, destinos = compacto.inicio, compacto.destinos
+    distancia = [-1] * n
+    excentricidad = 0
+    for s in range(n):
+        if distancia[s] >= 0:
+            continue
+        distancia[s] = 0
+        orden = [s]
+        for v in orden:
+            for k in range(inicio[v], inicio[v + 1]):
+                w = destinos[k]
+                if distancia[w] < 0:
+                    distancia[w] = distancia[v] + 1
+                    orden.append(w)
+        excentricidad = max(excentricidad, distancia[orden[-1]])
+    return min(2 * excentricidad + 1, n)
+
+def cantidad_muestras(diametro, error=ERROR, confianza=CONFIANZA):
+    """Recibe una cota del diámetro en vértices del grafo (ver
+    cota_diametro), el error máximo admitido sobre la centralidad
+    normalizada (dividida por la cantidad de pares de vértices) y la
+    probabilidad con la que se lo quiere garantizar, y devuelve la
+    cantidad de caminos a muestrear según la cota de Riondato y
+    Kornaropoulos, basada en la dimensión VC de los caminos mínimos.
+    La cantidad vale para todos los vértices a la vez y no depende del
+    tamaño del grafo sino del diámetro: con los valores por defecto son
+    unos 1300 caminos en las redes de vuelos, cuyo diámetro es chico."""
+    dimension = math.floor(math.log2(max(diametro - 2, 1))) + 1
+    return math.ceil(CONSTANTE_MUESTRAS / error ** 2 * (dimension + math.log(1 / (1 - confianza))))
+
+def betweeness_aproximada(grafo, error=ERROR, confianza=CONFIANZA, peso=None,
+                          procesos=None, semilla=None):
+    """Recibe un grafo, el error máximo y la confianza deseados, y
+    opcionalmente el índice del peso, la cantidad de procesos y una
+    semilla. Muestrea k pares de vértices al azar, con k calculado por
+    cantidad_muestras, elige uno de los caminos mínimos de cada par, y
+    estima la centralidad de cada vértice como la fracción de caminos
+    que lo atraviesan, escalada por la cantidad de pares. Cada muestra
+    recorre una parte chica del grafo, así que se calculan en un único
+    proceso. Si k alcanza FRACCION_EXACTA de los vértices, calcula la
+    centralidad exacta con betweeness_brandes, repartida entre los
+    procesos. Devuelve un diccionario vertice: centralidad estimada."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    k = cantidad_muestras(cota_diametro(compacto, peso), error, confianza)
+    if n < 2 or k >= FRACCION_EXACTA * n:
+        return betweeness_brandes(compacto, peso, procesos)
+    if perfil.activo:
+        perfil.contar(muestras_centralidad=k)
+    azar = random.Random(semilla)
+    pares = []
+    for _ in range(k):
+        u = azar.randrange(n)
+        v = azar.randrange(n - 1)
+        pares.append((u, v + 1 if v >= u else v))
+    total = acumular_muestras(preparar_red(compacto, peso), pares, azar)
+    escala = n * (n - 1) / k
+    return {compacto.clave(v): total[v] * escala for v in range(n)}
@@ -0,0 +1,34 @@
+from array import array
+
+class ConjuntosDisjuntos:
+    """Implementación de conjuntos disjuntos (union-find) sobre los
+    enteros 0 .. n - 1, con compresión de caminos y unión por rango."""
+
+    def __init__(self, n):
+        """Constructor de la clase ConjuntosDisjuntos. Recibe la
+        cantidad de elementos; cada uno empieza en su propio conjunto."""
+        self.padres = array("i", range(n))
+        self.rangos = array("b", [0]) * n
+
+    def buscar(self, x):
+        """Devuelve el representante del conjunto que contiene a x."""
+        padres = self.padres
+        while padres[x] != x:
+            # Compresión por mitades: cada elemento del camino pasa a
+            # apuntar a su abuelo
+            padres[x] = padres[padres[x]]
+            x = padres[x]
+        return x
+
+    def unir(self, x, y):
+        """Une los conjuntos que contienen a x y a y. Devuelve True si
+        estaban separados, o False si ya eran el mismo conjunto."""
+        x, y = self.buscar(x), self.buscar(y)
+        if x == y:
+            return False
+        if self.rangos[x] < self.rangos[y]:
+            x, y = y, x
+        self.padres[y] = x
+        if self.rangos[x] == self.rangos[y]:
+            self.rangos[x] += 1
+        return True
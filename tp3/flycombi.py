@@ -1,14 +1,39 @@
 #!/usr/bin/python3
+import io
+import os
 import sys
 import csv
+import time
+import contextlib
 from grafo import Grafo
+from grafo_compacto import GrafoCompacto
 import biblioteca as b
+import perfil
+from cache import CacheResultados, crear_cache_arboles, crear_contador_consultas
+from instantanea import guardar_instantanea, cargar_instantanea
+from jerarquia import construir_jerarquia, guardar_jerarquia, cargar_jerarquia
+from landmarks import Landmarks, LEJANOS, GRADO
+from tramos import caminos_por_tramos
+from kml import exportar_kml as exportar_archivo, segmentos_recorrido
 
 # Índice de cada peso de las aristas del grafo
 TIEMPO = 0
 PRECIO = 1
 VUELOS = 2
 
+# Pesos que pueden pedirse por nombre en los comandos
+PESOS = {"rapido": TIEMPO, "barato": PRECIO}
+
+# Segundos disponibles por defecto para buscar un recorrido de vacaciones
+SEGUNDOS_VACACIONES = 10
+
+# Cantidad de consultas de camino mínimo desde un mismo origen a partir
+# de la cual se calcula y se guarda su árbol de caminos mínimos
+CONSULTAS_ARBOL = 2
+
+# Comandos de camino mínimo, que el modo por lotes resuelve juntos
+COMANDOS_CAMINO = ("camino_mas", "camino_escalas")
+
 # Lista de operaciones disponibles
 OPERACIONES = [
             "camino_mas",
@@ -18,9 +43,55 @@ OPERACIONES = [
             "centralidad",
             "centralidad_aprox",
             "pagerank",
-            "itinerario"
+            "pagerank_personalizado",
+            "itinerario",
+            "crear_jerarquia",
+            "cargar_jerarquia",
+            "crear_landmarks"
             ]
 
+class Sesion:
+    """Estado que comparten los comandos de una misma sesión: la cache
+    de resultados de los cálculos globales, la de árboles de caminos
+    mínimos, la cantidad de consultas desde cada origen, el motor de
+    caminos mínimos activo para cada peso (una jerarquía de
+    contracciones o landmarks) y la cantidad de procesos entre los que
+    se reparten los cálculos."""
+
+    def __init__(self, procesos=None):
+        """Constructor de la clase Sesion. Opcionalmente recibe la
+        cantidad de procesos a utilizar en los cálculos que se reparten
+        (por defecto, uno por procesador; con 1 no se crean procesos)."""
+        self.procesos = procesos
+        self.cache = CacheResultados()
+        self.arboles = crear_cache_arboles()
+        self.consultas = crear_contador_consultas()
+        self.motores = {}
+
+    def contar_consulta(self, grafo, clave):
+        """Recibe un grafo y la clave (origenes, peso) de una consulta
+        de camino mínimo, y devuelve cuántas hubo desde ese origen
+        contando esta."""
+        cantidad = (self.consultas.consultar(grafo, clave) or 0) + 1
+        self.consultas.guardar(grafo, clave, cantidad)
+        return cantidad
+
+    def activar_motor(self, grafo, motor):
+        """Recibe un grafo y un motor de caminos mínimos construido
+        sobre él, y lo utiliza para los caminos mínimos según su peso."""
+        self.motores[motor.peso] = (motor, grafo.version)
+
+    def obtener_motor(self, grafo, peso):
+        """Devuelve el motor activo para el peso, o None si no hay o si
+        el grafo cambió desde que se lo activó."""
+        if peso not in self.motores:
+            return None
+        motor, version = self.motores[peso]
+        if version != grafo.version:
+            del self.motores[peso]
+            return None
+        return motor
+
 def listar_operaciones():
     """Muestra por pantalla todas las operaciones disponibles"""
     for op in OPERACIONES:
@@ -50,81 +121,210 @@ def obtener_vuelos(grafo, ruta_vuelos):
             pesos = (int(tiempo), int(precio), int(vuelos))
             grafo.agregar_arista(aeropuerto_i, aeropuerto_j, pesos)
 
-def get_camino_minimo(grafo, origen, destino, peso=None):
-    """Llama a la funcion para obtener el camino minimo correspondiente segun
-    si se le pasa un peso o no"""
-    if peso == None: return b.escalas_minimas_bfs(grafo, origen, destino)
-    return b.obtener_camino_minimo(grafo, peso, origen, destino)
+def obtener_arbol(grafo, origenes, peso, arboles):
+    """Recibe un grafo, una lista de aeropuertos origen, un peso (o
+    None) y una cache de árboles, y devuelve el ArbolCaminos desde esos
+    aeropuertos, calculándolo sólo si no estaba en la cache."""
+    clave = (tuple(origenes), peso)
+    return arboles.obtener(grafo, clave, lambda: b.arbol_caminos_minimos(grafo, origenes, peso))
 
-def obtener_mejor_camino(grafo, ciudades, origen, destino, peso=None):
+def obtener_mejor_camino(grafo, ciudades, origen, destino, peso=None, sesion=None):
     """Recibe un grafo, una ciudad origen y una destino, y opcionalmente
-    un peso. Calcula los caminos mínimos entre cada aeropuerto de la ciudad
-    origen y cada aeropuerto de la ciudad destino, y devuelve el mejor."""
-    camino, distancia = None, None
-    for aeropuerto_origen in ciudades[origen]:
-        for aeropuerto_destino in ciudades[destino]:
-            c, d = get_camino_minimo(grafo, aeropuerto_origen, aeropuerto_destino, peso)
-            if not distancia or d < distancia:
-                camino, distancia = c, d
+    un peso. Calcula, con una búsqueda bidireccional entre los
+    aeropuertos de la ciudad origen y los de la ciudad destino, el mejor
+    camino entre alguno de ellos, y lo devuelve. Si se recibe una
+    sesión, se usa su motor de caminos mínimos para el peso si lo hay;
+    si no, a partir de la consulta número CONSULTAS_ARBOL desde el mismo
+    origen se calcula su árbol de caminos mínimos y se guarda para
+    responder las siguientes."""
+    if sesion is not None:
+        motor = sesion.obtener_motor(grafo, peso)
+        if motor is not None:
+            camino, distancia = motor.camino_minimo(ciudades[origen], ciudades[destino])
+            return camino
+        clave = (tuple(ciudades[origen]), peso)
+        arbol = sesion.arboles.consultar(grafo, clave)
+        if arbol is None and sesion.contar_consulta(grafo, clave) >= CONSULTAS_ARBOL:
+            arbol = obtener_arbol(grafo, ciudades[origen], peso, sesion.arboles)
+        if arbol is not None:
+            return arbol.camino(ciudades[destino])
+    camino, distancia = b.camino_minimo_multiple(grafo, ciudades[origen], ciudades[destino], peso)
     return camino
 
-def camino_minimo(grafo, ciudades, parametros):
-    """Recibe un grafo, un diccionario ciudad: lista_aeropuertos, y una lista
-    de parámetros. Imprime un camino mínimo desde el origen hasta el destino.
-    Devuelve un booleano indicando si el comando se ejecutó correctamente."""
+def parametros_camino(ciudades, parametros):
+    """Recibe un diccionario de ciudades y la lista de parámetros de un
+    comando de camino mínimo, y devuelve una terna (peso, ciudad_origen,
+    ciudad_destino), con peso None para el camino con menos escalas, o
+    None si los parámetros no son válidos."""
     if len(parametros) == 3:
         peso, ciudad_origen, ciudad_destino = parametros
-        if peso != "barato" and peso != "rapido":
-            return False
-        if peso == "rapido": peso = TIEMPO
-        if peso == "barato": peso = PRECIO
+        if peso not in PESOS:
+            return None
+        peso = PESOS[peso]
     elif len(parametros) == 2:
         ciudad_origen, ciudad_destino = parametros
         peso = None
     else:
-        return False
+        return None
     if ciudad_origen not in ciudades or ciudad_destino not in ciudades:
+        return None
+    return peso, ciudad_origen, ciudad_destino
+
+def camino_minimo(grafo, ciudades, parametros, sesion=None):
+    """Recibe un grafo, un diccionario ciudad: lista_aeropuertos, y una lista
+    de parámetros, y opcionalmente la sesión en curso.
+    Imprime un camino mínimo desde el origen hasta el destino.
+    Devuelve un booleano indicando si el comando se ejecutó correctamente."""
+    consulta = parametros_camino(ciudades, parametros)
+    if consulta is None:
+        return False
+    peso, ciudad_origen, ciudad_destino = consulta
+    camino = obtener_mejor_camino(grafo, ciudades, ciudad_origen, ciudad_destino, peso, sesion)
+    if camino is None:
         return False
-    camino = obtener_mejor_camino(grafo, ciudades, ciudad_origen, ciudad_destino, peso)
     print(" -> ".join(camino))
     return camino
 
-def centralidad(grafo, parametros):
+def caminos_en_lote(grafo, ciudades, consultas, sesion, procesos=None):
+    """Recibe un grafo, un diccionario de ciudades, una lista con los
+    parámetros de varios comandos de camino mínimo, la sesión en curso
+    y opcionalmente la cantidad de procesos a utilizar (por defecto,
+    uno por procesador). Devuelve la lista con el camino de cada
+    consulta, o None si no es válida o no tiene camino. Las consultas
+    con el mismo peso y la misma ciudad origen se responden juntas: con
+    el motor de la sesión para ese peso si lo hay, con el árbol de
+    caminos mínimos de la sesión si son al menos CONSULTAS_ARBOL, o como
+    en obtener_mejor_camino si no. Si hay varios procesos, las búsquedas
+    que faltan se reparten entre ellos con caminos_por_tramos."""
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    caminos = [None] * len(consultas)
+    grupos = {}
+    for i, parametros in enumerate(consultas):
+        consulta = parametros_camino(ciudades, parametros)
+        if consulta is None:
+            continue
+        peso, ciudad_origen, ciudad_destino = consulta
+        grupos.setdefault((peso, ciudad_origen), []).append((i, ciudad_destino))
+    por_peso = {}
+    for (peso, ciudad_origen), pendientes in grupos.items():
+        clave = (tuple(ciudades[ciudad_origen]), peso)
+        if (procesos > 1 and sesion.obtener_motor(grafo, peso) is None
+                and sesion.arboles.consultar(grafo, clave) is None):
+            tramos = por_peso.setdefault(peso, [])
+            tramos += [(i, (ciudades[ciudad_origen], ciudades[destino])) for i, destino in pendientes]
+            continue
+        if sesion.obtener_motor(grafo, peso) is None and len(pendientes) >= CONSULTAS_ARBOL:
+            arbol = obtener_arbol(grafo, ciudades[ciudad_origen], peso, sesion.arboles)
+            for i, destino in pendientes:
+                caminos[i] = arbol.camino(ciudades[destino])
+            continue
+        for i, destino in pendientes:
+            caminos[i] = obtener_mejor_camino(grafo, ciudades, ciudad_origen, destino, peso, sesion)
+    for peso, tramos in por_peso.items():
+        calculados = caminos_por_tramos(grafo, [tramo for _, tramo in tramos], peso, procesos)
+        for (i, _), camino in zip(tramos, calculados):
+            caminos[i] = camino
+    return caminos
+
+def obtener_ranking(grafo, cache, clave, calcular):
+    """Recibe un grafo, una cache de resultados (o None), una clave y
+    una función sin parámetros que devuelve un diccionario
+    aeropuerto: centralidad. Devuelve la lista de todos los aeropuertos
+    ordenada de más a menos central, ponderando por la cantidad de
+    vuelos, tomándola de la cache si ya fue calculada."""
+    def rankear():
+        centralidades = calcular()
+        b.obtener_frecuencias(grafo, centralidades, VUELOS)
+        return b.obtener_n_mayores(centralidades, len(centralidades), True)
+    if cache is None:
+        return rankear()
+    return cache.obtener(grafo, clave, rankear)
+
+def obtener_pagerank(grafo, cache, teleporte=None):
+    """Recibe un grafo, una cache de resultados (o None) y
+    opcionalmente una tupla de ciudades hacia las que se sesga el
+    resultado, y devuelve un diccionario aeropuerto: pagerank. Los
+    resultados personalizados comienzan a iterar desde el Pagerank
+    global, si ya fue calculado."""
+    clave = ("pagerank_crudo", teleporte)
+    resultado = None if cache is None else cache.consultar(grafo, clave)
+    if resultado is not None:
+        return dict(resultado)
+    if teleporte is None:
+        resultado = b.obtener_pagerank(grafo)
+    else:
+        inicial = None if cache is None else cache.consultar(grafo, ("pagerank_crudo", None))
+        resultado = b.obtener_pagerank_personalizado(grafo, teleporte, inicial)
+    if cache is not None:
+        cache.guardar(grafo, clave, dict(resultado))
+    return resultado
+
+def centralidad(grafo, parametros, cache=None, procesos=None):
     """Recibe un grafo y una lista de parametros que contiene
-    un entero n. Devuelve los n aeropuertos mas centrales"""
+    un entero n, y opcionalmente la cantidad de procesos a utilizar.
+    Devuelve los n aeropuertos mas centrales"""
     if len(parametros) != 1 or not parametros[0].isdigit():
         return False
     n = int(parametros[0])
-    centralidades = b.betweeness_centrality(grafo)
-    b.obtener_frecuencias(grafo, centralidades, VUELOS)
-    n_mas_centrales = b.obtener_n_mayores(centralidades, n, True)
-    print(", ".join(n_mas_centrales))
+    ranking = obtener_ranking(grafo, cache, ("centralidad",),
+                              lambda: b.betweeness_centrality(grafo, procesos=procesos))
+    print(", ".join(ranking[:n]))
     return True
 
-def centralidad_aproximada(grafo, parametros):
-    """Recibe un grafo y una lista de parámetros, que debe contener
-    un número entero n. Imprime los n aeropuertos más importantes
-    aproximadamente. En caso de error, devuelve False."""
-    if len(parametros) != 1 or not parametros[0].isdigit():
+def centralidad_aproximada(grafo, parametros, cache=None, procesos=None):
+    """Recibe un grafo y una lista de parámetros, que contiene un número
+    entero n y opcionalmente el error máximo admitido sobre la
+    centralidad normalizada y la confianza con la que se lo quiere
+    garantizar, ambos entre 0 y 1, y opcionalmente la cantidad de
+    procesos a utilizar. Imprime los n aeropuertos más
+    importantes aproximadamente. En caso de error, devuelve False."""
+    if len(parametros) not in (1, 2, 3) or not parametros[0].isdigit():
         return False
     n = int(parametros[0])
-    centralidades = b.obtener_centralidad_aproximada(grafo)
-    b.obtener_frecuencias(grafo, centralidades, VUELOS)
-    resultado = b.obtener_n_mayores(centralidades, n, True)
-    print(", ".join(resultado))
+    try:
+        error = float(parametros[1]) if len(parametros) > 1 else b.ERROR
+        confianza = float(parametros[2]) if len(parametros) > 2 else b.CONFIANZA
+    except ValueError:
+        return False
+    if not (0 < error < 1 and 0 < confianza < 1):
+        return False
+    ranking = obtener_ranking(grafo, cache, ("centralidad_aprox", error, confianza),
+                              lambda: b.obtener_centralidad_aproximada(grafo, error, confianza,
+                                                                         procesos=procesos))
+    print(", ".join(ranking[:n]))
     return True
 
-def pagerank(grafo, parametros):
+def pagerank(grafo, parametros, cache=None):
     """Recibe un grafo y una lista de parámetros, que debe contener
     un número entero n. Imprime los n aeropuertos más importantes
     según el algoritmo de Pagerank. En caso de error devuelve False."""
     if len(parametros) != 1 or not parametros[0].isdigit():
         return False
     n = int(parametros[0])
-    centralidades = b.obtener_pagerank(grafo)
-    b.obtener_frecuencias(grafo, centralidades, VUELOS)
-    resultado = b.obtener_n_mayores(centralidades, n, True)
-    print(", ".join(resultado))
+    ranking = obtener_ranking(grafo, cache, ("pagerank",),
+                              lambda: obtener_pagerank(grafo, cache))
+    print(", ".join(ranking[:n]))
+    return True
+
+def pagerank_personalizado(grafo, ciudades, parametros, cache=None):
+    """Recibe un grafo, un diccionario de ciudades y una lista de
+    parámetros, que debe contener un número entero n seguido de una o
+    más ciudades. Imprime los n aeropuertos más importantes según el
+    algoritmo de Pagerank sesgado hacia los aeropuertos de esas
+    ciudades. En caso de error devuelve False."""
+    if len(parametros) < 2 or not parametros[0].isdigit():
+        return False
+    n = int(parametros[0])
+    teleporte = set()
+    for ciudad in parametros[1:]:
+        if ciudad not in ciudades:
+            return False
+        teleporte.update(ciudades[ciudad])
+    teleporte = tuple(sorted(teleporte))
+    ranking = obtener_ranking(grafo, cache, ("pagerank", teleporte),
+                              lambda: obtener_pagerank(grafo, cache, teleporte))
+    print(", ".join(ranking[:n]))
     return True
 
 def nueva_aerolinea(grafo, parametros):
@@ -142,26 +342,70 @@ def nueva_aerolinea(grafo, parametros):
 
 def vacaciones(grafo, ciudades, parametros):
     """Recibe un grafo y una lista de parámetros, que contiene una
-    ciudad origen y un número entero n. Imprime un recorrido de n
-    lugares que comienza y finaliza en origen."""
-    if len(parametros) != 2 or not parametros[1].isdigit():
+    ciudad origen, un número entero n y opcionalmente los segundos
+    disponibles para la búsqueda. Imprime un recorrido de n lugares
+    que comienza y finaliza en origen."""
+    if len(parametros) not in (2, 3) or not parametros[1].isdigit():
         return False
     origen, n = parametros[0], int(parametros[1])
     if origen not in ciudades:
         return False
+    segundos = SEGUNDOS_VACACIONES
+    if len(parametros) == 3:
+        try:
+            segundos = float(parametros[2])
+        except ValueError:
+            return False
+    limite = time.monotonic() + segundos
     recorrido = None
+    agotado = False
     for aeropuerto in ciudades[origen]:
-        recorrido = b.obtener_viaje(grafo, aeropuerto, n)
+        try:
+            recorrido = b.obtener_viaje(grafo, aeropuerto, n,
+                                        max_segundos=limite - time.monotonic())
+        except b.PresupuestoAgotado:
+            agotado = True
+            break
         if recorrido != None: break
     if not recorrido:
-        print("No se encontro recorrido")
+        if agotado:
+            print("No se encontro recorrido dentro del presupuesto")
+        else:
+            print("No se encontro recorrido")
         return True
     print(" -> ".join(recorrido))
     return recorrido
 
-def itinerario(grafo, ciudades, parametros):
-    """Recibe un grafo, un diccionario de ciudades y una lista de
-    parámetros que debe contener una ruta a un archivo de itinerario.
+def obtener_caminos_tramos(grafo, ciudades, recorrido, sesion=None):
+    """Recibe un grafo, un diccionario de ciudades, una lista de
+    ciudades a recorrer en orden y opcionalmente la sesión en curso, y
+    devuelve la lista con el mejor camino (en escalas) de cada ciudad a
+    la siguiente, o None en los tramos sin camino. Los tramos cuyo
+    origen ya tiene su árbol en la sesión se responden con él; el resto
+    se calcula en lote con caminos_por_tramos, entre los procesos de la
+    sesión."""
+    tramos = [(ciudades[recorrido[i]], ciudades[recorrido[i + 1]])
+              for i in range(len(recorrido) - 1)]
+    caminos = [None] * len(tramos)
+    pendientes = []
+    for i, (origenes, destinos) in enumerate(tramos):
+        arbol = None
+        if sesion is not None:
+            arbol = sesion.arboles.consultar(grafo, (tuple(origenes), None))
+        if arbol is None:
+            pendientes.append(i)
+        else:
+            caminos[i] = arbol.camino(destinos)
+    procesos = sesion.procesos if sesion is not None else None
+    calculados = caminos_por_tramos(grafo, [tramos[i] for i in pendientes], procesos=procesos)
+    for i, camino in zip(pendientes, calculados):
+        caminos[i] = camino
+    return caminos
+
+def itinerario(grafo, ciudades, parametros, sesion=None):
+    """Recibe un grafo, un diccionario de ciudades, una lista de
+    parámetros que debe contener una ruta a un archivo de itinerario y
+    opcionalmente la sesión en curso.
     Imprime el orden en que deben visitarse las ciudades y
     los caminos mínimos de cada ciudad a la siguiente."""
     if len(parametros) != 1:
@@ -176,77 +420,216 @@ def itinerario(grafo, ciudades, parametros):
         for line in reader:
             ciudad_i, ciudad_j = line
             g.agregar_arista(ciudad_i, ciudad_j, None)
-    recorrido = b.orden_topologico(g)
+    try:
+        recorrido = b.orden_topologico(g)
+    except ValueError:
+        return False
     print(", ".join(recorrido))
-    caminos_minimos = []
-    for i in range(len(recorrido) - 1):
-        origen = recorrido[i]
-        destino = recorrido[i + 1]
-        camino = obtener_mejor_camino(grafo, ciudades, origen, destino)
-        caminos_minimos.append(camino)
+    caminos_minimos = obtener_caminos_tramos(grafo, ciudades, recorrido, sesion)
+    if None in caminos_minimos:
+        return False
     recorrido_completo = []
     for camino in caminos_minimos:
         print(" -> ".join(camino))
         recorrido_completo += camino
     return recorrido_completo
 
+def jerarquia(grafo, parametros, sesion, crear):
+    """Recibe un grafo, una lista de parámetros que contiene un peso
+    (rapido o barato) y la ruta de un archivo, la sesión en curso, y si
+    se debe crear la jerarquía de contracciones para ese peso (y
+    guardarla en el archivo) o cargarla desde él. La deja activa para
+    los caminos mínimos de la sesión. En caso de error devuelve False."""
+    if sesion is None or len(parametros) != 2 or parametros[0] not in PESOS:
+        return False
+    peso, ruta = PESOS[parametros[0]], parametros[1]
+    if crear:
+        resultado = construir_jerarquia(grafo, peso)
+        guardar_jerarquia(resultado, ruta)
+    else:
+        try:
+            resultado = cargar_jerarquia(ruta, grafo)
+        except (OSError, ValueError):
+            return False
+        if resultado.peso != peso:
+            return False
+    sesion.activar_motor(grafo, resultado)
+    print("OK")
+    return True
+
+def crear_landmarks(grafo, parametros, sesion):
+    """Recibe un grafo, una lista de parámetros que contiene un peso
+    (rapido o barato), la cantidad de landmarks y opcionalmente el
+    método para elegirlos (lejanos o grado), y la sesión en curso.
+    Deja activo el motor A* con landmarks para los caminos mínimos de
+    la sesión con ese peso. En caso de error devuelve False."""
+    if sesion is None or len(parametros) not in (2, 3) or parametros[0] not in PESOS:
+        return False
+    if not parametros[1].isdigit():
+        return False
+    metodo = parametros[2] if len(parametros) == 3 else LEJANOS
+    if metodo != LEJANOS and metodo != GRADO:
+        return False
+    motor = Landmarks(grafo, PESOS[parametros[0]], int(parametros[1]), metodo)
+    sesion.activar_motor(grafo, motor)
+    print("OK")
+    return True
+
 def exportar_kml(grafo, parametros, recorrido):
-    """Recibe un grafo, un recorrido y una lista de parámetros que contiene
-    la ruta del archivo kml a exportar. Devuelve True en caso de ejecutarse
-    correctamente. En caso de error o si el recorrido no es una lista,
-    devuelve False."""
+    """Recibe un grafo, un recorrido (un camino o las rutas de una
+    aerolínea) y una lista de parámetros que contiene la ruta del
+    archivo kml a exportar (o kmz, si termina en .kmz). Devuelve True
+    en caso de ejecutarse correctamente. En caso de error o si el
+    recorrido no es una lista, devuelve False."""
     if len(parametros) != 1:
         return False
     if recorrido is True or recorrido is False:
         return False
-    with open(parametros[0], "w") as archivo:
-        b.exportar_archivo_kml(grafo, recorrido, archivo)
+    exportar_archivo(grafo, segmentos_recorrido(recorrido), parametros[0])
     print("OK")
     return True
 
-def procesar_comando(grafo, ciudades, linea, ultimo):
+def separar_comando(linea):
+    """Recibe una linea de entrada y devuelve un par (comando,
+    parametros), con parametros None si la linea no tiene."""
+    entrada = linea.rstrip("\n").split(" ")
+    if len(entrada) < 2:
+        return entrada[0], None
+    return entrada[0], " ".join(entrada[1:]).split(",")
+
+def procesar_comando(grafo, ciudades, linea, ultimo, sesion=None):
     """Recibe un grafo, un diccionario de ciudades con todos los
     datos disponibles y una linea y procesa los comandos correspondientes.
+    Opcionalmente recibe la sesión en curso, con los resultados de los
+    comandos anteriores. Si el perfil está activo, registra el comando.
     Devuelve True en caso de éxito, False en caso de error."""
-    entrada = linea.rstrip("\n").split(" ")
-    comando = entrada[0]
+    if not perfil.activo:
+        return _procesar_comando(grafo, ciudades, linea, ultimo, sesion)
+    comando, _ = separar_comando(linea)
+    return perfil.medir(comando, linea.rstrip("\n"), _procesar_comando,
+                        grafo, ciudades, linea, ultimo, sesion)
+
+def _procesar_comando(grafo, ciudades, linea, ultimo, sesion=None):
+    """Procesa una linea de comando; ver procesar_comando."""
+    comando, parametros = separar_comando(linea)
     if comando == "listar_operaciones":
         listar_operaciones()
         return True
-    if len(entrada) < 2:
+    if parametros is None:
         return False
-    parametros = " ".join(entrada[1:]).split(",")
+    cache = sesion.cache if sesion is not None else None
+    procesos = sesion.procesos if sesion is not None else None
     if comando == "camino_mas" or comando == "camino_escalas":
-        return camino_minimo(grafo, ciudades, parametros)
+        return camino_minimo(grafo, ciudades, parametros, sesion)
     if comando == "centralidad":
-        return centralidad(grafo, parametros)
+        return centralidad(grafo, parametros, cache, procesos)
     if comando == "centralidad_aprox":
-        return centralidad_aproximada(grafo, parametros)
+        return centralidad_aproximada(grafo, parametros, cache, procesos)
     if comando == "pagerank":
-        return pagerank(grafo, parametros)
+        return pagerank(grafo, parametros, cache)
+    if comando == "pagerank_personalizado":
+        return pagerank_personalizado(grafo, ciudades, parametros, cache)
     if comando == "nueva_aerolinea":
         return nueva_aerolinea(grafo, parametros)
     if comando == "vacaciones":
         return vacaciones(grafo, ciudades, parametros)
     if comando == "itinerario":
-        return itinerario(grafo, ciudades, parametros)
+        return itinerario(grafo, ciudades, parametros, sesion)
+    if comando == "crear_jerarquia":
+        return jerarquia(grafo, parametros, sesion, True)
+    if comando == "cargar_jerarquia":
+        return jerarquia(grafo, parametros, sesion, False)
+    if comando == "crear_landmarks":
+        return crear_landmarks(grafo, parametros, sesion)
     if comando == "exportar_kml":
         return exportar_kml(grafo, parametros, ultimo)
     return False
 
-def main():
-    """Funcion principal del programa, se encarga de cargar los datos
-    en memoria y ejecutar los comandos recibidos"""
-    ruta_aeropuertos = sys.argv[1]
-    ruta_vuelos = sys.argv[2]
-    grafo = Grafo()
+def procesar_lote(grafo, ciudades, lineas, sesion, procesos=None):
+    """Recibe un grafo, un diccionario de ciudades, la lista de lineas
+    con todos los comandos, la sesión en curso y opcionalmente la
+    cantidad de procesos a utilizar. Procesa los comandos y devuelve
+    la salida completa como texto, en el orden original. Cada tramo de
+    comandos de camino mínimo consecutivos se resuelve de una vez con
+    caminos_en_lote."""
+    salida = io.StringIO()
+    ultimo = False
+    i = 0
+    with contextlib.redirect_stdout(salida):
+        while i < len(lineas):
+            consultas = []
+            while i < len(lineas):
+                comando, parametros = separar_comando(lineas[i])
+                if comando not in COMANDOS_CAMINO or parametros is None:
+                    break
+                consultas.append(parametros)
+                i += 1
+            if not consultas:
+                ultimo = procesar_comando(grafo, ciudades, lineas[i], ultimo, sesion)
+                if not ultimo:
+                    print("ERROR")
+                i += 1
+                continue
+            caminos = perfil.medir("camino_lote", "{} consultas".format(len(consultas)),
+                                   caminos_en_lote, grafo, ciudades, consultas, sesion, procesos)
+            for camino in caminos:
+                ultimo = camino if camino is not None else False
+                print(" -> ".join(camino) if camino is not None else "ERROR")
+    return salida.getvalue()
+
+def cargar_red(ruta_aeropuertos, ruta_vuelos):
+    """Recibe las rutas de los archivos de aeropuertos y de vuelos, y
+    devuelve un par (grafo, ciudades) con la red cargada."""
+    grafo = GrafoCompacto()
     ciudades = {}
     obtener_aeropuertos(grafo, ciudades, ruta_aeropuertos)
     obtener_vuelos(grafo, ruta_vuelos)
+    return grafo, ciudades
+
+def main():
+    """Funcion principal del programa, se encarga de cargar los datos
+    en memoria y ejecutar los comandos recibidos.
+    Uso: flycombi.py aeropuertos.csv vuelos.csv
+         flycombi.py compile aeropuertos.csv vuelos.csv instantanea
+         flycombi.py instantanea
+    Opciones, antes de los demás argumentos:
+         --lote lee todos los comandos antes de procesarlos y responde
+                juntos los caminos mínimos consecutivos
+         --perfil archivo registra en el archivo, como lineas JSON, el
+                tiempo y los contadores de cada comando (también se
+                activa con la variable de entorno FLYCOMBI_PERFIL)"""
+    lote = False
+    while len(sys.argv) > 1 and sys.argv[1].startswith("--"):
+        opcion = sys.argv.pop(1)
+        if opcion == "--lote":
+            lote = True
+        elif opcion == "--perfil" and len(sys.argv) > 1:
+            perfil.activar(sys.argv.pop(1))
+        else:
+            sys.exit("Opción desconocida: " + opcion)
+    perfil.activar_desde_entorno()
+    if len(sys.argv) == 5 and sys.argv[1] == "compile":
+        ruta_aeropuertos, ruta_vuelos, ruta_instantanea = sys.argv[2:]
+        grafo, ciudades = cargar_red(ruta_aeropuertos, ruta_vuelos)
+        guardar_instantanea(grafo, ciudades, ruta_instantanea, [ruta_aeropuertos, ruta_vuelos])
+        print("OK")
+        return
+    if len(sys.argv) == 2:
+        try:
+            grafo, ciudades = cargar_instantanea(sys.argv[1])
+        except ValueError as e:
+            sys.exit(str(e))
+    else:
+        grafo, ciudades = cargar_red(sys.argv[1], sys.argv[2])
+    sesion = Sesion()
+    if lote:
+        sys.stdout.write(procesar_lote(grafo, ciudades, sys.stdin.readlines(), sesion))
+        return
     ultimo = False
     for linea in sys.stdin:
-        ultimo = procesar_comando(grafo, ciudades, linea, ultimo)
+        ultimo = procesar_comando(grafo, ciudades, linea, ultimo, sesion)
         if not ultimo:
             print("ERROR")
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+import sys
+import csv
+import math
+import random
+
+# Cantidad promedio de aeropuertos por ciudad
+AEROPUERTOS_POR_CIUDAD = 3
+# Exponente que sesga el reparto de los aeropuertos restantes hacia
+# las primeras ciudades (1 es un reparto uniforme)
+SESGO_CIUDADES = 1.5
+# Cantidad de rutas que agrega cada aeropuerto nuevo (el grado mínimo)
+RUTAS_POR_AEROPUERTO = 3
+# Dispersión en grados de los aeropuertos alrededor de su ciudad
+DISPERSION = 0.5
+# Velocidad de crucero en km/h y minutos fijos de cada vuelo
+VELOCIDAD = 800
+MINUTOS_FIJOS = 30
+RADIO_TIERRA = 6371
+
+def _distancia(a, b):
+    """Recibe dos pares (latitud, longitud) y devuelve la distancia en
+    kilómetros entre ellos."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RADIO_TIERRA * math.asin(min(1.0, math.sqrt(h)))
+
+def generar_aeropuertos(cantidad, generador):
+    """Recibe la cantidad de aeropuertos y un generador de números al
+    azar, y devuelve una lista de filas (ciudad, codigo, latitud,
+    longitud). Todas las ciudades tienen al menos un aeropuerto, y el
+    tamaño de las ciudades es sesgado: unas pocas tienen muchos."""
+    ciudades = max(1, cantidad // AEROPUERTOS_POR_CIUDAD)
+    centros = [(generador.uniform(-60, 70), generador.uniform(-180, 180)) for _ in range(ciudades)]
+    aeropuertos = []
+    for i in range(cantidad):
+        # Los primeros aeropuertos cubren todas las ciudades, el resto
+        # se reparte con preferencia por las de menor índice
+        c = i if i < ciudades else int(ciudades * generador.random() ** SESGO_CIUDADES)
+        latitud = centros[c][0] + generador.uniform(-DISPERSION, DISPERSION)
+        longitud = centros[c][1] + generador.uniform(-DISPERSION, DISPERSION)
+        aeropuertos.append(("C{}".format(c), "A{}".format(i),
+                            "{:.4f}".format(latitud), "{:.4f}".format(longitud)))
+    return aeropuertos
+
+def generar_vuelos(aeropuertos, generador, rutas=RUTAS_POR_AEROPUERTO):
+    """Recibe la lista de aeropuertos, un generador de números al azar
+    y la cantidad de rutas de cada aeropuerto nuevo, y devuelve una
+    lista de filas (aeropuerto_i, aeropuerto_j, tiempo, precio, vuelos).
+    Las rutas siguen el modelo de Barabási-Albert: cada aeropuerto se
+    conecta con otros elegidos con probabilidad proporcional a su
+    grado, lo que forma una red libre de escala con pocos hubs muy
+    conectados. El tiempo depende de la distancia, el precio de la
+    distancia y la competencia, y los vuelos del grado de los extremos."""
+    posiciones = [(float(latitud), float(longitud)) for _, _, latitud, longitud in aeropuertos]
+    n = len(aeropuertos)
+    # Cada aeropuerto aparece una vez por cada ruta que tiene, así que
+    # elegir al azar de esta lista favorece a los de mayor grado
+    extremos = []
+    aristas = []
+    for v in range(1, n):
+        elegidos = set()
+        objetivo = min(rutas, v)
+        while len(elegidos) < objetivo:
+            if extremos and generador.random() < 0.9:
+                elegidos.add(generador.choice(extremos))
+            else:
+                elegidos.add(generador.randrange(v))
+        for w in elegidos:
+            aristas.append((v, w))
+            extremos += (v, w)
+    grados = [0] * n
+    for v, w in aristas:
+        grados[v] += 1
+        grados[w] += 1
+    vuelos = []
+    for v, w in aristas:
+        kilometros = _distancia(posiciones[v], posiciones[w])
+        tiempo = MINUTOS_FIJOS + round(kilometros / VELOCIDAD * 60)
+        precio = max(1, round((50 + kilometros * 0.1) * generador.uniform(0.6, 1.4)))
+        frecuencia = max(1, round(math.sqrt(grados[v] * grados[w]) * generador.uniform(0.5, 1.5)))
+        vuelos.append((aeropuertos[v][1], aeropuertos[w][1], tiempo, precio, frecuencia))
+    return vuelos
+
+def generar_red(cantidad, ruta_aeropuertos, ruta_vuelos, semilla=None):
+    """Recibe la cantidad de aeropuertos, las rutas de los archivos a
+    escribir y opcionalmente una semilla, y genera una red con el
+    formato que leen obtener_aeropuertos y obtener_vuelos."""
+    generador = random.Random(semilla)
+    aeropuertos = generar_aeropuertos(cantidad, generador)
+    vuelos = generar_vuelos(aeropuertos, generador)
+    with open(ruta_aeropuertos, "w", newline="") as archivo:
+        csv.writer(archivo, lineterminator="\n").writerows(aeropuertos)
+    with open(ruta_vuelos, "w", newline="") as archivo:
+        csv.writer(archivo, lineterminator="\n").writerows(vuelos)
+
+def main():
+    """Uso: generador.py cantidad aeropuertos.csv vuelos.csv [semilla]"""
+    if len(sys.argv) not in (4, 5) or not sys.argv[1].isdigit():
+        print(main.__doc__)
+        return
+    semilla = int(sys.argv[4]) if len(sys.argv) == 5 else None
+    generar_red(int(sys.argv[1]), sys.argv[2], sys.argv[3], semilla)
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,8 @@ class Grafo:
         self.vertices = {}
         self.numero_vertices = 0
         self.es_dirigido = dirigido
+        # Se incrementa con cada modificación del grafo
+        self.version = 0
 
     def agregar_vertice(self, clave, valor):
         """Recibe una clave y un valor, y los agrega al grafo,
@@ -47,6 +49,7 @@ class Grafo:
         clave: Vertice(clave, valor)."""
         self.vertices[clave] = Vertice(clave, valor)
         self.numero_vertices += 1
+        self.version += 1
 
     def agregar_arista(self, clave1, clave2, peso):
         """Recibe dos claves pertenecientes a vértices del
@@ -55,6 +58,7 @@ class Grafo:
         self.vertices[clave1].agregar_adyacente(clave2, peso)
         if not self.es_dirigido:
             self.vertices[clave2].agregar_adyacente(clave1, peso)
+        self.version += 1
 
     def estan_conectados(self, clave1, clave2):
         """Recibe dos claves de vértices en el grafo y
@@ -0,0 +1,366 @@
+from array import array
+from random import choice
+try:
+    import numpy as np
+except ImportError:
+    # Sin NumPy las sumas por vértice se hacen en Python
+    np = None
+
+# Tipos de los arreglos: índices de aristas, ids de vértices y pesos
+TIPO_INICIO = "q"
+TIPO_VERTICE = "i"
+TIPO_PESO = "q"
+
+class GrafoCompacto:
+    """Implementación de grafo en formato CSR (compressed sparse row).
+    Cada vértice se identifica internamente con un entero consecutivo,
+    y las aristas de todos los vértices se guardan en arreglos contiguos:
+    las aristas del vértice i ocupan las posiciones
+    inicio[i] .. inicio[i + 1] - 1 de destinos, y de cada columna de pesos.
+    Expone la misma interfaz que Grafo, más un acceso por ids enteros
+    pensado para los algoritmos.
+    PRE: los pesos de las aristas son tuplas de enteros de longitud
+    igual a la cantidad de columnas."""
+
+    def __init__(self, dirigido=False, columnas=3):
+        """Constructor de la clase GrafoCompacto. Recibe si el grafo es
+        dirigido y la cantidad de columnas de peso de cada arista."""
+        self.es_dirigido = dirigido
+        self.columnas = columnas
+        self.claves = []
+        self.datos = []
+        self.indices = {}
+        # Se incrementa con cada modificación del grafo
+        self.version = 0
+        self._inicio = array(TIPO_INICIO, [0])
+        self._destinos = array(TIPO_VERTICE)
+        self._pesos = [array(TIPO_PESO) for _ in range(columnas)]
+        # Aristas agregadas que todavía no fueron compactadas. Si el grafo
+        # no es dirigido se guarda un único sentido de cada una, y el otro
+        # se agrega al compactar
+        self._origenes_pendientes = array(TIPO_VERTICE)
+        self._destinos_pendientes = array(TIPO_VERTICE)
+        self._pesos_pendientes = [array(TIPO_PESO) for _ in range(columnas)]
+        # Pares (mínimo, máximo) de cada columna de pesos ya calculados
+        self._extremos = {}
+        # Arreglos (inicio, destinos) de las aristas entrantes, si ya se
+        # calcularon
+        self._entrantes = None
+        # Diccionarios de obtener_adyacentes ya armados, por id, y la
+        # versión del grafo para la que valen
+        self._adyacentes = {}
+        self._version_adyacentes = 0
+
+    @classmethod
+    def desde_grafo(cls, grafo, columnas=3):
+        """Recibe un grafo con la interfaz de Grafo y devuelve un
+        GrafoCompacto equivalente."""
+        compacto = cls(grafo.es_dirigido, columnas)
+        for v in grafo:
+            compacto.agregar_vertice(v, grafo.obtener_dato(v))
+        for v in grafo:
+            i = compacto.indices[v]
+            for w, peso in grafo.obtener_adyacentes(v).items():
+                j = compacto.indices[w]
+                if grafo.es_dirigido or i <= j:
+                    compacto._agregar_pendiente(i, j, peso)
+        return compacto
+
+    @classmethod
+    def desde_arreglos(cls, claves, datos, inicio, destinos, pesos, dirigido=False):
+        """Recibe las claves y datos de los vértices, y los arreglos CSR
+        ya compactados (pueden ser memoryviews de solo lectura), y
+        devuelve un GrafoCompacto que los utiliza sin copiarlos."""
+        grafo = cls(dirigido, len(pesos))
+        grafo.claves = claves
+        grafo.datos = datos
+        grafo.indices = {clave: i for i, clave in enumerate(claves)}
+        grafo._inicio = inicio
+        grafo._destinos = destinos
+        grafo._pesos = pesos
+        return grafo
+
+    def agregar_vertice(self, clave, valor):
+        """Recibe una clave y un valor, y los agrega al grafo. Si la
+        clave ya existía, reemplaza su valor."""
+        self.version += 1
+        if clave in self.indices:
+            self.datos[self.indices[clave]] = valor
+            return
+        self.indices[clave] = len(self.claves)
+        self.claves.append(clave)
+        self.datos.append(valor)
+
+    def agregar_arista(self, clave1, clave2, peso):
+        """Recibe dos claves pertenecientes a vértices del grafo y
+        agrega una arista entre ellos, con el peso pasado. Si la arista
+        ya existía, se reemplaza su peso."""
+        i, j = self.indices[clave1], self.indices[clave2]
+        self.version += 1
+        self._agregar_pendiente(i, j, peso)
+
+    def _agregar_pendiente(self, i, j, peso):
+        """Guarda la arista (i, j) para compactarla más adelante."""
+        self._origenes_pendientes.append(i)
+        self._destinos_pendientes.append(j)
+        for columna, valor in zip(self._pesos_pendientes, peso):
+            columna.append(valor)
+
+    def compactar(self):
+        """Incorpora las aristas pendientes a los arreglos CSR. Dentro de
+        cada vértice las aristas quedan ordenadas por id de destino."""
+        n = len(self.claves)
+        if not self._origenes_pendientes and len(self._inicio) == n + 1:
+            return
+        origenes, destinos = self._origenes_pendientes, self._destinos_pendientes
+        pesos = self._pesos_pendientes
+        self._origenes_pendientes = array(TIPO_VERTICE)
+        self._destinos_pendientes = array(TIPO_VERTICE)
+        self._pesos_pendientes = [array(TIPO_PESO) for _ in range(self.columnas)]
+        if not self.es_dirigido:
+            # Cada arista queda seguida de su inversa, para que se respete
+            # el orden en que se agregaron
+            origenes, destinos = _intercalar(origenes, destinos), _intercalar(destinos, origenes)
+            pesos = [_intercalar(columna, columna) for columna in pesos]
+        if len(self._destinos):
+            # Las aristas ya compactadas van antes que las pendientes
+            anteriores = array(TIPO_VERTICE)
+            for i in range(len(self._inicio) - 1):
+                anteriores.extend(array(TIPO_VERTICE, [i]) * (self._inicio[i + 1] - self._inicio[i]))
+            origenes = anteriores + origenes
+            destinos = array(TIPO_VERTICE, self._destinos) + destinos
+            pesos = [array(TIPO_PESO, anterior) + columna for anterior, columna in zip(self._pesos, pesos)]
+        # Ordenamiento por conteo estable por origen, y después por
+        # destino dentro de cada vértice. Ante aristas repetidas, la última
+        # agregada queda al final y es la que se conserva
+        orden, limites = _ordenar_por_conteo(origenes, n)
+        conservadas = array(TIPO_INICIO)
+        self._inicio = array(TIPO_INICIO, [0]) * (n + 1)
+        for i in range(n):
+            tramo = orden[limites[i]:limites[i + 1]]
+            if len(tramo) > 1:
+                ultima = {destinos[k]: k for k in tramo}
+                tramo = [ultima[w] for w in sorted(ultima)]
+            conservadas.extend(tramo)
+            self._inicio[i + 1] = len(conservadas)
+        self._destinos = array(TIPO_VERTICE, map(destinos.__getitem__, conservadas))
+        self._pesos = [array(TIPO_PESO, map(columna.__getitem__, conservadas)) for columna in pesos]
+        self._extremos = {}
+        self._entrantes = None
+
+    @property
+    def inicio(self):
+        """Arreglo de longitud V + 1 con la posición de la primera
+        arista de cada vértice."""
+        self.compactar()
+        return self._inicio
+
+    @property
+    def destinos(self):
+        """Arreglo con el id del vértice destino de cada arista."""
+        self.compactar()
+        return self._destinos
+
+    @property
+    def pesos(self):
+        """Lista con un arreglo por columna de peso, alineados con
+        destinos."""
+        self.compactar()
+        return self._pesos
+
+    def extremos_pesos(self, columna):
+        """Recibe el índice de una columna de pesos y devuelve el par
+        (mínimo, máximo) de sus valores, o (0, 0) si no hay aristas. Se
+        calcula una vez por compactación."""
+        pesos = self.pesos[columna]
+        if columna not in self._extremos:
+            self._extremos[columna] = (min(pesos), max(pesos)) if len(pesos) else (0, 0)
+        return self._extremos[columna]
+
+    def sumas_pesos(self, columna):
+        """Recibe el índice de una columna de pesos y devuelve una lista
+        indexada por id con la suma de los pesos de las aristas que salen
+        de cada vértice."""
+        inicio, pesos = self.inicio, self.pesos[columna]
+        if np is None:
+            return [sum(pesos[inicio[i]:inicio[i + 1]]) for i in range(len(self.claves))]
+        # Suma acumulada de la columna: lo de cada vértice es la
+        # diferencia entre los extremos de su tramo
+        acumulado = np.zeros(len(pesos) + 1, dtype=np.int64)
+        if len(pesos):
+            np.cumsum(np.frombuffer(pesos, dtype=np.int64), out=acumulado[1:])
+        limites = np.frombuffer(inicio, dtype=np.int64)
+        return (acumulado[limites[1:]] - acumulado[limites[:-1]]).tolist()
+
+    def entrantes(self):
+        """Devuelve el par de arreglos CSR (inicio, destinos) de las
+        aristas invertidas: las entrantes a cada vértice. Si el grafo no
+        es dirigido son los mismos arreglos; si no, la transpuesta se
+        calcula una vez por compactación."""
+        if not self.es_dirigido:
+            return self.inicio, self.destinos
+        inicio, destinos = self.inicio, self.destinos
+        if self._entrantes is None:
+            inicio_t, destinos_t, _ = transpuesta(len(self.claves), inicio, destinos, [])
+            self._entrantes = (inicio_t, destinos_t)
+        return self._entrantes
+
+    def indice(self, clave):
+        """Recibe la clave de un vértice y devuelve su id entero."""
+        return self.indices[clave]
+
+    def clave(self, i):
+        """Recibe el id entero de un vértice y devuelve su clave."""
+        return self.claves[i]
+
+    def limites(self, i):
+        """Recibe el id de un vértice y devuelve el par (desde, hasta)
+        de posiciones de sus aristas en destinos y pesos."""
+        inicio = self.inicio
+        return inicio[i], inicio[i + 1]
+
+    def vecinos(self, i, peso=None):
+        """Recibe el id de un vértice y opcionalmente el índice de un
+        peso, y devuelve el arreglo con los ids de sus vecinos o, si se
+        recibe el peso, el par (vecinos, pesos) de arreglos alineados."""
+        desde, hasta = self.limites(i)
+        if peso is None:
+            return self.destinos[desde:hasta]
+        return self.destinos[desde:hasta], self.pesos[peso][desde:hasta]
+
+    def rango(self, i):
+        """Recibe el id de un vértice y devuelve el rango de posiciones
+        de sus aristas en destinos y pesos."""
+        inicio = self.inicio
+        return range(inicio[i], inicio[i + 1])
+
+    def grado(self, i):
+        """Recibe el id de un vértice y devuelve su grado de salida."""
+        inicio = self.inicio
+        return inicio[i + 1] - inicio[i]
+
+    def posicion_arista(self, i, j):
+        """Recibe los ids de dos vértices y devuelve la posición de la
+        arista (i, j), o -1 si no existe."""
+        inicio, destinos = self.inicio, self.destinos
+        bajo, alto = inicio[i], inicio[i + 1]
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if destinos[medio] < j:
+                bajo = medio + 1
+            else:
+                alto = medio
+        if bajo < inicio[i + 1] and destinos[bajo] == j:
+            return bajo
+        return -1
+
+    def peso_posicion(self, posicion):
+        """Recibe la posición de una arista y devuelve la tupla de
+        sus pesos."""
+        return tuple(columna[posicion] for columna in self.pesos)
+
+    def estan_conectados(self, clave1, clave2):
+        """Recibe dos claves de vértices en el grafo y devuelve True si
+        están conectados, o False en el caso contrario."""
+        return self.posicion_arista(self.indices[clave2], self.indices[clave1]) != -1
+
+    def obtener_vertice(self):
+        """Devuelve un vértice aleatorio del grafo."""
+        return choice(self.claves)
+
+    def obtener_dato(self, clave):
+        """Recibe la clave asociada a un vértice del grafo y
+        devuelve su dato."""
+        return self.datos[self.indices[clave]]
+
+    def obtener_peso_union(self, clave1, clave2):
+        """Recibe dos claves de vértices en el grafo y devuelve
+        el peso de la arista que los conecta."""
+        posicion = self.posicion_arista(self.indices[clave1], self.indices[clave2])
+        if posicion == -1:
+            raise KeyError(clave2)
+        return self.peso_posicion(posicion)
+
+    def obtener_adyacentes(self, clave):
+        """Recibe la clave de un vértice en el grafo y devuelve un
+        diccionario con los vértices adyacentes a él, de la forma
+        clave_vertice: peso. El diccionario de cada vértice se arma la
+        primera vez que se pide y se reutiliza hasta que el grafo se
+        modifica, así que no debe modificarse. Los algoritmos que recorren
+        muchas aristas deberían usar vecinos, que no arma el diccionario."""
+        if self._version_adyacentes != self.version:
+            self._adyacentes = {}
+            self._version_adyacentes = self.version
+        i = self.indices[clave]
+        adyacentes = self._adyacentes.get(i)
+        if adyacentes is None:
+            desde, hasta = self.limites(i)
+            claves = self.claves
+            columnas = [pesos[desde:hasta] for pesos in self.pesos]
+            adyacentes = dict(zip([claves[w] for w in self.destinos[desde:hasta]], zip(*columnas)))
+            self._adyacentes[i] = adyacentes
+        return adyacentes
+
+    def __len__(self):
+        """Devuelve la cantidad de vértices del grafo."""
+        return len(self.claves)
+
+    def __iter__(self):
+        """Iterador del grafo."""
+        for v in self.claves:
+            yield v
+
+def _intercalar(a, b):
+    """Recibe dos arreglos del mismo tipo y largo, y devuelve uno con
+    sus elementos intercalados: a[0], b[0], a[1], b[1], ..."""
+    resultado = a * 2
+    resultado[0::2] = a
+    resultado[1::2] = b
+    return resultado
+
+def _ordenar_por_conteo(claves, n):
+    """Recibe un arreglo de claves enteras entre 0 y n - 1 y devuelve un
+    par (orden, limites): el arreglo de posiciones ordenadas por su
+    clave, conservando el orden original entre las de igual clave, y el
+    de la posición en orden de la primera de cada clave (de largo
+    n + 1)."""
+    limites = array(TIPO_INICIO, [0]) * (n + 1)
+    for clave in claves:
+        limites[clave + 1] += 1
+    for i in range(n):
+        limites[i + 1] += limites[i]
+    libre = array(TIPO_INICIO, limites)
+    orden = array(TIPO_INICIO, [0]) * len(claves)
+    for k, clave in enumerate(claves):
+        orden[libre[clave]] = k
+        libre[clave] += 1
+    return orden, limites
+
+def transpuesta(n, inicio, destinos, columnas):
+    """Recibe los arreglos CSR de un grafo dirigido de n vértices y una
+    lista de columnas de pesos, y devuelve los arreglos (inicio,
+    destinos, columnas) del grafo con las aristas invertidas."""
+    inicio_t = array(TIPO_INICIO, [0]) * (n + 1)
+    for w in destinos:
+        inicio_t[w + 1] += 1
+    for i in range(n):
+        inicio_t[i + 1] += inicio_t[i]
+    libre = array(TIPO_INICIO, inicio_t)
+    destinos_t = array(TIPO_VERTICE, [0]) * len(destinos)
+    columnas_t = [array(TIPO_PESO, [0]) * len(destinos) for _ in columnas]
+    for v in range(n):
+        for k in range(inicio[v], inicio[v + 1]):
+            w = destinos[k]
+            destinos_t[libre[w]] = v
+            for pesos, pesos_t in zip(columnas, columnas_t):
+                pesos_t[libre[w]] = pesos[k]
+            libre[w] += 1
+    return inicio_t, destinos_t, columnas_t
+
+def compactar(grafo, columnas=3):
+    """Recibe un grafo y devuelve su versión GrafoCompacto. Si ya lo
+    era, lo devuelve tal cual."""
+    if isinstance(grafo, GrafoCompacto):
+        grafo.compactar()
+        return grafo
+    return GrafoCompacto.desde_grafo(grafo, columnas)
@@ -1,61 +1,48 @@
 import heapq
 
-class Nodo:
-    """Implementación de la clase nodo a ser utilizado
-    por un Heap de mínimos."""
-
-    def __init__(self, dato, valor):
-        """Constructor de la clase Nodo. Recibe un dato y
-        un valor."""
-        self.dato = dato
-        self.valor = valor
-
-    def __lt__(self, otro):
-        """Función de comparación con otro elemento de
-        clase Nodo."""
-        return self.valor < otro.valor
-
-    def __gt__(self, otro):
-        """Función de comparación con otro elemento de
-        clase Nodo."""
-        return self.valor > otro.valor
-
-    def __eq__(self, otro):
-        """Devuelve un booleano que indica si el nodo tiene
-        igual valor a otro nodo pasado por parámetro."""
-        return self.valor == otro.valor
-
-    def obtener_dato(self):
-        """Devuelve el dato asociado al nodo."""
-        return self.dato
+# Cantidad de hijos por nodo del HeapIndexado. Con 4 el árbol tiene la
+# mitad de niveles que uno binario, y cada bajada compara pocos hijos
+ARIDAD = 4
 
 class Heap:
-    """Implementación de heap de mínimos."""
+    """Implementación de heap de mínimos. Cada elemento se guarda como
+    una tupla (valor, orden de llegada, dato), que heapq compara sin
+    llamar a código Python; a igual valor sale primero el más antiguo
+    y el dato nunca se compara."""
 
     def __init__(self):
         """Constructor de la clase Heap."""
         self.datos = []
+        # Cantidad de operaciones realizadas, para el perfil
+        self.encolados = 0
+        self.desencolados = 0
 
     def encolar(self, dato, valor):
         """Recibe un dato a encolar, y un valor por el cual se
         lo comparará."""
-        nuevo = Nodo(dato, valor)
-        heapq.heappush(self.datos, nuevo)
+        heapq.heappush(self.datos, (valor, self.encolados, dato))
+        self.encolados += 1
 
     def desencolar(self):
         """Quita el elemento con el valor mínimo del Heap
         y lo devuelve."""
-        nodo = heapq.heappop(self.datos)
-        return nodo.obtener_dato()
+        _, _, dato = heapq.heappop(self.datos)
+        self.desencolados += 1
+        return dato
 
     def ver_minimo(self):
         """Si el heap no está vacío, devuelve el elemento con
         mayor prioridad"""
         if self.esta_vacio():
             raise ValueError("El heap está vacío")
-        nodo = self.datos[0]
-        dato = nodo.obtener_dato()
-        return dato
+        return self.datos[0][2]
+
+    def prioridad_minima(self):
+        """Si el heap no está vacío, devuelve el valor del elemento
+        con mayor prioridad."""
+        if self.esta_vacio():
+            raise ValueError("El heap está vacío")
+        return self.datos[0][0]
 
     def esta_vacio(self):
         """Devuelve un booleano indicando si el Heap
@@ -64,4 +51,309 @@ class Heap:
 
     def __len__(self):
         """Devuelve la cantidad de elementos en el heap."""
-        return len(self.datos)
\ No newline at end of file
+        return len(self.datos)
+
+class HeapIndexado:
+    """Heap de mínimos d-ario con un mapa de posiciones, que permite
+    cambiar la prioridad de un dato ya encolado en lugar de encolarlo
+    de nuevo. Cada dato está a lo sumo una vez. Las prioridades y los
+    datos se guardan en listas paralelas, así que las comparaciones se
+    hacen entre prioridades, sin objetos intermedios. Si los datos son
+    ids enteros de 0 a capacidad - 1, el mapa de posiciones es una lista
+    en lugar de un diccionario."""
+
+    def __init__(self, aridad=ARIDAD, capacidad=None):
+        """Constructor de la clase HeapIndexado. Opcionalmente recibe la
+        cantidad de hijos de cada nodo (por defecto, ARIDAD) y, si los
+        datos son ids enteros, la cantidad de ids posibles."""
+        if aridad < 2:
+            raise ValueError("La aridad debe ser al menos 2")
+        self.aridad = aridad
+        self.prioridades = []
+        self.datos = []
+        # Posición de cada dato en las listas, o -1 si no está
+        self.denso = capacidad is not None
+        self.posiciones = [-1] * capacidad if self.denso else {}
+        # Cantidad de operaciones realizadas, para el perfil
+        self.encolados = 0
+        self.desencolados = 0
+        self.actualizados = 0
+
+    def encolar(self, dato, valor):
+        """Recibe un dato que no está en el heap y su prioridad, y lo
+        encola."""
+        if dato in self:
+            raise ValueError("El dato ya está en el heap")
+        self.prioridades.append(valor)
+        self.datos.append(dato)
+        self._subir(len(self.datos) - 1, dato, valor)
+        self.encolados += 1
+
+    def _posicion(self, dato):
+        """Devuelve la posición del dato en las listas. Levanta KeyError
+        si no está en el heap."""
+        if self.denso:
+            if 0 <= dato < len(self.posiciones) and self.posiciones[dato] != -1:
+                return self.posiciones[dato]
+            raise KeyError(dato)
+        return self.posiciones[dato]
+
+    def actualizar_prioridad(self, dato, valor):
+        """Recibe un dato que está en el heap y su nueva prioridad, que
+        puede ser menor o mayor que la anterior, y lo reubica. Levanta
+        KeyError si el dato no está en el heap."""
+        i = self._posicion(dato)
+        anterior = self.prioridades[i]
+        if valor < anterior:
+            self._subir(i, dato, valor)
+        elif valor > anterior:
+            self._bajar(i, dato, valor)
+        self.actualizados += 1
+
+    def encolar_o_actualizar(self, dato, valor):
+        """Recibe un dato y una prioridad. Si el dato no está en el heap
+        lo encola, y si está con una prioridad mayor la reduce. Devuelve
+        True si el heap cambió."""
+        i = self.posiciones[dato] if self.denso else self.posiciones.get(dato, -1)
+        if i == -1:
+            self.prioridades.append(valor)
+            self.datos.append(dato)
+            self._subir(len(self.datos) - 1, dato, valor)
+            self.encolados += 1
+            return True
+        if valor < self.prioridades[i]:
+            self._subir(i, dato, valor)
+            self.actualizados += 1
+            return True
+        return False
+
+    def desencolar(self):
+        """Quita el elemento con el valor mínimo del heap y lo
+        devuelve."""
+        if not self.datos:
+            raise ValueError("El heap está vacío")
+        minimo = self.datos[0]
+        if self.denso:
+            self.posiciones[minimo] = -1
+        else:
+            del self.posiciones[minimo]
+        ultimo_dato, ultimo_valor = self.datos.pop(), self.prioridades.pop()
+        if self.datos:
+            self._bajar(0, ultimo_dato, ultimo_valor)
+        self.desencolados += 1
+        return minimo
+
+    def ver_minimo(self):
+        """Si el heap no está vacío, devuelve el elemento con
+        mayor prioridad."""
+        if not self.datos:
+            raise ValueError("El heap está vacío")
+        return self.datos[0]
+
+    def prioridad_minima(self):
+        """Si el heap no está vacío, devuelve el valor del elemento
+        con mayor prioridad."""
+        if not self.datos:
+            raise ValueError("El heap está vacío")
+        return self.prioridades[0]
+
+    def prioridad(self, dato):
+        """Recibe un dato que está en el heap y devuelve su
+        prioridad. Levanta KeyError si el dato no está en el heap."""
+        return self.prioridades[self._posicion(dato)]
+
+    def esta_vacio(self):
+        """Devuelve un booleano indicando si el heap está vacío."""
+        return not self.datos
+
+    def __contains__(self, dato):
+        """Devuelve si el dato está en el heap."""
+        if self.denso:
+            return 0 <= dato < len(self.posiciones) and self.posiciones[dato] != -1
+        return dato in self.posiciones
+
+    def __len__(self):
+        """Devuelve la cantidad de elementos en el heap."""
+        return len(self.datos)
+
+    def _subir(self, i, dato, valor):
+        """Ubica el dato con el valor recibido en la posición i o en la
+        de alguno de sus ancestros, bajando a los que tengan un valor
+        mayor. Los ancestros se mueven una vez cada uno en lugar de
+        intercambiarse."""
+        prioridades, datos, posiciones, aridad = self.prioridades, self.datos, self.posiciones, self.aridad
+        while i > 0:
+            padre = (i - 1) // aridad
+            if prioridades[padre] <= valor:
+                break
+            prioridades[i] = prioridades[padre]
+            datos[i] = datos[padre]
+            posiciones[datos[i]] = i
+            i = padre
+        prioridades[i] = valor
+        datos[i] = dato
+        posiciones[dato] = i
+
+    def _bajar(self, i, dato, valor):
+        """Ubica el dato con el valor recibido en la posición i o en la
+        de alguno de sus descendientes, subiendo en cada nivel al hijo
+        de menor valor si es menor que el del dato."""
+        prioridades, datos, posiciones, aridad = self.prioridades, self.datos, self.posiciones, self.aridad
+        n = len(datos)
+        while True:
+            primero = i * aridad + 1
+            if primero >= n:
+                break
+            ultimo = min(primero + aridad, n)
+            hijo = primero
+            minimo = prioridades[primero]
+            for j in range(primero + 1, ultimo):
+                if prioridades[j] < minimo:
+                    hijo, minimo = j, prioridades[j]
+            if minimo >= valor:
+                break
+            prioridades[i] = minimo
+            datos[i] = datos[hijo]
+            posiciones[datos[i]] = i
+            i = hijo
+        prioridades[i] = valor
+        datos[i] = dato
+        posiciones[dato] = i
+
+class ColaBuckets:
+    """Cola de prioridad monótona de Dial, para prioridades enteras no
+    negativas: cada prioridad posible tiene su lista (bucket), y como
+    las prioridades encoladas nunca son menores que la última
+    desencolada ni la superan en más de peso_maximo, alcanzan
+    peso_maximo + 1 buckets usados en forma circular. Encolar y
+    actualizar son O(1), y desencolar avanza sobre los buckets vacíos.
+    PRE: ninguna prioridad encolada es menor que la última desencolada.
+    Tiene la misma interfaz que HeapIndexado, así que sirve para
+    Dijkstra cuando los pesos son enteros chicos."""
+
+    def __init__(self, peso_maximo, capacidad=None):
+        """Constructor de la clase ColaBuckets. Recibe el peso máximo de
+        una arista y, si los datos son ids enteros, la cantidad de ids
+        posibles."""
+        if peso_maximo < 0:
+            raise ValueError("El peso máximo no puede ser negativo")
+        self.buckets = [[] for _ in range(peso_maximo + 1)]
+        # Prioridad actual de cada dato, o -1 si no está. Al actualizar
+        # una prioridad el dato se agrega a otro bucket sin quitarlo del
+        # anterior, y la entrada vieja se descarta al llegar a ella
+        self.denso = capacidad is not None
+        self.valores = [-1] * capacidad if self.denso else {}
+        self.cantidad = 0
+        # Última prioridad desencolada, la mínima que puede encolarse
+        self.actual = 0
+        # Cantidad de operaciones realizadas, para el perfil
+        self.encolados = 0
+        self.desencolados = 0
+        self.actualizados = 0
+
+    def _valor(self, dato):
+        """Devuelve la prioridad del dato, o -1 si no está."""
+        return self.valores[dato] if self.denso else self.valores.get(dato, -1)
+
+    def _agregar(self, dato, valor):
+        """Agrega el dato al bucket de la prioridad recibida."""
+        if self.cantidad == 0 and valor >= self.actual + len(self.buckets):
+            self.actual = valor
+        if not self.actual <= valor < self.actual + len(self.buckets):
+            raise ValueError("Prioridad fuera del rango de la cola: {}".format(valor))
+        self.buckets[valor % len(self.buckets)].append(dato)
+        self.valores[dato] = valor
+
+    def encolar(self, dato, valor):
+        """Recibe un dato que no está en la cola y su prioridad, que no
+        puede ser menor que la última desencolada, y lo encola."""
+        if self._valor(dato) != -1:
+            raise ValueError("El dato ya está en la cola")
+        self._agregar(dato, valor)
+        self.cantidad += 1
+        self.encolados += 1
+
+    def actualizar_prioridad(self, dato, valor):
+        """Recibe un dato que está en la cola y su nueva prioridad, y lo
+        cambia de bucket."""
+        if self._valor(dato) == -1:
+            raise KeyError(dato)
+        self._agregar(dato, valor)
+        self.actualizados += 1
+
+    def encolar_o_actualizar(self, dato, valor):
+        """Recibe un dato y una prioridad. Si el dato no está en la cola
+        lo encola, y si está con una prioridad mayor la reduce. Devuelve
+        True si la cola cambió."""
+        anterior = self._valor(dato)
+        if anterior == -1:
+            self.encolar(dato, valor)
+            return True
+        if valor < anterior:
+            self._agregar(dato, valor)
+            self.actualizados += 1
+            return True
+        return False
+
+    def _buscar_minimo(self):
+        """Recorre los buckets desde la prioridad actual, descartando las
+        entradas viejas, y devuelve el par (prioridad, bucket) del primer
+        elemento vigente, que queda al final del bucket."""
+        buckets, valores, actual = self.buckets, self.valores, self.actual
+        while True:
+            bucket = buckets[actual % len(buckets)]
+            while bucket:
+                dato = bucket[-1]
+                if (valores[dato] if self.denso else valores.get(dato, -1)) == actual:
+                    return actual, bucket
+                bucket.pop()
+            actual += 1
+
+    def desencolar(self):
+        """Quita el elemento con el valor mínimo de la cola y lo
+        devuelve."""
+        if self.cantidad == 0:
+            raise ValueError("La cola está vacía")
+        self.actual, bucket = self._buscar_minimo()
+        dato = bucket.pop()
+        if self.denso:
+            self.valores[dato] = -1
+        else:
+            del self.valores[dato]
+        self.cantidad -= 1
+        self.desencolados += 1
+        return dato
+
+    def ver_minimo(self):
+        """Si la cola no está vacía, devuelve el elemento con
+        mayor prioridad."""
+        if self.cantidad == 0:
+            raise ValueError("La cola está vacía")
+        return self._buscar_minimo()[1][-1]
+
+    def prioridad_minima(self):
+        """Si la cola no está vacía, devuelve el valor del elemento
+        con mayor prioridad."""
+        if self.cantidad == 0:
+            raise ValueError("La cola está vacía")
+        return self._buscar_minimo()[0]
+
+    def prioridad(self, dato):
+        """Recibe un dato que está en la cola y devuelve su
+        prioridad."""
+        valor = self._valor(dato)
+        if valor == -1:
+            raise KeyError(dato)
+        return valor
+
+    def esta_vacio(self):
+        """Devuelve un booleano indicando si la cola está vacía."""
+        return self.cantidad == 0
+
+    def __contains__(self, dato):
+        """Devuelve si el dato está en la cola."""
+        return self._valor(dato) != -1
+
+    def __len__(self):
+        """Devuelve la cantidad de elementos en la cola."""
+        return self.cantidad
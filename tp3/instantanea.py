@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import mmap
+import struct
+from grafo_compacto import GrafoCompacto, TIPO_INICIO, TIPO_VERTICE, TIPO_PESO
+
+# Formato del archivo: un encabezado fijo, los arreglos CSR alineados a
+# 8 bytes y al final un bloque JSON con claves, datos, ciudades y fuentes.
+MAGIA = b"FLYCOMBI"
+VERSION = 1
+ENCABEZADO = struct.Struct("<8sIIqqq")
+ALINEACION = 8
+
+def _alinear(n):
+    """Redondea n hacia arriba al múltiplo de ALINEACION más cercano."""
+    return (n + ALINEACION - 1) // ALINEACION * ALINEACION
+
+def _describir_fuentes(rutas):
+    """Recibe una lista de rutas de archivos y devuelve, para cada una,
+    su ruta absoluta, fecha de modificación y tamaño."""
+    fuentes = []
+    for ruta in rutas:
+        estado = os.stat(ruta)
+        fuentes.append([os.path.abspath(ruta), estado.st_mtime_ns, estado.st_size])
+    return fuentes
+
+def esta_desactualizada(fuentes):
+    """Recibe la descripción de fuentes guardada en una instantánea y
+    devuelve True si alguno de los archivos fue modificado después de
+    generarla. Los archivos que ya no existen no se tienen en cuenta."""
+    for ruta, modificacion, tamanio in fuentes:
+        if not os.path.exists(ruta):
+            continue
+        estado = os.stat(ruta)
+        if estado.st_mtime_ns > modificacion or estado.st_size != tamanio:
+            return True
+    return False
+
+def guardar_instantanea(grafo, ciudades, ruta, fuentes=()):
+    """Recibe un GrafoCompacto, un diccionario ciudad: lista_aeropuertos,
+    la ruta del archivo a generar y las rutas de los archivos de los que
+    se cargaron los datos, y guarda la red en formato binario."""
+    metadatos = {
+        "orden_bytes": sys.byteorder,
+        "dirigido": grafo.es_dirigido,
+        "claves": grafo.claves,
+        "datos": grafo.datos,
+        "ciudades": ciudades,
+        "fuentes": _describir_fuentes(fuentes),
+    }
+    texto = json.dumps(metadatos).encode("utf-8")
+    n, m = len(grafo), len(grafo.destinos)
+    with open(ruta, "wb") as archivo:
+        archivo.write(ENCABEZADO.pack(MAGIA, VERSION, grafo.columnas, n, m, len(texto)))
+        arreglos = [grafo.inicio, grafo.destinos] + list(grafo.pesos)
+        for arreglo in arreglos:
+            datos = bytes(arreglo)
+            archivo.write(datos)
+            archivo.write(b"\0" * (_alinear(len(datos)) - len(datos)))
+        archivo.write(texto)
+
+def cargar_instantanea(ruta):
+    """Recibe la ruta de una instantánea y devuelve un par (grafo,
+    ciudades). Los arreglos del grafo se leen directamente del archivo
+    mapeado en memoria, sin copiarlos. Levanta ValueError si el archivo
+    no es una instantánea válida o si los archivos de origen son más
+    nuevos que ella."""
+    with open(ruta, "rb") as archivo:
+        mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapa) < ENCABEZADO.size:
+        raise ValueError("El archivo no es una instantánea válida")
+    magia, version, columnas, n, m, largo_texto = ENCABEZADO.unpack_from(mapa, 0)
+    if magia != MAGIA or version != VERSION:
+        raise ValueError("El archivo no es una instantánea válida")
+    vista = memoryview(mapa)
+    posicion = _alinear(ENCABEZADO.size)
+    arreglos = []
+    for tipo, cantidad in [(TIPO_INICIO, n + 1), (TIPO_VERTICE, m)] + [(TIPO_PESO, m)] * columnas:
+        largo = cantidad * struct.calcsize(tipo)
+        arreglos.append(vista[posicion:posicion + largo].cast(tipo))
+        posicion += _alinear(largo)
+    metadatos = json.loads(bytes(vista[posicion:posicion + largo_texto]).decode("utf-8"))
+    if metadatos["orden_bytes"] != sys.byteorder:
+        raise ValueError("La instantánea fue generada en otra arquitectura")
+    if esta_desactualizada(metadatos["fuentes"]):
+        raise ValueError("La instantánea está desactualizada")
+    inicio, destinos, pesos = arreglos[0], arreglos[1], arreglos[2:]
+    grafo = GrafoCompacto.desde_arreglos(metadatos["claves"], metadatos["datos"],
+                                         inicio, destinos, pesos, metadatos["dirigido"])
+    return grafo, metadatos["ciudades"]
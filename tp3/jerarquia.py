@@ -0,0 +1,382 @@
+import os
+import json
+import zlib
+import struct
+from array import array
+from heapq import heappush, heappop
+from bisect import bisect_left
+from grafo_compacto import compactar, TIPO_INICIO, TIPO_VERTICE, TIPO_PESO
+
+INFINITO = float("inf")
+# Cantidad máxima de vértices que visita cada búsqueda de testigos al
+# contraer un vértice; con un límite menor el preprocesamiento es más
+# rápido pero agrega atajos innecesarios
+MAX_VISITADOS_TESTIGO = 20
+# Grado a partir del cual se deja de contraer: los vértices restantes
+# forman un núcleo que las consultas recorren con Dijkstra bidireccional.
+# En las redes libres de escala (como las del generador) contraer más
+# allá hace crecer el grado del resto y los atajos de manera cuadrática,
+# sin acelerar las consultas
+GRADO_NUCLEO = 6
+SIN_ATAJO = -1
+
+MAGIA = b"FLYCOMBI-CH"
+VERSION = 2
+# Magia, versión, peso, vértices, aristas ascendentes y huella de la red
+# (aristas y suma de control de destinos y pesos)
+ENCABEZADO = struct.Struct("<11sIqqqqI")
+
+class JerarquiaContracciones:
+    """Jerarquía de contracciones sobre un grafo no dirigido, para uno
+    de sus pesos. Cada vértice tiene un rango (el orden en que fue
+    contraído), y se guardan sólo las aristas que van de cada vértice a
+    otros de mayor rango, incluyendo los atajos agregados al contraer.
+    Un atajo recuerda el vértice intermedio que reemplaza, lo que
+    permite reconstruir el camino original. Los vértices del núcleo (los
+    que no se contrajeron) comparten el rango máximo y guardan todas sus
+    aristas hacia otros vértices del núcleo."""
+
+    def __init__(self, claves, peso, rango, inicio, destinos, pesos, intermedios, huella):
+        """Constructor de la clase JerarquiaContracciones. Recibe las
+        claves de los vértices (en orden de id), el índice del peso,
+        el rango de cada vértice, los arreglos CSR del grafo ascendente,
+        con el vértice intermedio de cada arista (o SIN_ATAJO), y la
+        huella de la red sobre la que se construyó (ver huella_red)."""
+        self.claves = claves
+        self.indices = {clave: i for i, clave in enumerate(claves)}
+        self.peso = peso
+        self.rango = rango
+        self.inicio = inicio
+        self.destinos = destinos
+        self.pesos = pesos
+        self.intermedios = intermedios
+        self.huella = huella
+        self.rango_nucleo = max(rango, default=0)
+
+    def _buscar(self, origenes, destinos):
+        """Busca el mejor camino entre los orígenes y los destinos en dos
+        etapas. Primero aplica Dijkstra sobre el grafo ascendente desde
+        ambos extremos sin entrar al núcleo: cada búsqueda se detiene
+        cuando su próxima distancia no puede mejorar el mejor encuentro,
+        y las aristas hacia el núcleo sólo dejan etiquetados a sus
+        vértices. Después aplica Dijkstra bidireccional dentro del
+        núcleo (que guarda todas sus aristas internas) partiendo de esas
+        etiquetas, hasta que la suma de las próximas distancias de ambos
+        lados no puede mejorar el mejor encuentro. Devuelve el vértice
+        de encuentro (o None), la distancia total y los diccionarios de
+        padres de ambas búsquedas."""
+        inicio, destinos_arriba, pesos = self.inicio, self.destinos, self.pesos
+        rango, nucleo = self.rango, self.rango_nucleo
+        distancias, padres = ({}, {}), ({}, {})
+        colas, etiquetados = ([], []), ([], [])
+        for lado, extremos in enumerate((origenes, destinos)):
+            for v in extremos:
+                distancias[lado][v] = 0
+                padres[lado][v] = None
+                (etiquetados if rango[v] == nucleo else colas)[lado].append((0, v))
+        mejor, encuentro = INFINITO, None
+        for v in distancias[0]:
+            if v in distancias[1]:
+                mejor, encuentro = 0, v
+        for etapa in (0, 1):
+            if etapa == 1:
+                # Dentro del núcleo ambas búsquedas recorren el mismo
+                # grafo no dirigido, así que vale el corte bidireccional
+                colas = etiquetados
+                for cola in colas:
+                    cola.sort()
+            while colas[0] or colas[1]:
+                if etapa == 0:
+                    if all(not cola or cola[0][0] >= mejor for cola in colas):
+                        break
+                elif not colas[0] or not colas[1] or colas[0][0][0] + colas[1][0][0] >= mejor:
+                    break
+                # Avanza la búsqueda con la menor distancia pendiente
+                lado = 0 if colas[0] and (not colas[1] or colas[0][0][0] <= colas[1][0][0]) else 1
+                d, v = heappop(colas[lado])
+                propias, ajenas = distancias[lado], distancias[1 - lado]
+                if d > propias[v]:
+                    continue
+                for k in range(inicio[v], inicio[v + 1]):
+                    w = destinos_arriba[k]
+                    nueva = d + pesos[k]
+                    if nueva < propias.get(w, INFINITO):
+                        propias[w] = nueva
+                        padres[lado][w] = v
+                        if etapa == 0 and rango[w] == nucleo:
+                            etiquetados[lado].append((nueva, w))
+                        else:
+                            heappush(colas[lado], (nueva, w))
+                        if w in ajenas and nueva + ajenas[w] < mejor:
+                            mejor, encuentro = nueva + ajenas[w], w
+        return encuentro, mejor, padres
+
+    def _intermedio(self, u, w):
+        """Devuelve el vértice intermedio de la arista entre u y w, que
+        se guarda en el extremo de menor rango."""
+        if self.rango[u] > self.rango[w]:
+            u, w = w, u
+        bajo, alto = self.inicio[u], self.inicio[u + 1]
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self.destinos[medio] < w:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return self.intermedios[bajo]
+
+    def _desempaquetar(self, camino):
+        """Recibe un camino que puede contener atajos y devuelve el
+        camino equivalente en el grafo original."""
+        resultado = [camino[0]]
+        pila = [(camino[i], camino[i + 1]) for i in range(len(camino) - 2, -1, -1)]
+        while pila:
+            u, w = pila.pop()
+            medio = self._intermedio(u, w)
+            if medio == SIN_ATAJO:
+                resultado.append(w)
+            else:
+                pila.append((medio, w))
+                pila.append((u, medio))
+        return resultado
+
+    def camino_minimo(self, origenes, destinos):
+        """Recibe una lista de claves origen y una de claves destino, y
+        devuelve un par (camino, distancia) con el mejor camino entre
+        algún origen y algún destino, o (None, INFINITO) si no hay."""
+        encuentro, mejor, (padres_ida, padres_vuelta) = self._buscar(
+            [self.indices[v] for v in origenes], [self.indices[v] for v in destinos])
+        if encuentro is None:
+            return None, INFINITO
+        camino = []
+        v = encuentro
+        while v is not None:
+            camino.append(v)
+            v = padres_ida[v]
+        camino.reverse()
+        v = padres_vuelta[encuentro]
+        while v is not None:
+            camino.append(v)
+            v = padres_vuelta[v]
+        return [self.claves[v] for v in self._desempaquetar(camino)], mejor
+
+def huella_red(grafo, peso):
+    """Recibe un grafo y el índice de un peso, y devuelve el par
+    (aristas, suma) con la cantidad de aristas del grafo y una suma de
+    control CRC32 de sus destinos y de esa columna de pesos, que
+    identifica la red para la que se construyó una jerarquía."""
+    compacto = compactar(grafo)
+    suma = zlib.crc32(compacto.destinos)
+    return len(compacto.destinos), zlib.crc32(compacto.pesos[peso], suma)
+
+def _testigos(vecinos, u, excluido, objetivos, limite):
+    """Aplica Dijkstra desde u sin pasar por el vértice excluido, hasta
+    asentar todos los objetivos, superar la distancia límite o visitar
+    MAX_VISITADOS_TESTIGO vértices, y devuelve las distancias
+    encontradas."""
+    distancias = {u: 0}
+    q = [(0, u)]
+    pendientes = len(objetivos)
+    visitados = 0
+    while q and visitados < MAX_VISITADOS_TESTIGO:
+        d, x = heappop(q)
+        if d > distancias[x]:
+            continue
+        if x in objetivos:
+            pendientes -= 1
+            if pendientes == 0:
+                break
+        visitados += 1
+        for y, (peso, _) in vecinos[x].items():
+            if y == excluido:
+                continue
+            nueva = d + peso
+            if nueva <= limite and nueva < distancias.get(y, INFINITO):
+                distancias[y] = nueva
+                heappush(q, (nueva, y))
+    return distancias
+
+def _atajos(vecinos, v):
+    """Devuelve la lista de atajos (u, w, peso) necesarios para
+    contraer el vértice v: uno por cada par de vecinos entre los que la
+    búsqueda de testigos acotada no encuentra un camino igual o más
+    corto que evite a v."""
+    atajos = []
+    adyacentes = list(vecinos[v].items())
+    for i in range(len(adyacentes) - 1):
+        u, (peso_u, _) = adyacentes[i]
+        restantes = adyacentes[i + 1:]
+        objetivos = {w for w, _ in restantes}
+        limite = peso_u + max(peso_w for _, (peso_w, _) in restantes)
+        distancias = _testigos(vecinos, u, v, objetivos, limite)
+        for w, (peso_w, _) in restantes:
+            if distancias.get(w, INFINITO) > peso_u + peso_w:
+                atajos.append((u, w, peso_u + peso_w))
+    return atajos
+
+def _prioridad(vecinos, contraidos, niveles, v):
+    """Devuelve el par (prioridad, atajos) de contracción de v. La
+    prioridad es la diferencia entre los atajos que agrega y las aristas
+    que elimina, más la cantidad de vecinos ya contraídos y el nivel de
+    v en la jerarquía, para contraer el grafo de manera uniforme y
+    mantenerla poco profunda. Si v supera GRADO_NUCLEO no se buscan
+    testigos: se supone que agrega un atajo por cada par de vecinos, y
+    atajos es None."""
+    grado = len(vecinos[v])
+    if grado > GRADO_NUCLEO:
+        atajos, cantidad = None, grado * (grado - 1) // 2
+    else:
+        atajos = _atajos(vecinos, v)
+        cantidad = len(atajos)
+    return cantidad - grado + contraidos[v] + niveles[v], atajos
+
+def construir_jerarquia(grafo, peso):
+    """Recibe un grafo no dirigido y el índice del peso a utilizar, y
+    devuelve su JerarquiaContracciones. Los vértices se contraen de a
+    uno, eligiendo siempre el de menor prioridad, y se agregan atajos
+    cuando no hay un camino testigo igual o más corto que evite al
+    vértice contraído. Las prioridades se actualizan de manera perezosa:
+    al desencolar un vértice se recalcula sólo la suya, y si dejó de ser
+    la menor se lo vuelve a encolar. La contracción se detiene cuando el
+    vértice elegido supera GRADO_NUCLEO."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    inicio, destinos, pesos = compacto.inicio, compacto.destinos, compacto.pesos[peso]
+    vecinos = [{} for _ in range(n)]
+    for v in range(n):
+        for k in range(inicio[v], inicio[v + 1]):
+            w = destinos[k]
+            if w != v:
+                vecinos[v][w] = (pesos[k], SIN_ATAJO)
+    contraidos, niveles = [0] * n, [0] * n
+    prioridades = [_prioridad(vecinos, contraidos, niveles, v)[0] for v in range(n)]
+    q = [(prioridad, v) for v, prioridad in enumerate(prioridades)]
+    q.sort()
+    rango = array(TIPO_VERTICE, [0]) * n
+    ascendentes = [None] * n
+    siguiente = 0
+    while q:
+        prioridad, v = heappop(q)
+        if ascendentes[v] is not None or prioridad != prioridades[v]:
+            # Entrada vieja: el vértice ya se contrajo o cambió su prioridad
+            continue
+        prioridades[v], atajos = _prioridad(vecinos, contraidos, niveles, v)
+        if q and prioridades[v] > q[0][0]:
+            heappush(q, (prioridades[v], v))
+            continue
+        if atajos is None:
+            break
+        for u, w, distancia in atajos:
+            if distancia < vecinos[u].get(w, (INFINITO, None))[0]:
+                vecinos[u][w] = (distancia, v)
+                vecinos[w][u] = (distancia, v)
+        rango[v] = siguiente
+        siguiente += 1
+        ascendentes[v] = vecinos[v]
+        for u in vecinos[v]:
+            del vecinos[u][v]
+            contraidos[u] += 1
+            niveles[u] = max(niveles[u], niveles[v] + 1)
+        vecinos[v] = {}
+    for v in range(n):
+        if ascendentes[v] is None:
+            rango[v] = siguiente
+            ascendentes[v] = vecinos[v]
+    arriba_inicio = array(TIPO_INICIO, [0])
+    arriba_destinos = array(TIPO_VERTICE)
+    arriba_pesos = array(TIPO_PESO)
+    intermedios = array(TIPO_VERTICE)
+    for v in range(n):
+        for w in sorted(ascendentes[v]):
+            distancia, medio = ascendentes[v][w]
+            arriba_destinos.append(w)
+            arriba_pesos.append(distancia)
+            intermedios.append(medio)
+        arriba_inicio.append(len(arriba_destinos))
+    return JerarquiaContracciones(list(compacto.claves), peso, rango, arriba_inicio, arriba_destinos,
+                                  arriba_pesos, intermedios, huella_red(compacto, peso))
+
+def guardar_jerarquia(jerarquia, ruta):
+    """Recibe una JerarquiaContracciones y la guarda en la ruta dada."""
+    texto = json.dumps(jerarquia.claves).encode("utf-8")
+    n, m = len(jerarquia.claves), len(jerarquia.destinos)
+    with open(ruta, "wb") as archivo:
+        archivo.write(ENCABEZADO.pack(MAGIA, VERSION, jerarquia.peso, n, m, *jerarquia.huella))
+        for arreglo in (jerarquia.rango, jerarquia.inicio, jerarquia.destinos,
+                        jerarquia.pesos, jerarquia.intermedios):
+            arreglo.tofile(archivo)
+        archivo.write(texto)
+
+def _validar_arreglos(n, m, rango, inicio, destinos, pesos, intermedios):
+    """Recibe los arreglos leídos de un archivo de jerarquía y levanta
+    ValueError si los índices que guardan no son coherentes entre sí,
+    para que un archivo dañado no provoque errores ni ciclos infinitos
+    en las consultas. Cada atajo debe reemplazar a un vértice de menor
+    rango que sus extremos, que tenga a ambos entre sus aristas."""
+    invalido = ValueError("El archivo no es una jerarquía válida")
+    if inicio[0] != 0 or inicio[n] != m:
+        raise invalido
+    if n and (min(rango) < 0 or max(rango) > n):
+        raise invalido
+    if m and (min(destinos) < 0 or max(destinos) >= n
+              or min(intermedios) < SIN_ATAJO or max(intermedios) >= n):
+        raise invalido
+    for u in range(n):
+        desde, hasta = inicio[u], inicio[u + 1]
+        if desde > hasta:
+            raise invalido
+        for i in range(desde, hasta):
+            if i > desde and destinos[i - 1] >= destinos[i]:
+                raise invalido
+            medio = intermedios[i]
+            if medio == SIN_ATAJO:
+                continue
+            w = destinos[i]
+            if rango[medio] >= rango[u] or rango[medio] >= rango[w]:
+                raise invalido
+            fila = destinos[inicio[medio]:inicio[medio + 1]]
+            for x in (u, w):
+                j = bisect_left(fila, x)
+                if j == len(fila) or fila[j] != x:
+                    raise invalido
+
+def cargar_jerarquia(ruta, grafo):
+    """Recibe la ruta de una jerarquía guardada con guardar_jerarquia y
+    el grafo sobre el que se la va a utilizar, y la devuelve. Levanta
+    ValueError si el archivo no es válido (incluso si está truncado o
+    dañado) o no corresponde al grafo: si difieren sus vértices, sus
+    aristas o los pesos."""
+    with open(ruta, "rb") as archivo:
+        encabezado = archivo.read(ENCABEZADO.size)
+        if len(encabezado) < ENCABEZADO.size:
+            raise ValueError("El archivo no es una jerarquía válida")
+        magia, version, peso, n, m, aristas, suma = ENCABEZADO.unpack(encabezado)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError("El archivo no es una jerarquía válida")
+        if n < 0 or m < 0 or aristas < 0:
+            raise ValueError("El archivo no es una jerarquía válida")
+        if not 0 <= peso < compactar(grafo).columnas or n != len(grafo):
+            raise ValueError("La jerarquía no corresponde a la red cargada")
+        tipos = [(TIPO_VERTICE, n), (TIPO_INICIO, n + 1), (TIPO_VERTICE, m),
+                 (TIPO_PESO, m), (TIPO_VERTICE, m)]
+        # Se verifica el tamaño antes de leer, para no reservar arreglos
+        # enormes a partir de un encabezado dañado
+        necesario = sum(array(tipo).itemsize * cantidad for tipo, cantidad in tipos)
+        if os.fstat(archivo.fileno()).st_size - ENCABEZADO.size < necesario:
+            raise ValueError("El archivo no es una jerarquía válida")
+        arreglos = []
+        for tipo, cantidad in tipos:
+            arreglo = array(tipo)
+            try:
+                arreglo.fromfile(archivo, cantidad)
+            except EOFError:
+                raise ValueError("El archivo no es una jerarquía válida")
+            arreglos.append(arreglo)
+        try:
+            claves = json.loads(archivo.read().decode("utf-8"))
+        except ValueError:
+            raise ValueError("El archivo no es una jerarquía válida")
+    _validar_arreglos(n, m, *arreglos)
+    if claves != list(grafo) or huella_red(grafo, peso) != (aristas, suma):
+        raise ValueError("La jerarquía no corresponde a la red cargada")
+    return JerarquiaContracciones(claves, peso, *arreglos, (aristas, suma))
@@ -0,0 +1,75 @@
+import io
+import zipfile
+
+# Cantidad de fragmentos de texto que se acumulan antes de escribirlos
+FRAGMENTOS_POR_ESCRITURA = 8192
+# Nombre del documento kml dentro de un archivo kmz
+DOCUMENTO_KMZ = "doc.kml"
+
+ENCABEZADO = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<kml xmlns="http://www.opengis.net/kml/2.2">\n'
+              '    <Document>\n'
+              '        <Style id="ruta">\n'
+              '            <LineStyle>\n'
+              '                <width>2</width>\n'
+              '            </LineStyle>\n'
+              '        </Style>\n')
+PIE = ('    </Document>\n'
+       '</kml>\n')
+PUNTO = ('        <Placemark>\n'
+         '            <name>{}</name>\n'
+         '            <Point>\n'
+         '                <coordinates>{}</coordinates>\n'
+         '            </Point>\n'
+         '        </Placemark>\n')
+LINEA = ('        <Placemark>\n'
+         '            <styleUrl>#ruta</styleUrl>\n'
+         '            <LineString>\n'
+         '                <coordinates>{} {}</coordinates>\n'
+         '            </LineString>\n'
+         '        </Placemark>\n')
+
+def segmentos_recorrido(recorrido):
+    """Recibe un recorrido, que puede ser una lista de vértices (un
+    camino) o una lista de pares (origen, destino), y devuelve un
+    generador de sus segmentos como pares (origen, destino)."""
+    anterior = None
+    for i, elemento in enumerate(recorrido):
+        if isinstance(elemento, tuple):
+            yield elemento
+            continue
+        if i > 0:
+            yield anterior, elemento
+        anterior = elemento
+
+def escribir_kml(grafo, segmentos, archivo):
+    """Recibe un grafo cuyos datos son las coordenadas de cada vértice,
+    un iterable de segmentos (origen, destino) y un archivo de texto, y
+    escribe en él el documento kml. Cada vértice tiene un único punto,
+    escrito la primera vez que aparece, y todas las líneas comparten el
+    mismo estilo. La salida se acumula y se escribe en bloques grandes."""
+    coordenadas = {}
+    partes = [ENCABEZADO]
+    for origen, destino in segmentos:
+        for v in (origen, destino):
+            if v not in coordenadas:
+                coordenadas[v] = grafo.obtener_dato(v)
+                partes.append(PUNTO.format(v, coordenadas[v]))
+        partes.append(LINEA.format(coordenadas[origen], coordenadas[destino]))
+        if len(partes) >= FRAGMENTOS_POR_ESCRITURA:
+            archivo.write("".join(partes))
+            partes = []
+    partes.append(PIE)
+    archivo.write("".join(partes))
+
+def exportar_kml(grafo, segmentos, ruta):
+    """Recibe un grafo, un iterable de segmentos (origen, destino) y la
+    ruta del archivo a generar, y exporta a él los segmentos. Si la ruta
+    termina en .kmz el documento se comprime mientras se escribe."""
+    if not ruta.lower().endswith(".kmz"):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            escribir_kml(grafo, segmentos, archivo)
+        return
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as kmz:
+        with io.TextIOWrapper(kmz.open(DOCUMENTO_KMZ, "w"), encoding="utf-8") as documento:
+            escribir_kml(grafo, segmentos, documento)
@@ -0,0 +1,186 @@
+from array import array
+from heapq import heappush, heappop
+from grafo_compacto import compactar
+
+INFINITO = float("inf")
+# Cantidad de landmarks por defecto
+CANTIDAD_LANDMARKS = 8
+# Métodos de selección de landmarks
+LEJANOS = "lejanos"
+GRADO = "grado"
+
+def _distancias_desde(compacto, peso, origen):
+    """Aplica Dijkstra desde origen sobre los arreglos CSR y devuelve
+    un arreglo con la distancia a cada vértice (INFINITO si no es
+    alcanzable)."""
+    inicio, destinos, pesos = compacto.inicio, compacto.destinos, compacto.pesos[peso]
+    distancias = array("d", [INFINITO]) * len(compacto)
+    distancias[origen] = 0
+    q = [(0, origen)]
+    while q:
+        d, v = heappop(q)
+        if d > distancias[v]:
+            continue
+        for k in range(inicio[v], inicio[v + 1]):
+            w = destinos[k]
+            nueva = d + pesos[k]
+            if nueva < distancias[w]:
+                distancias[w] = nueva
+                heappush(q, (nueva, w))
+    return distancias
+
+class Landmarks:
+    """Motor de caminos mínimos A* con landmarks (ALT) para un grafo no
+    dirigido y uno de sus pesos. Guarda la distancia desde un conjunto
+    chico de vértices (landmarks) a todos los demás; por la desigualdad
+    triangular, |d(L, t) - d(L, v)| es una cota inferior de la distancia
+    entre v y t, que guía la búsqueda hacia el destino."""
+
+    def __init__(self, grafo, peso, cantidad=CANTIDAD_LANDMARKS, metodo=LEJANOS):
+        """Constructor de la clase Landmarks. Recibe un grafo no
+        dirigido, el índice del peso, la cantidad de landmarks y el
+        método para elegirlos: LEJANOS (cada uno es el vértice más
+        alejado de los anteriores) o GRADO (los de mayor grado)."""
+        self.grafo = compactar(grafo)
+        self.peso = peso
+        self.distancias = []
+        n = len(self.grafo)
+        cantidad = min(cantidad, n)
+        if metodo == GRADO:
+            elegidos = sorted(range(n), key=self.grafo.grado, reverse=True)[:cantidad]
+            for v in elegidos:
+                self.distancias.append(_distancias_desde(self.grafo, peso, v))
+        elif metodo == LEJANOS:
+            self._elegir_lejanos(cantidad)
+        else:
+            raise ValueError("Método de selección de landmarks desconocido")
+
+    def __getstate__(self):
+        """Devuelve el estado a serializar, sin el grafo: puede estar en
+        memoria compartida (al construir los landmarks en un proceso
+        trabajador) y quien los recibe ya lo tiene. Se le debe asignar
+        con usar_grafo antes de consultarlos."""
+        estado = self.__dict__.copy()
+        estado["grafo"] = None
+        return estado
+
+    def usar_grafo(self, grafo):
+        """Recibe el grafo sobre el que se construyeron los landmarks
+        (con los mismos ids de vértices) y lo utiliza en las consultas."""
+        self.grafo = compactar(grafo)
+
+    def _elegir_lejanos(self, cantidad):
+        """Elige los landmarks de a uno: el primero es el vértice más
+        alejado del de mayor grado (que suele estar en la componente más
+        grande), y cada uno de los siguientes es el que maximiza la
+        distancia al landmark más cercano, sin repetir. Los vértices que
+        ningún landmark alcanza están infinitamente lejos, pero se eligen
+        recién cuando no quedan alcanzados, empezando por el de mayor
+        grado: un landmark en otra componente no acota las distancias de
+        la principal, y uno en un vértice aislado no acota ninguna."""
+        grafo = self.grafo
+        n = len(grafo)
+        if not n:
+            return
+        cercania = _distancias_desde(grafo, self.peso, max(range(n), key=grafo.grado))
+        elegidos = set()
+        for _ in range(cantidad):
+            lejano, maximo = None, None
+            for v in range(n):
+                if v in elegidos:
+                    continue
+                alcanzado = cercania[v] != INFINITO
+                clave = (alcanzado, cercania[v] if alcanzado else grafo.grado(v))
+                if maximo is None or clave > maximo:
+                    lejano, maximo = v, clave
+            elegidos.add(lejano)
+            distancias = _distancias_desde(grafo, self.peso, lejano)
+            self.distancias.append(distancias)
+            for v in range(n):
+                cercania[v] = min(cercania[v], distancias[v])
+
+    def _intervalos(self, objetivos):
+        """Recibe un conjunto de ids objetivo y devuelve, para cada
+        landmark, una tupla (distancias, minimo, maximo, separados) con
+        sus distancias, la menor y la mayor distancia a los objetivos que
+        alcanza (None si no alcanza ninguno) y si alguno no lo alcanza.
+        Se calcula una vez por búsqueda, para que cada cota cueste una
+        operación por landmark."""
+        intervalos = []
+        for distancias in self.distancias:
+            alcanzados = [distancias[t] for t in objetivos if distancias[t] != INFINITO]
+            separados = len(alcanzados) < len(objetivos)
+            if alcanzados:
+                intervalos.append((distancias, min(alcanzados), max(alcanzados), separados))
+            else:
+                intervalos.append((distancias, None, None, separados))
+        return intervalos
+
+    def _cota(self, v, intervalos):
+        """Devuelve una cota inferior de la distancia entre v y el más
+        cercano de los objetivos (ver _intervalos), o INFINITO si ninguno
+        es alcanzable: para cada landmark, la distancia de d(L, v) al
+        intervalo de las d(L, t)."""
+        cota = 0
+        for distancias, minimo, maximo, separados in intervalos:
+            desde_v = distancias[v]
+            if desde_v == INFINITO:
+                if not separados:
+                    # Todos los objetivos alcanzan al landmark y v no:
+                    # están en distintas componentes
+                    return INFINITO
+                continue
+            if minimo is None:
+                return INFINITO
+            if desde_v < minimo:
+                cota = max(cota, minimo - desde_v)
+            elif desde_v > maximo:
+                cota = max(cota, desde_v - maximo)
+        return cota
+
+    def camino_minimo(self, origenes, destinos):
+        """Recibe una lista de claves origen y una de claves destino, y
+        aplica A* desde todos los orígenes a la vez. Devuelve un par
+        (camino, distancia) con el mejor camino entre algún origen y
+        algún destino, o (None, INFINITO) si no hay."""
+        grafo = self.grafo
+        inicio, destinos_csr, pesos = grafo.inicio, grafo.destinos, grafo.pesos[self.peso]
+        objetivos = set(grafo.indice(v) for v in destinos)
+        intervalos = self._intervalos(objetivos)
+        distancias, padres, cotas = {}, {}, {}
+        q = []
+        for clave in origenes:
+            v = grafo.indice(clave)
+            cotas[v] = self._cota(v, intervalos)
+            if cotas[v] == INFINITO:
+                continue
+            distancias[v] = 0
+            padres[v] = None
+            heappush(q, (cotas[v], v))
+        visitados = set()
+        while q:
+            _, v = heappop(q)
+            if v in visitados:
+                continue
+            visitados.add(v)
+            if v in objetivos:
+                camino = []
+                w = v
+                while w is not None:
+                    camino.append(grafo.clave(w))
+                    w = padres[w]
+                camino.reverse()
+                return camino, distancias[v]
+            for k in range(inicio[v], inicio[v + 1]):
+                w = destinos_csr[k]
+                nueva = distancias[v] + pesos[k]
+                if nueva >= distancias.get(w, INFINITO):
+                    continue
+                if w not in cotas:
+                    cotas[w] = self._cota(w, intervalos)
+                if cotas[w] == INFINITO:
+                    continue
+                distancias[w] = nueva
+                padres[w] = v
+                heappush(q, (nueva + cotas[w], w))
+        return None, INFINITO
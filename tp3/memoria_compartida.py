@@ -0,0 +1,180 @@
+import os
+from array import array
+from functools import reduce
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from grafo_compacto import GrafoCompacto, compactar, transpuesta, TIPO_INICIO, TIPO_VERTICE, TIPO_PESO
+
+# Cantidad de bloques de fuentes por proceso, para balancear la carga
+BLOQUES_POR_PROCESO = 4
+# Alineación en bytes de cada arreglo dentro de la memoria compartida
+ALINEACION = 8
+
+# Red compartida a la que se adjunta cada proceso del pool al iniciarlo
+_red = None
+
+class RedCompartida:
+    """Arreglos CSR de un grafo (inicio, destinos, cada columna de pesos
+    y, si es dirigido, los de su transpuesta) y sus claves, guardados en
+    un único bloque de multiprocessing.shared_memory. Los demás procesos
+    se adjuntan al bloque con el descriptor, sin copiar los arreglos: el
+    descriptor sólo tiene el nombre del bloque y la posición de cada
+    arreglo, así que su tamaño no depende del grafo."""
+
+    def __init__(self, memoria, descriptor, propia):
+        """Constructor de la clase RedCompartida. Recibe el bloque de
+        memoria, su descriptor y si este proceso es el dueño del bloque
+        (el que lo libera). Usar exportar_red o RedCompartida.adjuntar."""
+        self.memoria = memoria
+        self.descriptor = descriptor
+        self.propia = propia
+        self.n = descriptor["n"]
+        self.es_dirigido = descriptor["dirigido"]
+        self.arreglos = {}
+        for nombre, (desplazamiento, tipo, cantidad) in descriptor["arreglos"].items():
+            tamanio = array(tipo).itemsize * cantidad
+            vista = memoria.buf[desplazamiento:desplazamiento + tamanio]
+            self.arreglos[nombre] = vista.cast(tipo)
+        self.inicio = self.arreglos["inicio"]
+        self.destinos = self.arreglos["destinos"]
+        self.pesos = [self.arreglos["pesos{}".format(i)] for i in range(descriptor["columnas"])]
+        self.indices = None
+        self._grafo = None
+
+    @classmethod
+    def adjuntar(cls, descriptor):
+        """Recibe el descriptor de una RedCompartida creada en otro
+        proceso y devuelve una RedCompartida que usa el mismo bloque."""
+        # Los procesos del pool comparten el registro de recursos del
+        # proceso dueño, que es quien elimina el bloque
+        return cls(SharedMemory(descriptor["nombre"]), descriptor, False)
+
+    def clave(self, i):
+        """Recibe el id de un vértice y devuelve su clave."""
+        posiciones = self.arreglos["posiciones_claves"]
+        texto = self.arreglos["claves"][posiciones[i]:posiciones[i + 1]]
+        return bytes(texto).decode("utf-8")
+
+    def indice(self, clave):
+        """Recibe la clave de un vértice y devuelve su id. El diccionario
+        de claves se arma recién en la primera consulta."""
+        if self.indices is None:
+            self.indices = {self.clave(i): i for i in range(self.n)}
+        return self.indices[clave]
+
+    def grafo(self):
+        """Devuelve un GrafoCompacto que usa los arreglos de la memoria
+        compartida sin copiarlos, cuyas claves son los ids de los
+        vértices, para aplicarle las funciones de biblioteca. Se arma
+        una única vez por proceso."""
+        if self._grafo is None:
+            self._grafo = GrafoCompacto.desde_arreglos(
+                list(range(self.n)), [None] * self.n, self.inicio, self.destinos,
+                self.pesos, self.es_dirigido)
+        return self._grafo
+
+    def preparada(self, peso=None):
+        """Recibe opcionalmente el índice del peso a utilizar y devuelve
+        la tupla (n, inicio, destinos, pesos, inicio_t, destinos_t,
+        pesos_t) que usan los algoritmos de centralidad, sobre las
+        vistas de la memoria compartida."""
+        pesos = self.pesos[peso] if peso is not None else None
+        if not self.es_dirigido:
+            return self.n, self.inicio, self.destinos, pesos, self.inicio, self.destinos, pesos
+        pesos_t = self.arreglos["pesos_t{}".format(peso)] if peso is not None else None
+        return (self.n, self.inicio, self.destinos, pesos,
+                self.arreglos["inicio_t"], self.arreglos["destinos_t"], pesos_t)
+
+    def cerrar(self):
+        """Libera las vistas y se desadjunta del bloque. Si este proceso
+        es el dueño, además lo elimina."""
+        self._grafo = None
+        for vista in self.arreglos.values():
+            vista.release()
+        self.arreglos = {}
+        self.memoria.close()
+        if self.propia:
+            self.memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+def exportar_red(grafo):
+    """Recibe un grafo y copia sus arreglos CSR y sus claves a un bloque
+    de memoria compartida nuevo. Devuelve la RedCompartida dueña del
+    bloque, que debe cerrarse (o usarse con with) para liberarlo."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    texto = bytearray()
+    posiciones = array(TIPO_INICIO, [0])
+    for clave in compacto.claves:
+        texto += str(clave).encode("utf-8")
+        posiciones.append(len(texto))
+    arreglos = [("inicio", compacto.inicio, TIPO_INICIO),
+                ("destinos", compacto.destinos, TIPO_VERTICE)]
+    columnas = compacto.pesos
+    arreglos += [("pesos{}".format(i), pesos, TIPO_PESO) for i, pesos in enumerate(columnas)]
+    if compacto.es_dirigido:
+        inicio_t, destinos_t, columnas_t = transpuesta(n, compacto.inicio, compacto.destinos, columnas)
+        arreglos += [("inicio_t", inicio_t, TIPO_INICIO), ("destinos_t", destinos_t, TIPO_VERTICE)]
+        arreglos += [("pesos_t{}".format(i), pesos, TIPO_PESO) for i, pesos in enumerate(columnas_t)]
+    arreglos += [("posiciones_claves", posiciones, TIPO_INICIO), ("claves", texto, "B")]
+    ubicaciones = {}
+    total = 0
+    for nombre, datos, tipo in arreglos:
+        ubicaciones[nombre] = (total, tipo, len(datos))
+        tamanio = array(tipo).itemsize * len(datos)
+        total += (tamanio + ALINEACION - 1) // ALINEACION * ALINEACION
+    memoria = SharedMemory(create=True, size=max(total, 1))
+    for nombre, datos, tipo in arreglos:
+        desplazamiento = ubicaciones[nombre][0]
+        crudo = memoryview(datos).cast("B")
+        memoria.buf[desplazamiento:desplazamiento + len(crudo)] = crudo
+    descriptor = {"nombre": memoria.name, "n": n, "dirigido": compacto.es_dirigido,
+                  "columnas": len(columnas), "arreglos": ubicaciones}
+    return RedCompartida(memoria, descriptor, True)
+
+def _iniciar_trabajador(descriptor):
+    """Adjunta el proceso trabajador a la red compartida."""
+    global _red
+    _red = RedCompartida.adjuntar(descriptor)
+
+def _ejecutar_bloque(trabajo):
+    """Ejecuta una tarea (tarea, fuentes, argumentos) sobre la red
+    compartida en un proceso trabajador."""
+    tarea, fuentes, argumentos = trabajo
+    return tarea(_red, fuentes, *argumentos)
+
+def ejecutar_por_fuentes(red, tarea, fuentes, reducir, argumentos=(), procesos=None):
+    """Recibe una RedCompartida, una tarea, una lista de ids de vértices
+    fuente, una función que combina dos resultados parciales y
+    opcionalmente argumentos extra para la tarea y la cantidad de
+    procesos (por defecto, uno por procesador). La tarea debe ser una
+    función de módulo tarea(red, fuentes, *argumentos). Reparte las
+    fuentes en bloques intercalados entre los procesos, que se adjuntan
+    a la red al iniciar, y devuelve la combinación de los resultados."""
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    if procesos <= 1:
+        return tarea(red, fuentes, *argumentos)
+    bloques = procesos * BLOQUES_POR_PROCESO
+    # Fuentes intercaladas, para que cada bloque tenga una mezcla
+    # de vértices de distinto grado
+    trabajos = [(tarea, fuentes[i::bloques], argumentos) for i in range(bloques)]
+    with Pool(procesos, _iniciar_trabajador, (red.descriptor,)) as pool:
+        return reduce(reducir, pool.imap_unordered(_ejecutar_bloque, trabajos))
+
+def unir(a, b):
+    """Combina dos diccionarios de resultados por fuente."""
+    a.update(b)
+    return a
+
+def sumar(a, b):
+    """Combina dos arreglos de resultados sumándolos elemento a
+    elemento."""
+    for i in range(len(a)):
+        a[i] += b[i]
+    return a
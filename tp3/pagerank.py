@@ -0,0 +1,109 @@
+from array import array
+import perfil
+from grafo_compacto import compactar
+try:
+    import numpy as np
+except ImportError:
+    # Sin NumPy se itera sobre los mismos arreglos CSR en Python
+    np = None
+
+def _distribucion(compacto, valores):
+    """Recibe un grafo compacto y un diccionario vertice: peso (o un
+    iterable de vértices, que reciben el mismo peso), y devuelve una
+    lista con los pesos normalizados indexada por id, o None si no
+    suman nada."""
+    if not isinstance(valores, dict):
+        valores = {v: 1.0 for v in valores}
+    distribucion = [0.0] * len(compacto)
+    for v, valor in valores.items():
+        distribucion[compacto.indice(v)] = float(valor)
+    total = sum(distribucion)
+    if total <= 0:
+        return None
+    return [valor / total for valor in distribucion]
+
+def _pagerank_numpy(compacto, amortiguacion, tolerancia, max_iteraciones, teleporte, inicial):
+    """Iteración de potencias con NumPy: cada paso es un producto
+    matriz-vector sobre la matriz de adyacencia en formato CSR."""
+    n = len(compacto)
+    inicio = np.asarray(compacto.inicio, dtype=np.int64)
+    destinos = np.asarray(compacto.destinos, dtype=np.int64)
+    grados = np.diff(inicio)
+    origenes = np.repeat(np.arange(n), grados)
+    colgantes = grados == 0
+    inversa = np.zeros(n)
+    inversa[~colgantes] = 1.0 / grados[~colgantes]
+    teleporte = np.asarray(teleporte)
+    rango = np.asarray(inicial)
+    iteraciones = 0
+    for iteraciones in range(1, max_iteraciones + 1):
+        # La masa de los vértices sin aristas de salida se reparte
+        # según la distribución de teleporte
+        colgante = rango[colgantes].sum()
+        nuevo = np.bincount(destinos, weights=(rango * inversa)[origenes], minlength=n)
+        nuevo = amortiguacion * nuevo + (amortiguacion * colgante + 1 - amortiguacion) * teleporte
+        diferencia = np.abs(nuevo - rango).sum()
+        rango = nuevo
+        if diferencia < tolerancia:
+            break
+    if perfil.activo:
+        perfil.contar(iteraciones_pagerank=iteraciones)
+    return rango.tolist()
+
+def _pagerank_python(compacto, amortiguacion, tolerancia, max_iteraciones, teleporte, inicial):
+    """Iteración de potencias sobre los arreglos CSR, en Python."""
+    n = len(compacto)
+    inicio, destinos = compacto.inicio, compacto.destinos
+    grados = array("q", [inicio[v + 1] - inicio[v] for v in range(n)])
+    colgantes = [v for v in range(n) if grados[v] == 0]
+    rango = inicial
+    iteraciones = 0
+    for iteraciones in range(1, max_iteraciones + 1):
+        colgante = sum(rango[v] for v in colgantes)
+        base = amortiguacion * colgante + 1 - amortiguacion
+        nuevo = [0.0] * n
+        for v in range(n):
+            if not grados[v]:
+                continue
+            aporte = amortiguacion * rango[v] / grados[v]
+            for k in range(inicio[v], inicio[v + 1]):
+                nuevo[destinos[k]] += aporte
+        diferencia = 0.0
+        for v in range(n):
+            nuevo[v] += base * teleporte[v]
+            diferencia += abs(nuevo[v] - rango[v])
+        rango = nuevo
+        if diferencia < tolerancia:
+            break
+    if perfil.activo:
+        perfil.contar(iteraciones_pagerank=iteraciones)
+    return rango
+
+def calcular_pagerank(grafo, amortiguacion, tolerancia, max_iteraciones,
+                      teleporte=None, inicial=None):
+    """Recibe un grafo, el coeficiente de amortiguación, la diferencia
+    de convergencia (en norma L1 entre dos iteraciones sucesivas) y la
+    cantidad máxima de iteraciones. Devuelve un diccionario
+    vertice: pagerank, cuyos valores suman 1.
+    Opcionalmente recibe la distribución de teleporte (un diccionario
+    vertice: peso, o un conjunto de vértices equiprobables), que
+    personaliza el resultado, y un resultado anterior desde el cual
+    comenzar a iterar; si ambos son parecidos a los de un cálculo
+    previo, se converge en pocas iteraciones."""
+    compacto = compactar(grafo)
+    n = len(compacto)
+    if n == 0:
+        return {}
+    distribucion = None if teleporte is None else _distribucion(compacto, teleporte)
+    if distribucion is None:
+        distribucion = [1.0 / n] * n
+    rango = None if inicial is None else _distribucion(compacto, inicial)
+    if rango is None:
+        rango = list(distribucion)
+    if np is not None:
+        rango = _pagerank_numpy(compacto, amortiguacion, tolerancia, max_iteraciones,
+                                distribucion, rango)
+    else:
+        rango = _pagerank_python(compacto, amortiguacion, tolerancia, max_iteraciones,
+                                 distribucion, rango)
+    return {compacto.clave(v): rango[v] for v in range(n)}
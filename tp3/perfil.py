@@ -0,0 +1,61 @@
+import os
+import json
+import time
+
+# Variable de entorno con la ruta del archivo de perfiles
+VARIABLE_ENTORNO = "FLYCOMBI_PERFIL"
+
+# Si se está registrando el perfil. Los algoritmos lo consultan antes
+# de calcular sus contadores, para no pagar nada cuando está apagado
+activo = False
+_archivo = None
+_contadores = {}
+
+def activar(ruta):
+    """Recibe la ruta de un archivo y empieza a registrar en él, como
+    lineas JSON, el perfil de cada comando medido."""
+    global activo, _archivo
+    _archivo = open(ruta, "a", encoding="utf-8")
+    activo = True
+
+def activar_desde_entorno():
+    """Activa el registro si la variable de entorno FLYCOMBI_PERFIL
+    tiene la ruta de un archivo."""
+    ruta = os.environ.get(VARIABLE_ENTORNO)
+    if ruta and not activo:
+        activar(ruta)
+
+def contar(**cantidades):
+    """Suma las cantidades recibidas a los contadores del comando en
+    curso."""
+    for nombre, cantidad in cantidades.items():
+        _contadores[nombre] = _contadores.get(nombre, 0) + cantidad
+
+def maximo(**valores):
+    """Guarda en los contadores del comando en curso el máximo entre su
+    valor actual y el recibido."""
+    for nombre, valor in valores.items():
+        _contadores[nombre] = max(_contadores.get(nombre, valor), valor)
+
+def medir(comando, linea, funcion, *argumentos):
+    """Ejecuta la función con los argumentos recibidos y devuelve su
+    resultado. Si el registro está activo, escribe una linea con el
+    comando, la linea de entrada, el tiempo real y de CPU, si tuvo éxito
+    y los contadores acumulados durante la ejecución."""
+    if not activo:
+        return funcion(*argumentos)
+    _contadores.clear()
+    inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+    resultado = funcion(*argumentos)
+    registro = {
+        "comando": comando,
+        "linea": linea,
+        "pid": os.getpid(),
+        "real": time.perf_counter() - inicio_real,
+        "cpu": time.process_time() - inicio_cpu,
+        "exito": resultado is not False,
+        "contadores": dict(_contadores)
+    }
+    _archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    _archivo.flush()
+    return resultado
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+import io
+import os
+import sys
+import asyncio
+import multiprocessing
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from flycombi import procesar_comando, separar_comando, cargar_red, Sesion
+import perfil
+from grafo_compacto import GrafoCompacto, compactar
+from instantanea import cargar_instantanea
+from landmarks import Landmarks
+from memoria_compartida import exportar_red, RedCompartida
+
+# Comandos que se ejecutan en los procesos trabajadores, para no
+# bloquear la atención de los demás clientes
+COMANDOS_PESADOS = (
+            "centralidad",
+            "centralidad_aprox",
+            "pagerank",
+            "pagerank_personalizado",
+            "nueva_aerolinea",
+            "vacaciones"
+            )
+
+# Comandos que construyen o cargan un motor de caminos mínimos. Se
+# ejecutan en un proceso trabajador aparte, y el motor se publica en la
+# sesión del servidor al terminar: mientras tanto, los caminos mínimos
+# se siguen respondiendo con el estado anterior de la sesión
+COMANDOS_MOTOR = (
+            "crear_jerarquia",
+            "cargar_jerarquia",
+            "crear_landmarks"
+            )
+
+# Red compartida, grafo, ciudades y sesión de cada proceso trabajador,
+# armados al iniciarlo
+_red = None
+
+def cargar(rutas):
+    """Recibe una lista con la ruta de una instantánea o las rutas de
+    los archivos de aeropuertos y de vuelos, y devuelve el par (grafo,
+    ciudades) con la red cargada."""
+    if len(rutas) == 1:
+        return cargar_instantanea(rutas[0])
+    return cargar_red(*rutas)
+
+def ejecutar(grafo, ciudades, linea, ultimo, sesion):
+    """Procesa una linea de comando igual que el programa principal y
+    devuelve un par (salida, ultimo) con el texto impreso (ERROR si el
+    comando falló) y el resultado del comando. Si el comando lanza una
+    excepción, se considera fallido y se descarta lo impreso hasta
+    entonces."""
+    salida = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(salida):
+            ultimo = procesar_comando(grafo, ciudades, linea, ultimo, sesion)
+    except Exception:
+        return "ERROR\n", False
+    if not ultimo:
+        salida.write("ERROR\n")
+    return salida.getvalue(), ultimo
+
+def _iniciar_trabajador(descriptor, datos, ciudades):
+    """Adjunta el proceso trabajador a la red compartida del servidor y
+    arma sobre ella el grafo, sin copiar sus arreglos. Los cálculos se
+    hacen en un único proceso: el servidor ya reparte los comandos."""
+    global _red
+    perfil.activar_desde_entorno()
+    red = RedCompartida.adjuntar(descriptor)
+    claves = [red.clave(i) for i in range(red.n)]
+    grafo = GrafoCompacto.desde_arreglos(claves, datos, red.inicio, red.destinos,
+                                         red.pesos, red.es_dirigido)
+    _red = (red, grafo, ciudades, Sesion(procesos=1))
+
+def _ejecutar_en_trabajador(linea, ultimo):
+    """Ejecuta una linea de comando en el proceso trabajador."""
+    _, grafo, ciudades, sesion = _red
+    return ejecutar(grafo, ciudades, linea, ultimo, sesion)
+
+def _construir_motor(linea):
+    """Ejecuta en el proceso trabajador un comando de COMANDOS_MOTOR con
+    una sesión vacía, y devuelve la terna (salida, ultimo, motores) con
+    el resultado del comando y la lista de motores que dejó activos."""
+    _, grafo, ciudades, _ = _red
+    sesion = Sesion(procesos=1)
+    salida, ultimo = ejecutar(grafo, ciudades, linea, False, sesion)
+    return salida, ultimo, [motor for motor, _ in sesion.motores.values()]
+
+class Servidor:
+    """Atiende clientes que envían comandos de flycombi, uno por linea,
+    y les responde con la misma salida que el programa principal. La red
+    se carga una única vez y se comparte con los procesos trabajadores
+    mediante memoria compartida. Los comandos pesados se delegan a un
+    conjunto de procesos trabajadores, cada uno con su propia sesión; los
+    que construyen un motor de caminos mínimos, a un proceso aparte que
+    lo devuelve para publicarlo en la sesión del servidor. Los caminos
+    mínimos y los comandos livianos se resuelven en el bucle de eventos
+    con esa sesión, que comparten todos los clientes."""
+
+    def __init__(self, grafo, ciudades, trabajadores=None):
+        """Constructor de la clase Servidor. Recibe la red cargada y la
+        cantidad de procesos trabajadores (por defecto, uno por
+        procesador)."""
+        self.grafo = grafo
+        self.ciudades = ciudades
+        # En el bucle de eventos no se crean procesos para los cálculos
+        self.sesion = Sesion(procesos=1)
+        compacto = compactar(grafo)
+        self.red = exportar_red(compacto)
+        argumentos = (self.red.descriptor, compacto.datos, ciudades)
+        contexto = multiprocessing.get_context("spawn")
+        # Los trabajadores se crean desde cero (spawn) y se adjuntan a la
+        # red compartida: hacer fork desde el bucle de eventos, que ya
+        # tiene hilos corriendo, puede dejarlos bloqueados
+        self.trabajadores = ProcessPoolExecutor(trabajadores or os.cpu_count() or 1,
+                                                contexto, _iniciar_trabajador, argumentos)
+        self.constructor = ProcessPoolExecutor(1, contexto, _iniciar_trabajador, argumentos)
+
+    def publicar(self, motores):
+        """Recibe los motores de caminos mínimos construidos en el
+        proceso trabajador y los activa en la sesión del servidor."""
+        for motor in motores:
+            if isinstance(motor, Landmarks):
+                motor.usar_grafo(self.grafo)
+            self.sesion.activar_motor(self.grafo, motor)
+
+    async def responder(self, linea, ultimo):
+        """Recibe una linea de comando y el resultado del comando anterior
+        del cliente, y devuelve el par (salida, ultimo) de ejecutarla en
+        el proceso que corresponda. Si el proceso trabajador falla, la
+        respuesta es ERROR."""
+        comando, _ = separar_comando(linea)
+        bucle = asyncio.get_running_loop()
+        try:
+            if comando in COMANDOS_PESADOS:
+                return await bucle.run_in_executor(self.trabajadores, _ejecutar_en_trabajador,
+                                                   linea, ultimo)
+            if comando in COMANDOS_MOTOR:
+                salida, ultimo, motores = await bucle.run_in_executor(self.constructor,
+                                                                      _construir_motor, linea)
+                self.publicar(motores)
+                return salida, ultimo
+        except Exception:
+            return "ERROR\n", False
+        return ejecutar(self.grafo, self.ciudades, linea, ultimo, self.sesion)
+
+    async def atender(self, lector, escritor):
+        """Atiende a un cliente hasta que cierra la conexión. Sus
+        comandos se responden en orden."""
+        ultimo = False
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                salida, ultimo = await self.responder(linea.decode("utf-8"), ultimo)
+                escritor.write(salida.encode("utf-8"))
+                await escritor.drain()
+        except (ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            escritor.close()
+            with contextlib.suppress(ConnectionError):
+                await escritor.wait_closed()
+
+    async def servir(self, direccion):
+        """Recibe una dirección host:puerto (TCP) o la ruta de un socket
+        Unix, y atiende clientes en ella hasta que se interrumpa."""
+        if ":" in direccion:
+            host, puerto = direccion.rsplit(":", 1)
+            servidor = await asyncio.start_server(self.atender, host, int(puerto))
+        else:
+            servidor = await asyncio.start_unix_server(self.atender, direccion)
+        async with servidor:
+            await servidor.serve_forever()
+
+    def cerrar(self):
+        """Termina los procesos trabajadores y libera la red compartida."""
+        self.trabajadores.shutdown(cancel_futures=True)
+        self.constructor.shutdown(cancel_futures=True)
+        self.red.cerrar()
+
+def main():
+    """Uso: servidor.py host:puerto aeropuertos.csv vuelos.csv
+       servidor.py socket instantanea
+    Con la variable de entorno FLYCOMBI_PERFIL se registra el perfil
+    de cada comando en el archivo indicado."""
+    if len(sys.argv) not in (3, 4):
+        print(main.__doc__)
+        return
+    direccion, rutas = sys.argv[1], sys.argv[2:]
+    perfil.activar_desde_entorno()
+    try:
+        grafo, ciudades = cargar(rutas)
+    except ValueError as e:
+        sys.exit(str(e))
+    servidor = Servidor(grafo, ciudades)
+    try:
+        asyncio.run(servidor.servir(direccion))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos de tp3 se importan por nombre, como desde flycombi.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
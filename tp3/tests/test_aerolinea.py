@@ -0,0 +1,111 @@
+import random
+import unittest
+from itertools import combinations
+import biblioteca as b
+from conjuntos_disjuntos import ConjuntosDisjuntos
+from grafo_compacto import GrafoCompacto
+from util import grafo_aleatorio, distancias_referencia
+
+def aristas(grafo):
+    """Devuelve la lista de aristas (v, w, pesos) de un grafo no
+    dirigido, cada una una única vez."""
+    vistas = set()
+    resultado = []
+    for v in grafo:
+        vistas.add(v)
+        for w, pesos in grafo.obtener_adyacentes(v).items():
+            if w not in vistas:
+                resultado.append((v, w, pesos))
+    return resultado
+
+def componentes(claves, lista_aristas):
+    """Devuelve la cantidad de componentes conexas de los vértices con
+    las aristas recibidas."""
+    indices = {v: i for i, v in enumerate(claves)}
+    conjuntos = ConjuntosDisjuntos(len(claves))
+    cantidad = len(claves)
+    for v, w, _ in lista_aristas:
+        if conjuntos.unir(indices[v], indices[w]):
+            cantidad -= 1
+    return cantidad
+
+def peso_minimo_fuerza_bruta(grafo, peso):
+    """Prueba todos los subconjuntos de aristas del tamaño de un bosque
+    de tendido y devuelve el peso del más liviano que no deja
+    componentes de más."""
+    claves = list(grafo)
+    todas = aristas(grafo)
+    tamanio = len(claves) - componentes(claves, todas)
+    mejor = None
+    for elegidas in combinations(todas, tamanio):
+        if componentes(claves, elegidas) == len(claves) - tamanio:
+            total = sum(pesos[peso] for _, _, pesos in elegidas)
+            mejor = total if mejor is None else min(mejor, total)
+    return mejor
+
+class TestArbolTendido(unittest.TestCase):
+    """Compara el bosque de Kruskal con el de menor peso encontrado por
+    fuerza bruta en grafos chicos, incluso con varias componentes, y el
+    árbol de Prim con el de Kruskal en grafos conexos."""
+
+    def verificar_subgrafo(self, grafo, arbol):
+        """Verifica que el árbol tenga los vértices del grafo y sólo
+        aristas del grafo, con sus pesos."""
+        self.assertEqual(sorted(arbol), sorted(grafo))
+        for v, w, pesos in aristas(arbol):
+            self.assertEqual(grafo.obtener_peso_union(v, w), pesos)
+
+    def test_kruskal(self):
+        azar = random.Random(14)
+        for prueba in range(60):
+            n = azar.randint(1, 7)
+            grafo = grafo_aleatorio(azar, n, azar.randint(0, 10), 5)
+            if prueba % 2:
+                grafo = GrafoCompacto.desde_grafo(grafo)
+            peso = azar.randrange(3)
+            arbol = b.optimizar_rutas(grafo, peso)
+            with self.subTest(prueba=prueba):
+                self.verificar_subgrafo(grafo, arbol)
+                elegidas = aristas(arbol)
+                claves = list(grafo)
+                # Es un bosque con las mismas componentes que el grafo
+                self.assertEqual(componentes(claves, elegidas), componentes(claves, aristas(grafo)))
+                self.assertEqual(len(elegidas), len(claves) - componentes(claves, elegidas))
+                self.assertEqual(sum(pesos[peso] for _, _, pesos in elegidas),
+                                 peso_minimo_fuerza_bruta(grafo, peso))
+
+    def test_prim(self):
+        azar = random.Random(15)
+        for prueba in range(30):
+            grafo = grafo_aleatorio(azar, 30, 120, 20)
+            # Sólo grafos conexos, donde Prim cubre todos los vértices
+            if len(distancias_referencia(grafo, [next(iter(grafo))])) < len(grafo):
+                continue
+            kruskal = b.optimizar_rutas(grafo, 1)
+            prim = b.optimizar_rutas(grafo, 1, b.PRIM)
+            self.verificar_subgrafo(grafo, prim)
+            self.assertEqual(len(aristas(prim)), len(grafo) - 1)
+            self.assertEqual(sum(pesos[1] for _, _, pesos in aristas(prim)),
+                             sum(pesos[1] for _, _, pesos in aristas(kruskal)))
+
+class TestConjuntosDisjuntos(unittest.TestCase):
+    """Compara los conjuntos disjuntos con una lista de conjuntos."""
+
+    def test_aleatorio(self):
+        azar = random.Random(16)
+        n = 50
+        conjuntos = ConjuntosDisjuntos(n)
+        referencia = [{x} for x in range(n)]
+        for _ in range(200):
+            x, y = azar.randrange(n), azar.randrange(n)
+            separados = referencia[x] is not referencia[y]
+            self.assertEqual(conjuntos.unir(x, y), separados)
+            if separados:
+                unidos = referencia[x] | referencia[y]
+                for z in unidos:
+                    referencia[z] = unidos
+            for z in range(n):
+                self.assertEqual(conjuntos.buscar(z) == conjuntos.buscar(x), z in referencia[x])
+
+if __name__ == "__main__":
+    unittest.main()
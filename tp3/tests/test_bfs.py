@@ -0,0 +1,89 @@
+import random
+import unittest
+import bfs
+from bfs import bfs_compacto
+from grafo import Grafo
+from grafo_compacto import GrafoCompacto
+from util import grafo_aleatorio, distancias_referencia
+
+def invertir(grafo):
+    """Devuelve un Grafo dirigido con las aristas del recibido
+    invertidas."""
+    invertido = Grafo(dirigido=True)
+    for v in grafo:
+        invertido.agregar_vertice(v, None)
+    for v in grafo:
+        for w, peso in grafo.obtener_adyacentes(v).items():
+            invertido.agregar_arista(w, v, peso)
+    return invertido
+
+class TestBfsDireccional(unittest.TestCase):
+    """Compara el bfs por niveles con la referencia en grafos aleatorios
+    ralos y densos, dirigidos y no dirigidos, con la heurística de
+    Beamer y forzando cada una de las dos direcciones de expansión."""
+
+    def setUp(self):
+        anteriores = bfs.ALFA, bfs.BETA
+        self.addCleanup(setattr, bfs, "BETA", anteriores[1])
+        self.addCleanup(setattr, bfs, "ALFA", anteriores[0])
+
+    def verificar(self, grafo, compacto, origenes, invertido=False):
+        """Verifica distancias y padres del bfs desde los orígenes."""
+        referencia = invertir(grafo) if invertido and grafo.es_dirigido else grafo
+        esperadas = distancias_referencia(referencia, origenes)
+        ids = [compacto.indice(v) for v in origenes]
+        distancias, padres, orden, encontrado = bfs_compacto(compacto, ids, invertido=invertido)
+        self.assertEqual(encontrado, -1)
+        self.assertEqual(sorted(orden), sorted(compacto.indice(v) for v in esperadas))
+        for i in range(len(compacto)):
+            v = compacto.clave(i)
+            self.assertEqual(distancias[i], esperadas.get(v, -1))
+            if distancias[i] > 0:
+                padre = compacto.clave(padres[i])
+                self.assertEqual(distancias[padres[i]], distancias[i] - 1)
+                self.assertIn(v, referencia.obtener_adyacentes(padre))
+
+    def probar(self, semilla):
+        azar = random.Random(semilla)
+        for prueba in range(20):
+            n = azar.randint(1, 60)
+            m = azar.choice((n, 4 * n, n * n // 2))
+            grafo = grafo_aleatorio(azar, n, m, 1, prueba % 2 == 0)
+            compacto = GrafoCompacto.desde_grafo(grafo)
+            origenes = azar.sample(list(grafo), azar.randint(1, min(3, n)))
+            with self.subTest(prueba=prueba):
+                self.verificar(grafo, compacto, origenes)
+                self.verificar(grafo, compacto, origenes, invertido=True)
+
+    def test_heuristica(self):
+        self.probar(1)
+
+    def test_solo_de_arriba_hacia_abajo(self):
+        bfs.ALFA = 0
+        self.probar(2)
+
+    def test_solo_de_abajo_hacia_arriba(self):
+        # Con ALFA enorme se pasa a la expansión ascendente en el primer
+        # nivel, y con BETA enorme nunca se vuelve
+        bfs.ALFA = bfs.BETA = 10 ** 9
+        self.probar(3)
+
+    def test_objetivos(self):
+        azar = random.Random(4)
+        for prueba in range(30):
+            grafo = grafo_aleatorio(azar, 40, 80, 1, prueba % 2 == 0)
+            compacto = GrafoCompacto.desde_grafo(grafo)
+            origen = azar.choice(list(grafo))
+            objetivos = {compacto.indice(v) for v in azar.sample(list(grafo), 3)}
+            esperadas = distancias_referencia(grafo, [origen])
+            alcanzables = [esperadas[compacto.clave(i)] for i in objetivos
+                           if compacto.clave(i) in esperadas]
+            distancias, _, _, encontrado = bfs_compacto(compacto, [compacto.indice(origen)], objetivos)
+            if not alcanzables:
+                self.assertEqual(encontrado, -1)
+            else:
+                self.assertIn(encontrado, objetivos)
+                self.assertEqual(distancias[encontrado], min(alcanzables))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import random
+import unittest
+import biblioteca as b
+from grafo_compacto import GrafoCompacto
+from flycombi import obtener_mejor_camino, Sesion
+from util import grafo_aleatorio, distancias_referencia, distancia_referencia, largo_camino, INFINITO
+
+def variantes(azar, n, m, peso_maximo=10, dirigido=False):
+    """Devuelve un grafo aleatorio como Grafo y como GrafoCompacto, que
+    deben dar las mismas distancias."""
+    grafo = grafo_aleatorio(azar, n, m, peso_maximo, dirigido)
+    return grafo, GrafoCompacto.desde_grafo(grafo)
+
+class TestDijkstra(unittest.TestCase):
+    """Compara Dijkstra (unidireccional en grafos dirigidos y
+    bidireccional en los no dirigidos) con la referencia, en grafos
+    aleatorios chicos con pesos repetidos, sobre Grafo y GrafoCompacto.
+    Los pesos grandes usan heap y los chicos, buckets."""
+
+    def verificar(self, grafo, peso, origen, destino, resultado):
+        """Verifica que el par (camino, distancia) sea un camino mínimo
+        del origen al destino."""
+        camino, distancia = resultado
+        self.assertEqual(distancia, distancia_referencia(grafo, [origen], [destino], peso))
+        if distancia == INFINITO:
+            self.assertIsNone(camino)
+            return
+        self.assertEqual(camino[0], origen)
+        self.assertEqual(camino[-1], destino)
+        self.assertEqual(largo_camino(self, grafo, camino, peso), distancia)
+
+    def test_punto_a_punto(self):
+        azar = random.Random(3)
+        for prueba in range(40):
+            dirigido = prueba % 3 == 0
+            peso_maximo = 5 if prueba % 2 else 10 ** 6
+            n = azar.randint(2, 30)
+            for grafo in variantes(azar, n, azar.randint(0, 3 * n), peso_maximo, dirigido):
+                claves = list(grafo)
+                for _ in range(10):
+                    origen, destino = azar.choice(claves), azar.choice(claves)
+                    peso = azar.randrange(3)
+                    with self.subTest(prueba=prueba, compacto=isinstance(grafo, GrafoCompacto)):
+                        self.verificar(grafo, peso, origen, destino,
+                                       b.obtener_camino_minimo(grafo, peso, origen, destino))
+
+    def test_bidireccional(self):
+        azar = random.Random(4)
+        for prueba in range(30):
+            for grafo in variantes(azar, 20, azar.randint(10, 60), 8):
+                origen, destino = azar.sample(list(grafo), 2)
+                with self.subTest(prueba=prueba, compacto=isinstance(grafo, GrafoCompacto)):
+                    self.verificar(grafo, 1, origen, destino,
+                                   b.camino_minimo_bidireccional(grafo, 1, [origen], [destino]))
+
+    def test_todos_los_destinos(self):
+        azar = random.Random(5)
+        for prueba in range(20):
+            for grafo in variantes(azar, 25, 50, 20, prueba % 2 == 0):
+                origen = azar.choice(list(grafo))
+                distancias, padres = b.obtener_camino_minimo(grafo, 2, origen)
+                esperadas = distancias_referencia(grafo, [origen], 2)
+                for v in grafo:
+                    self.assertEqual(distancias[v], esperadas.get(v, INFINITO))
+                    if v in esperadas and v != origen:
+                        self.assertEqual(distancias[padres[v]] + grafo.obtener_peso_union(padres[v], v)[2],
+                                         distancias[v])
+
+class TestVariosExtremos(unittest.TestCase):
+    """Compara la búsqueda entre conjuntos de orígenes y de destinos
+    (como los aeropuertos de dos ciudades) con la referencia desde todos
+    los orígenes a la vez, con y sin pesos."""
+
+    def verificar(self, grafo, peso, origenes, destinos, resultado):
+        """Verifica que el par (camino, distancia) sea el mejor camino
+        entre algún origen y algún destino."""
+        camino, distancia = resultado
+        self.assertEqual(distancia, distancia_referencia(grafo, origenes, destinos, peso))
+        if distancia == INFINITO:
+            self.assertIsNone(camino)
+            return
+        self.assertIn(camino[0], origenes)
+        self.assertIn(camino[-1], destinos)
+        self.assertEqual(largo_camino(self, grafo, camino, peso), distancia)
+
+    def test_conjuntos(self):
+        azar = random.Random(7)
+        for prueba in range(40):
+            n = azar.randint(2, 30)
+            for grafo in variantes(azar, n, azar.randint(0, 3 * n), 6, prueba % 3 == 0):
+                claves = list(grafo)
+                for peso in (None, 0):
+                    # Los conjuntos pueden compartir vértices
+                    origenes = azar.sample(claves, azar.randint(1, min(4, n)))
+                    destinos = azar.sample(claves, azar.randint(1, min(4, n)))
+                    with self.subTest(prueba=prueba, peso=peso):
+                        self.verificar(grafo, peso, origenes, destinos,
+                                       b.camino_minimo_multiple(grafo, origenes, destinos, peso))
+
+    def test_ciudades_en_sesion(self):
+        # Las consultas repetidas desde una ciudad se responden con su
+        # árbol de caminos mínimos, y deben coincidir con la búsqueda
+        azar = random.Random(8)
+        grafo = GrafoCompacto.desde_grafo(grafo_aleatorio(azar, 40, 90, 6))
+        claves = list(grafo)
+        ciudades = {"C{}".format(i): claves[i::5] for i in range(5)}
+        sesion = Sesion()
+        for _ in range(3):
+            for origen in ciudades:
+                for destino in ciudades:
+                    for peso in (None, 1):
+                        camino = obtener_mejor_camino(grafo, ciudades, origen, destino, peso, sesion)
+                        esperada = distancia_referencia(grafo, ciudades[origen], ciudades[destino], peso)
+                        self.assertIn(camino[0], ciudades[origen])
+                        self.assertIn(camino[-1], ciudades[destino])
+                        self.assertEqual(largo_camino(self, grafo, camino, peso), esperada)
+
+class TestEscalas(unittest.TestCase):
+    """Compara el bfs bidireccional (y el bfs común en los grafos
+    dirigidos) con la cantidad de escalas de la referencia."""
+
+    def test_punto_a_punto(self):
+        azar = random.Random(9)
+        for prueba in range(60):
+            n = azar.randint(2, 40)
+            for grafo in variantes(azar, n, azar.randint(0, 2 * n), 1, prueba % 4 == 0):
+                origen, destino = azar.choice(list(grafo)), azar.choice(list(grafo))
+                camino, escalas = b.escalas_minimas_bfs(grafo, origen, destino)
+                with self.subTest(prueba=prueba, compacto=isinstance(grafo, GrafoCompacto)):
+                    self.assertEqual(escalas, distancia_referencia(grafo, [origen], [destino]))
+                    if camino is not None:
+                        self.assertEqual((camino[0], camino[-1]), (origen, destino))
+                        self.assertEqual(largo_camino(self, grafo, camino), escalas)
+
+    def test_encuentro_al_completar_nivel(self):
+        # Dos caminos del origen al destino, de 3 y de 4 aristas: el
+        # primer encuentro al expandir un nivel puede ser el del camino
+        # largo, así que el nivel debe completarse antes de cortar
+        for grafo in variantes(random.Random(0), 0, 0):
+            for clave in ("o", "a", "b", "x", "y", "z", "d"):
+                grafo.agregar_vertice(clave, None)
+            for v, w in (("o", "x"), ("x", "y"), ("y", "z"), ("z", "d"),
+                         ("o", "a"), ("a", "b"), ("b", "d")):
+                grafo.agregar_arista(v, w, (1, 1, 1))
+            self.assertEqual(b.escalas_minimas_bidireccional(grafo, ["o"], ["d"]),
+                             (["o", "a", "b", "d"], 3))
+
+    def test_todos_los_destinos(self):
+        azar = random.Random(10)
+        for prueba in range(20):
+            for grafo in variantes(azar, 30, 45, 1, prueba % 2 == 0):
+                origen = azar.choice(list(grafo))
+                orden, padres = b.escalas_minimas_bfs(grafo, origen)
+                self.assertEqual(orden, distancias_referencia(grafo, [origen]))
+                for v in orden:
+                    if v != origen:
+                        self.assertEqual(orden[padres[v]] + 1, orden[v])
+
+if __name__ == "__main__":
+    unittest.main()
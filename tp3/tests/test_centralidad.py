@@ -0,0 +1,112 @@
+import random
+import unittest
+import centralidad
+from centralidad import betweeness_brandes, betweeness_aproximada, cota_diametro, cantidad_muestras
+from grafo_compacto import compactar
+from util import grafo_aleatorio, distancias_referencia
+
+def caminos_simples(grafo, origen, destino, peso):
+    """Devuelve la lista de pares (largo, camino) de todos los caminos
+    simples del origen al destino, enumerados por backtracking."""
+    caminos = []
+    camino = [origen]
+
+    def extender(v, largo):
+        if v == destino:
+            caminos.append((largo, list(camino)))
+            return
+        for w, pesos in grafo.obtener_adyacentes(v).items():
+            if w in camino:
+                continue
+            camino.append(w)
+            extender(w, largo + (1 if peso is None else pesos[peso]))
+            camino.pop()
+
+    extender(origen, 0)
+    return caminos
+
+def centralidad_fuerza_bruta(grafo, peso):
+    """Para cada par de vértices enumera todos sus caminos simples, se
+    queda con los de largo mínimo y suma a cada vértice intermedio la
+    fracción de ellos que lo atraviesan."""
+    resultado = {v: 0.0 for v in grafo}
+    for s in grafo:
+        for t in grafo:
+            if s == t:
+                continue
+            caminos = caminos_simples(grafo, s, t, peso)
+            if not caminos:
+                continue
+            minimo = min(largo for largo, _ in caminos)
+            minimos = [camino for largo, camino in caminos if largo == minimo]
+            for camino in minimos:
+                for v in camino[1:-1]:
+                    resultado[v] += 1 / len(minimos)
+    return resultado
+
+class TestBrandes(unittest.TestCase):
+    """Compara Brandes con el conteo por fuerza bruta de todos los
+    caminos mínimos, en grafos aleatorios chicos dirigidos y no
+    dirigidos, contando escalas y con pesos."""
+
+    def comparar(self, obtenida, esperada):
+        self.assertEqual(obtenida.keys(), esperada.keys())
+        for v in esperada:
+            self.assertAlmostEqual(obtenida[v], esperada[v], places=9)
+
+    def test_aleatorio(self):
+        azar = random.Random(6)
+        for prueba in range(40):
+            n = azar.randint(1, 8)
+            grafo = grafo_aleatorio(azar, n, azar.randint(0, 2 * n), 3, azar.random() < 0.4)
+            for peso in (None, 0):
+                with self.subTest(prueba=prueba, peso=peso):
+                    self.comparar(betweeness_brandes(grafo, peso, procesos=1),
+                                  centralidad_fuerza_bruta(grafo, peso))
+
+    def test_paralelo(self):
+        grafo = grafo_aleatorio(random.Random(3), 8, 16, 3)
+        anterior = centralidad.MINIMO_PARALELO
+        centralidad.MINIMO_PARALELO = 1
+        self.addCleanup(setattr, centralidad, "MINIMO_PARALELO", anterior)
+        self.comparar(betweeness_brandes(grafo, 0, procesos=2),
+                      centralidad_fuerza_bruta(grafo, 0))
+
+    def test_aproximada_exacta_en_grafos_chicos(self):
+        # En grafos chicos la muestra alcanzaría casi todos los vértices,
+        # así que se calcula la centralidad exacta
+        grafo = grafo_aleatorio(random.Random(9), 8, 16, 3)
+        self.comparar(betweeness_aproximada(grafo, peso=1, procesos=1, semilla=1),
+                      centralidad_fuerza_bruta(grafo, 1))
+
+    def test_aproximada_error(self):
+        # Con menos caminos que vértices (sin pasar al cálculo exacto),
+        # ningún vértice se aleja de su centralidad exacta (normalizada)
+        # más que el error pedido
+        error = 0.2
+        for dirigido, peso in ((False, None), (True, None), (False, 0), (True, 1)):
+            grafo = grafo_aleatorio(random.Random(5), 300, 900, 5, dirigido)
+            n = len(grafo)
+            diametro = cota_diametro(compactar(grafo), peso)
+            self.assertLess(cantidad_muestras(diametro, error), centralidad.FRACCION_EXACTA * n)
+            exacta = betweeness_brandes(grafo, peso, procesos=1)
+            aproximada = betweeness_aproximada(grafo, error, peso=peso, procesos=1, semilla=3)
+            with self.subTest(dirigido=dirigido, peso=peso):
+                self.assertEqual(aproximada.keys(), exacta.keys())
+                for v in grafo:
+                    self.assertLessEqual(abs(aproximada[v] - exacta[v]) / (n * (n - 1)), error)
+
+    def test_cota_diametro(self):
+        azar = random.Random(8)
+        for prueba in range(30):
+            n = azar.randint(2, 40)
+            grafo = grafo_aleatorio(azar, n, azar.randint(0, 2 * n))
+            # Diámetro en vértices: uno más que la mayor distancia en escalas
+            diametro = max(max(distancias_referencia(grafo, [v]).values()) for v in grafo) + 1
+            cota = cota_diametro(compactar(grafo))
+            with self.subTest(prueba=prueba):
+                self.assertLessEqual(diametro, cota)
+                self.assertLessEqual(cota, 2 * diametro - 1)
+
+if __name__ == "__main__":
+    unittest.main()
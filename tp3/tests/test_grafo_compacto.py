@@ -0,0 +1,57 @@
+import random
+import unittest
+from grafo import Grafo
+from grafo_compacto import GrafoCompacto
+
+class TestGrafoCompacto(unittest.TestCase):
+    """Compara la interfaz de Grafo del GrafoCompacto con la de Grafo,
+    intercalando consultas y modificaciones para que los arreglos se
+    compacten varias veces y los adyacentes guardados se descarten."""
+
+    def verificar(self, grafo, compacto):
+        """Verifica que ambos grafos tengan los mismos vértices, datos y
+        aristas con sus pesos."""
+        self.assertEqual(list(compacto), list(grafo))
+        for v in grafo:
+            self.assertEqual(compacto.obtener_dato(v), grafo.obtener_dato(v))
+            adyacentes = grafo.obtener_adyacentes(v)
+            self.assertEqual(compacto.obtener_adyacentes(v), adyacentes)
+            for w, peso in adyacentes.items():
+                self.assertTrue(compacto.estan_conectados(w, v))
+                self.assertEqual(compacto.obtener_peso_union(v, w), peso)
+
+    def test_aleatorio(self):
+        azar = random.Random(1)
+        for dirigido in (False, True):
+            grafo, compacto = Grafo(dirigido), GrafoCompacto(dirigido)
+            for ronda in range(20):
+                for _ in range(azar.randint(0, 3)):
+                    clave = "V{}".format(azar.randrange(30))
+                    if clave in grafo.vertices:
+                        # Grafo descarta las aristas del vértice repetido
+                        continue
+                    dato = azar.random()
+                    grafo.agregar_vertice(clave, dato)
+                    compacto.agregar_vertice(clave, dato)
+                claves = list(grafo)
+                for _ in range(azar.randint(0, 10) if len(claves) > 1 else 0):
+                    # Las aristas repetidas reemplazan el peso anterior
+                    v, w = azar.sample(claves, 2)
+                    peso = tuple(azar.randint(1, 9) for _ in range(3))
+                    grafo.agregar_arista(v, w, peso)
+                    compacto.agregar_arista(v, w, peso)
+                with self.subTest(dirigido=dirigido, ronda=ronda):
+                    self.verificar(grafo, compacto)
+
+    def test_adyacentes_reutilizados(self):
+        compacto = GrafoCompacto()
+        for clave in "abc":
+            compacto.agregar_vertice(clave, None)
+        compacto.agregar_arista("a", "b", (1, 2, 3))
+        adyacentes = compacto.obtener_adyacentes("a")
+        self.assertIs(compacto.obtener_adyacentes("a"), adyacentes)
+        compacto.agregar_arista("a", "c", (4, 5, 6))
+        self.assertEqual(compacto.obtener_adyacentes("a"), {"b": (1, 2, 3), "c": (4, 5, 6)})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import random
+import unittest
+from heap import HeapIndexado, ColaBuckets
+
+# Cantidad de operaciones aleatorias de cada prueba
+OPERACIONES = 300
+
+def minimos(referencia):
+    """Recibe un diccionario dato -> prioridad y devuelve el conjunto
+    de datos con la prioridad mínima."""
+    minimo = min(referencia.values())
+    return {dato for dato, valor in referencia.items() if valor == minimo}
+
+class TestHeapIndexado(unittest.TestCase):
+    """Compara el heap indexado contra un diccionario de prioridades
+    con operaciones aleatorias, para varias aridades y con mapa de
+    posiciones denso y no denso."""
+
+    def verificar(self, heap, referencia):
+        """Verifica que el heap tenga exactamente los datos de la
+        referencia, con sus prioridades y posiciones consistentes."""
+        self.assertEqual(len(heap), len(referencia))
+        for dato, valor in referencia.items():
+            self.assertIn(dato, heap)
+            self.assertEqual(heap.prioridad(dato), valor)
+            i = heap.posiciones[dato]
+            self.assertEqual(heap.datos[i], dato)
+        for i in range(1, len(heap.datos)):
+            padre = (i - 1) // heap.aridad
+            self.assertLessEqual(heap.prioridades[padre], heap.prioridades[i])
+
+    def probar(self, aridad, capacidad, semilla):
+        """Aplica operaciones aleatorias al heap y a la referencia, y
+        verifica que coincidan después de cada una."""
+        azar = random.Random(semilla)
+        heap = HeapIndexado(aridad, capacidad)
+        referencia = {}
+        for _ in range(OPERACIONES):
+            operacion = azar.random()
+            dato, valor = azar.randrange(100), azar.randrange(50)
+            if operacion < 0.4:
+                if dato in referencia:
+                    heap.actualizar_prioridad(dato, valor)
+                else:
+                    heap.encolar(dato, valor)
+                referencia[dato] = valor
+            elif operacion < 0.6:
+                cambia = dato not in referencia or valor < referencia[dato]
+                self.assertEqual(heap.encolar_o_actualizar(dato, valor), cambia)
+                if cambia:
+                    referencia[dato] = valor
+            elif referencia:
+                esperados = minimos(referencia)
+                self.assertIn(heap.ver_minimo(), esperados)
+                self.assertEqual(heap.prioridad_minima(), referencia[heap.ver_minimo()])
+                dato = heap.desencolar()
+                self.assertIn(dato, esperados)
+                del referencia[dato]
+            self.verificar(heap, referencia)
+        while referencia:
+            dato = heap.desencolar()
+            self.assertIn(dato, minimos(referencia))
+            del referencia[dato]
+        self.assertTrue(heap.esta_vacio())
+
+    def test_aleatorio(self):
+        for aridad in (2, 3, 4, 8):
+            for semilla in range(20):
+                with self.subTest(aridad=aridad, semilla=semilla):
+                    self.probar(aridad, 100 if semilla % 2 else None, semilla)
+
+    def test_reducir_no_aumenta(self):
+        heap = HeapIndexado()
+        heap.encolar("a", 5)
+        self.assertFalse(heap.encolar_o_actualizar("a", 7))
+        self.assertFalse(heap.encolar_o_actualizar("a", 5))
+        self.assertTrue(heap.encolar_o_actualizar("a", 2))
+        self.assertEqual(heap.prioridad("a"), 2)
+
+    def test_aumentar_prioridad(self):
+        heap = HeapIndexado(2, 4)
+        for dato, valor in enumerate((1, 2, 3, 4)):
+            heap.encolar(dato, valor)
+        heap.actualizar_prioridad(0, 10)
+        self.assertEqual([heap.desencolar() for _ in range(4)], [1, 2, 3, 0])
+
+    def test_errores(self):
+        heap = HeapIndexado()
+        self.assertRaises(ValueError, heap.desencolar)
+        heap.encolar("a", 1)
+        self.assertRaises(ValueError, heap.encolar, "a", 0)
+        self.assertRaises(ValueError, HeapIndexado, 1)
+
+    def test_actualizar_dato_ausente(self):
+        for capacidad in (None, 5):
+            with self.subTest(capacidad=capacidad):
+                heap = HeapIndexado(2, capacidad)
+                for dato, valor in ((0, 3), (1, 1), (2, 2)):
+                    heap.encolar(dato, valor)
+                heap.desencolar()
+                # Ni el dato ya desencolado, ni uno que nunca estuvo, ni
+                # uno fuera de la capacidad alteran el heap
+                for ausente in (1, 4, 7, -1):
+                    self.assertRaises(KeyError, heap.actualizar_prioridad, ausente, 0)
+                    self.assertRaises(KeyError, heap.prioridad, ausente)
+                    self.assertNotIn(ausente, heap)
+                self.assertEqual(len(heap), 2)
+                self.assertEqual([heap.desencolar(), heap.desencolar()], [2, 0])
+
+class TestColaBuckets(unittest.TestCase):
+    """Compara la cola de Dial contra un diccionario de prioridades con
+    operaciones aleatorias que respetan la monotonía, con muchas
+    prioridades repetidas y entradas viejas en los buckets."""
+
+    def probar(self, peso_maximo, capacidad, semilla):
+        """Aplica operaciones aleatorias a la cola y a la referencia, y
+        verifica que coincidan después de cada una."""
+        azar = random.Random(semilla)
+        cola = ColaBuckets(peso_maximo, capacidad)
+        referencia = {}
+        ultimo = 0
+        desencolados = []
+        for _ in range(OPERACIONES):
+            operacion = azar.random()
+            dato, valor = azar.randrange(100), ultimo + azar.randint(0, peso_maximo)
+            if operacion < 0.3:
+                if dato in referencia:
+                    cola.actualizar_prioridad(dato, valor)
+                else:
+                    cola.encolar(dato, valor)
+                referencia[dato] = valor
+            elif operacion < 0.6:
+                cambia = dato not in referencia or valor < referencia[dato]
+                self.assertEqual(cola.encolar_o_actualizar(dato, valor), cambia)
+                if cambia:
+                    referencia[dato] = valor
+            elif referencia:
+                esperados = minimos(referencia)
+                self.assertEqual(cola.prioridad_minima(), min(referencia.values()))
+                self.assertIn(cola.ver_minimo(), esperados)
+                dato = cola.desencolar()
+                self.assertIn(dato, esperados)
+                ultimo = referencia.pop(dato)
+                desencolados.append(ultimo)
+            self.assertEqual(len(cola), len(referencia))
+            for dato, valor in referencia.items():
+                self.assertIn(dato, cola)
+                self.assertEqual(cola.prioridad(dato), valor)
+        while referencia:
+            dato = cola.desencolar()
+            self.assertIn(dato, minimos(referencia))
+            desencolados.append(referencia.pop(dato))
+        self.assertTrue(cola.esta_vacio())
+        self.assertEqual(desencolados, sorted(desencolados))
+
+    def test_aleatorio(self):
+        for peso_maximo in (0, 1, 5, 30):
+            for semilla in range(20):
+                with self.subTest(peso_maximo=peso_maximo, semilla=semilla):
+                    self.probar(peso_maximo, 100 if semilla % 2 else None, semilla)
+
+    def test_empates(self):
+        cola = ColaBuckets(3, 10)
+        for dato in range(10):
+            cola.encolar(dato, 2)
+        # Las entradas viejas de los datos actualizados quedan en el
+        # bucket 2 y no deben devolverse otra vez
+        cola.actualizar_prioridad(4, 3)
+        cola.encolar_o_actualizar(7, 0)
+        cola.actualizar_prioridad(4, 2)
+        self.assertEqual(cola.desencolar(), 7)
+        empatados = {cola.desencolar() for _ in range(9)}
+        self.assertEqual(empatados, set(range(10)) - {7})
+        self.assertTrue(cola.esta_vacio())
+        self.assertRaises(ValueError, cola.desencolar)
+
+    def test_vuelta_circular(self):
+        cola = ColaBuckets(2)
+        orden = []
+        cola.encolar("a", 0)
+        for valor, dato in enumerate("bcdefg", 1):
+            orden.append(cola.desencolar())
+            cola.encolar(dato, valor + 1)
+            cola.encolar_o_actualizar(dato, valor)
+        orden.append(cola.desencolar())
+        self.assertEqual(orden, list("abcdefg"))
+
+    def test_fuera_de_rango(self):
+        cola = ColaBuckets(2)
+        cola.encolar("a", 5)
+        self.assertRaises(ValueError, cola.encolar, "b", 8)
+        self.assertRaises(ValueError, cola.encolar, "b", 4)
+        self.assertRaises(ValueError, ColaBuckets, -1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import random
+import tempfile
+import unittest
+import biblioteca as b
+from flycombi import cargar_red
+from instantanea import guardar_instantanea, cargar_instantanea
+
+def escribir_red(directorio, azar, ciudades, aeropuertos, vuelos):
+    """Escribe en el directorio los archivos de aeropuertos y de vuelos
+    de una red aleatoria, y devuelve sus rutas."""
+    ruta_aeropuertos = os.path.join(directorio, "aeropuertos.csv")
+    ruta_vuelos = os.path.join(directorio, "vuelos.csv")
+    with open(ruta_aeropuertos, "w") as archivo:
+        for i in range(aeropuertos):
+            archivo.write("C{},A{},{:.4f},{:.4f}\n".format(
+                azar.randrange(ciudades), i, azar.uniform(-90, 90), azar.uniform(-180, 180)))
+    pares = set()
+    with open(ruta_vuelos, "w") as archivo:
+        for _ in range(vuelos):
+            a, c = azar.sample(range(aeropuertos), 2)
+            if (a, c) in pares or (c, a) in pares:
+                continue
+            pares.add((a, c))
+            archivo.write("A{},A{},{},{},{}\n".format(
+                a, c, azar.randint(1, 50), azar.randint(1, 500), azar.randint(1, 30)))
+    return ruta_aeropuertos, ruta_vuelos
+
+class TestInstantanea(unittest.TestCase):
+    """Guarda una red cargada desde CSV, la vuelve a cargar desde la
+    instantánea y verifica que sea la misma red, y que se rechace si los
+    archivos de origen cambian después de generarla."""
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+        self.rutas = escribir_red(self.directorio, random.Random(2), 10, 40, 120)
+        self.instantanea = os.path.join(self.directorio, "red.snap")
+        self.grafo, self.ciudades = cargar_red(*self.rutas)
+        guardar_instantanea(self.grafo, self.ciudades, self.instantanea, self.rutas)
+
+    def test_ida_y_vuelta(self):
+        grafo, ciudades = cargar_instantanea(self.instantanea)
+        self.assertEqual(ciudades, self.ciudades)
+        self.assertEqual(list(grafo), list(self.grafo))
+        self.assertEqual(grafo.es_dirigido, self.grafo.es_dirigido)
+        for v in self.grafo:
+            self.assertEqual(grafo.obtener_dato(v), self.grafo.obtener_dato(v))
+            self.assertEqual(grafo.obtener_adyacentes(v), self.grafo.obtener_adyacentes(v))
+        azar = random.Random(5)
+        nombres = sorted(ciudades)
+        for _ in range(20):
+            origen, destino = azar.sample(nombres, 2)
+            for peso in (None, 0, 1):
+                self.assertEqual(
+                    b.camino_minimo_multiple(grafo, ciudades[origen], ciudades[destino], peso),
+                    b.camino_minimo_multiple(self.grafo, self.ciudades[origen],
+                                             self.ciudades[destino], peso))
+
+    def test_fuente_modificada(self):
+        estado = os.stat(self.rutas[1])
+        os.utime(self.rutas[1], ns=(estado.st_atime_ns, estado.st_mtime_ns + 10 ** 9))
+        with self.assertRaises(ValueError):
+            cargar_instantanea(self.instantanea)
+
+    def test_fuente_con_otro_tamanio(self):
+        estado = os.stat(self.rutas[0])
+        with open(self.rutas[0], "a") as archivo:
+            archivo.write("C0,A99,0.0,0.0\n")
+        # Aunque la fecha de modificación quede igual, cambió el tamaño
+        os.utime(self.rutas[0], ns=(estado.st_atime_ns, estado.st_mtime_ns))
+        with self.assertRaises(ValueError):
+            cargar_instantanea(self.instantanea)
+
+    def test_fuente_borrada(self):
+        os.remove(self.rutas[1])
+        grafo, _ = cargar_instantanea(self.instantanea)
+        self.assertEqual(list(grafo), list(self.grafo))
+
+    def test_archivo_invalido(self):
+        with open(self.rutas[0], "rb") as origen, open(self.instantanea, "wb") as destino:
+            destino.write(origen.read())
+        with self.assertRaises(ValueError):
+            cargar_instantanea(self.instantanea)
+
+if __name__ == "__main__":
+    unittest.main()
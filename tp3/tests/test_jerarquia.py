@@ -0,0 +1,112 @@
+import os
+import random
+import tempfile
+import unittest
+from jerarquia import construir_jerarquia, guardar_jerarquia, cargar_jerarquia, ENCABEZADO
+from util import grafo_aleatorio, distancia_referencia, largo_camino, INFINITO
+
+class TestJerarquia(unittest.TestCase):
+    """Compara las distancias de la jerarquía de contracciones con las
+    de Dijkstra en grafos aleatorios chicos, ralos (casi todo se
+    contrae), intermedios (las búsquedas pasan de la parte contraída al
+    núcleo) y densos (casi todo queda en el núcleo)."""
+
+    def probar(self, n, m, peso_maximo, semilla):
+        """Construye la jerarquía de un grafo aleatorio y compara sus
+        caminos con la referencia para pares de conjuntos aleatorios."""
+        azar = random.Random(semilla)
+        grafo = grafo_aleatorio(azar, n, m, peso_maximo)
+        claves = list(grafo)
+        peso = azar.randrange(3)
+        jerarquia = construir_jerarquia(grafo, peso)
+        for _ in range(30):
+            origenes = azar.sample(claves, azar.randint(1, 3))
+            destinos = azar.sample(claves, azar.randint(1, 3))
+            esperada = distancia_referencia(grafo, origenes, destinos, peso)
+            camino, distancia = jerarquia.camino_minimo(origenes, destinos)
+            self.assertEqual(distancia, esperada)
+            if camino is None:
+                self.assertEqual(esperada, INFINITO)
+            else:
+                self.assertIn(camino[0], origenes)
+                self.assertIn(camino[-1], destinos)
+                self.assertEqual(largo_camino(self, grafo, camino, peso), distancia)
+
+    def test_ralo(self):
+        for semilla in range(15):
+            with self.subTest(semilla=semilla):
+                self.probar(40, 60, 10, semilla)
+
+    def test_nucleo_parcial(self):
+        for semilla in range(10):
+            with self.subTest(semilla=semilla):
+                self.probar(60, 200, 10, semilla)
+
+    def test_denso(self):
+        for semilla in range(10):
+            with self.subTest(semilla=semilla):
+                self.probar(30, 200, 50, semilla)
+
+    def test_componentes(self):
+        for semilla in range(10):
+            with self.subTest(semilla=semilla):
+                self.probar(40, 25, 5, semilla)
+
+    def test_guardar_y_cargar(self):
+        azar = random.Random(0)
+        grafo = grafo_aleatorio(azar, 40, 100, 20)
+        jerarquia = construir_jerarquia(grafo, 1)
+        descriptor, ruta = tempfile.mkstemp()
+        os.close(descriptor)
+        self.addCleanup(os.remove, ruta)
+        guardar_jerarquia(jerarquia, ruta)
+        cargada = cargar_jerarquia(ruta, grafo)
+        claves = list(grafo)
+        for _ in range(30):
+            origen, destino = azar.sample(claves, 2)
+            self.assertEqual(cargada.camino_minimo([origen], [destino]),
+                             jerarquia.camino_minimo([origen], [destino]))
+        # Cambiar el peso de una arista invalida la jerarquía guardada
+        v = claves[0]
+        w = next(iter(grafo.obtener_adyacentes(v)))
+        grafo.agregar_arista(v, w, (1000, 1000, 1000))
+        self.assertRaises(ValueError, cargar_jerarquia, ruta, grafo)
+
+    def test_archivo_danado(self):
+        # Ninguna corrupción del archivo debe escapar como otro error
+        azar = random.Random(1)
+        grafo = grafo_aleatorio(azar, 30, 60, 20)
+        descriptor, ruta = tempfile.mkstemp()
+        os.close(descriptor)
+        self.addCleanup(os.remove, ruta)
+        guardar_jerarquia(construir_jerarquia(grafo, 0), ruta)
+        with open(ruta, "rb") as archivo:
+            original = archivo.read()
+        encabezado = list(ENCABEZADO.unpack(original[:ENCABEZADO.size]))
+        danados = [original[:largo] for largo in (0, 10, ENCABEZADO.size, len(original) // 2, len(original) - 1)]
+        # Peso fuera de las columnas y cantidades negativas o enormes
+        for campo, valor in ((2, 3), (2, -1), (3, -1), (4, -5), (4, 2 ** 40)):
+            campos = list(encabezado)
+            campos[campo] = valor
+            danados.append(ENCABEZADO.pack(*campos) + original[ENCABEZADO.size:])
+        # Bytes al azar en los arreglos y en las claves
+        for _ in range(30):
+            datos = bytearray(original)
+            for _ in range(4):
+                datos[azar.randrange(ENCABEZADO.size, len(datos))] = azar.randrange(256)
+            danados.append(bytes(datos))
+        for i, datos in enumerate(danados):
+            with open(ruta, "wb") as archivo:
+                archivo.write(datos)
+            with self.subTest(i=i):
+                try:
+                    jerarquia = cargar_jerarquia(ruta, grafo)
+                except ValueError:
+                    continue
+                # Si la corrupción no se detecta, las consultas no fallan
+                claves = list(grafo)
+                for _ in range(10):
+                    jerarquia.camino_minimo(azar.sample(claves, 1), azar.sample(claves, 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import pickle
+import random
+import unittest
+import biblioteca as b
+from landmarks import Landmarks, LEJANOS, GRADO
+from util import grafo_aleatorio, distancia_referencia, largo_camino, INFINITO
+
+def elegidos(landmarks):
+    """Devuelve la lista de claves de los landmarks: el vértice a
+    distancia 0 de cada arreglo de distancias."""
+    return [landmarks.grafo.clave(list(distancias).index(0)) for distancias in landmarks.distancias]
+
+class TestLandmarks(unittest.TestCase):
+    """Compara A* con landmarks con la referencia en grafos aleatorios
+    chicos, incluso con vértices aislados y varias componentes, y
+    verifica la elección de los landmarks."""
+
+    def test_distancias(self):
+        azar = random.Random(13)
+        for prueba in range(40):
+            n = azar.randint(2, 40)
+            grafo = grafo_aleatorio(azar, n, azar.randint(0, 2 * n), 20)
+            peso = azar.randrange(3)
+            metodo = LEJANOS if prueba % 4 else GRADO
+            landmarks = Landmarks(grafo, peso, azar.randint(1, 6), metodo)
+            claves = list(grafo)
+            for _ in range(15):
+                origenes = azar.sample(claves, azar.randint(1, min(3, n)))
+                destinos = azar.sample(claves, azar.randint(1, min(3, n)))
+                camino, distancia = b.obtener_camino_minimo(grafo, peso, origenes[0], destinos[0], landmarks)
+                with self.subTest(prueba=prueba):
+                    self.assertEqual(distancia, distancia_referencia(grafo, origenes[:1], destinos[:1], peso))
+                    camino, distancia = landmarks.camino_minimo(origenes, destinos)
+                    self.assertEqual(distancia, distancia_referencia(grafo, origenes, destinos, peso))
+                    if camino is None:
+                        self.assertEqual(distancia, INFINITO)
+                    else:
+                        self.assertIn(camino[0], origenes)
+                        self.assertIn(camino[-1], destinos)
+                        self.assertEqual(largo_camino(self, grafo, camino, peso), distancia)
+
+    def test_vertices_aislados(self):
+        # Los aeropuertos sin vuelos no deben recibir landmarks mientras
+        # haya vértices de la componente principal sin elegir
+        for semilla in range(10):
+            azar = random.Random(semilla)
+            grafo = grafo_aleatorio(azar, 8, 30, 10)
+            for i in range(20):
+                grafo.agregar_vertice("A{}".format(i), None)
+            claves = elegidos(Landmarks(grafo, 0, 4))
+            self.assertEqual(len(set(claves)), 4)
+            self.assertTrue(all(clave.startswith("V") for clave in claves))
+
+    def test_componentes(self):
+        # Una componente grande y una chica, y un vértice aislado: los
+        # landmarks van a la grande hasta agotarla, y después a la de
+        # mayor grado entre las no alcanzadas
+        grafo = grafo_aleatorio(random.Random(0), 0, 0)
+        for v in range(9):
+            grafo.agregar_vertice(v, None)
+        for v, w in ((0, 1), (1, 2), (2, 3), (0, 3), (0, 2), (5, 6), (6, 7)):
+            grafo.agregar_arista(v, w, (1, 1, 1))
+        claves = elegidos(Landmarks(grafo, 0, 6))
+        self.assertEqual(sorted(claves[:4]), [0, 1, 2, 3])
+        self.assertEqual(claves[4], 6)
+        self.assertEqual(len(set(claves)), 6)
+        self.assertNotIn(8, claves[:6])
+
+    def test_otro_peso(self):
+        grafo = grafo_aleatorio(random.Random(1), 10, 20)
+        landmarks = Landmarks(grafo, 0, 2)
+        self.assertRaises(ValueError, b.obtener_camino_minimo, grafo, 1, "V0", "V1", landmarks)
+
+    def test_serializar(self):
+        # Se envían entre procesos sin el grafo, que se asigna al recibirlos
+        azar = random.Random(2)
+        grafo = grafo_aleatorio(azar, 30, 60, 10)
+        landmarks = Landmarks(grafo, 1, 3)
+        copia = pickle.loads(pickle.dumps(landmarks))
+        self.assertIsNone(copia.grafo)
+        copia.usar_grafo(grafo)
+        claves = list(grafo)
+        for _ in range(20):
+            origenes, destinos = azar.sample(claves, 2), azar.sample(claves, 2)
+            self.assertEqual(copia.camino_minimo(origenes, destinos),
+                             landmarks.camino_minimo(origenes, destinos))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+import biblioteca as b
+import tramos
+from tramos import caminos_por_tramos
+from grafo import Grafo
+from grafo_compacto import GrafoCompacto
+from util import grafo_aleatorio, distancia_referencia, largo_camino, INFINITO
+
+def grafo_aciclico(azar, n, m):
+    """Devuelve un grafo dirigido acíclico con n vértices: las aristas
+    van siempre hacia adelante en un orden al azar."""
+    orden = list(range(n))
+    azar.shuffle(orden)
+    grafo = Grafo(dirigido=True)
+    for v in range(n):
+        grafo.agregar_vertice(v, None)
+    for _ in range(m):
+        i, j = sorted(azar.sample(range(n), 2))
+        grafo.agregar_arista(orden[i], orden[j], None)
+    return grafo
+
+class TestOrdenTopologico(unittest.TestCase):
+    """Verifica el orden de Kahn en grafos acíclicos aleatorios y que se
+    rechacen los grafos con ciclos."""
+
+    def verificar(self, grafo, orden):
+        """Verifica que el orden tenga cada vértice una vez y que toda
+        arista vaya hacia adelante."""
+        self.assertEqual(sorted(orden), sorted(grafo))
+        posiciones = {v: i for i, v in enumerate(orden)}
+        for v in grafo:
+            for w in grafo.obtener_adyacentes(v):
+                self.assertLess(posiciones[v], posiciones[w])
+
+    def test_aciclicos(self):
+        azar = random.Random(16)
+        for prueba in range(50):
+            n = azar.randint(2, 30)
+            grafo = grafo_aciclico(azar, n, azar.randint(0, 3 * n))
+            self.verificar(grafo, b.orden_topologico(grafo))
+
+    def test_ciclo(self):
+        azar = random.Random(17)
+        for _ in range(20):
+            grafo = grafo_aciclico(azar, 10, 20)
+            orden = b.orden_topologico(grafo)
+            # Una arista hacia adelante y otra hacia atrás cierran un ciclo
+            i, j = sorted(azar.sample(range(10), 2))
+            grafo.agregar_arista(orden[i], orden[j], None)
+            grafo.agregar_arista(orden[j], orden[i], None)
+            self.assertRaises(ValueError, b.orden_topologico, grafo)
+
+    def test_cadena_larga(self):
+        # El algoritmo es iterativo: no depende del límite de recursión
+        grafo = Grafo(dirigido=True)
+        n = 20000
+        for v in range(n):
+            grafo.agregar_vertice(v, None)
+        for v in range(n - 1):
+            grafo.agregar_arista(v, v + 1, None)
+        self.assertEqual(b.orden_topologico(grafo), list(range(n)))
+
+class TestCaminosPorTramos(unittest.TestCase):
+    """Compara los caminos de cada tramo, calculados en lote (en un
+    proceso y repartidos entre varios), con la referencia."""
+
+    def probar(self, procesos):
+        azar = random.Random(18)
+        grafo = GrafoCompacto.desde_grafo(grafo_aleatorio(azar, 60, 100, 1))
+        claves = list(grafo)
+        ciudades = [azar.sample(claves, azar.randint(1, 3)) for _ in range(8)]
+        # Tramos repetidos y que comparten orígenes, como en un itinerario
+        lista = [(azar.choice(ciudades), azar.choice(ciudades)) for _ in range(40)]
+        for peso in (None, 0):
+            caminos = caminos_por_tramos(grafo, lista, peso, procesos)
+            self.assertEqual(len(caminos), len(lista))
+            for (origenes, destinos), camino in zip(lista, caminos):
+                esperada = distancia_referencia(grafo, origenes, destinos, peso)
+                if esperada == INFINITO:
+                    self.assertIsNone(camino)
+                    continue
+                self.assertIn(camino[0], origenes)
+                self.assertIn(camino[-1], destinos)
+                self.assertEqual(largo_camino(self, grafo, camino, peso), esperada)
+
+    def test_secuencial(self):
+        self.probar(1)
+
+    def test_paralelo(self):
+        anterior = tramos.MINIMO_PARALELO
+        tramos.MINIMO_PARALELO = 1
+        self.addCleanup(setattr, tramos, "MINIMO_PARALELO", anterior)
+        self.probar(2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+from itertools import permutations
+from viajes import buscar_viaje, PresupuestoAgotado, Bitset
+from grafo_compacto import GrafoCompacto
+from util import grafo_aleatorio
+
+def existe_viaje(grafo, origen, n):
+    """Prueba todas las secuencias de n - 1 vértices distintos del
+    origen y devuelve True si alguna forma, con él, un ciclo."""
+    otros = [v for v in grafo if v != origen]
+    for intermedios in permutations(otros, n - 1):
+        recorrido = [origen, *intermedios, origen]
+        if all(w in grafo.obtener_adyacentes(v) for v, w in zip(recorrido, recorrido[1:])):
+            return True
+    return False
+
+class TestViajes(unittest.TestCase):
+    """Compara la búsqueda de viajes con la fuerza bruta en grafos
+    chicos, dirigidos y no dirigidos."""
+
+    def verificar_viaje(self, grafo, origen, n, viaje):
+        """Verifica que el viaje visite n lugares distintos y vuelva al
+        origen por aristas del grafo."""
+        self.assertEqual(viaje[0], origen)
+        self.assertEqual(viaje[-1], origen)
+        self.assertEqual(len(set(viaje[:-1])), n)
+        self.assertEqual(len(viaje), n + 1)
+        for v, w in zip(viaje, viaje[1:]):
+            self.assertIn(w, grafo.obtener_adyacentes(v))
+
+    def test_fuerza_bruta(self):
+        azar = random.Random(15)
+        for prueba in range(60):
+            vertices = azar.randint(2, 7)
+            grafo = grafo_aleatorio(azar, vertices, azar.randint(vertices, 3 * vertices), 1,
+                                    prueba % 2 == 0)
+            if prueba % 3 == 0:
+                grafo = GrafoCompacto.desde_grafo(grafo)
+            origen = azar.choice(list(grafo))
+            for n in range(2, vertices + 2):
+                with self.subTest(prueba=prueba, n=n):
+                    viaje = buscar_viaje(grafo, origen, n)
+                    if existe_viaje(grafo, origen, n):
+                        self.verificar_viaje(grafo, origen, n, viaje)
+                    else:
+                        self.assertIsNone(viaje)
+
+    def test_un_lugar(self):
+        grafo = grafo_aleatorio(random.Random(0), 3, 3, 1, dirigido=True)
+        self.assertIsNone(buscar_viaje(grafo, "V0", 1))
+        grafo.agregar_arista("V0", "V0", (1, 1, 1))
+        self.assertEqual(buscar_viaje(grafo, "V0", 1), ["V0", "V0"])
+        self.assertIsNone(buscar_viaje(grafo, "V0", 0))
+
+    def test_presupuesto(self):
+        # Un camino sin ciclos de largo n obliga a recorrerlo entero
+        # antes de descartarlo
+        grafo = grafo_aleatorio(random.Random(0), 0, 0)
+        for i in range(12):
+            grafo.agregar_vertice(i, None)
+        for i in range(11):
+            grafo.agregar_arista(i, i + 1, (1, 1, 1))
+        grafo.agregar_arista(11, 0, (1, 1, 1))
+        self.assertRaises(PresupuestoAgotado, buscar_viaje, grafo, 0, 12, max_nodos=5)
+        self.assertEqual(len(buscar_viaje(grafo, 0, 12, max_nodos=100)), 13)
+        self.assertRaises(PresupuestoAgotado, buscar_viaje, grafo, 0, 12, max_nodos=0)
+
+class TestBitset(unittest.TestCase):
+    """Compara el bitset con un set."""
+
+    def test_aleatorio(self):
+        azar = random.Random(1)
+        bitset, referencia = Bitset(100), set()
+        for _ in range(500):
+            x = azar.randrange(100)
+            if azar.random() < 0.5:
+                bitset.agregar(x)
+                referencia.add(x)
+            else:
+                bitset.quitar(x)
+                referencia.discard(x)
+            self.assertEqual([y for y in range(100) if y in bitset], sorted(referencia))
+
+if __name__ == "__main__":
+    unittest.main()
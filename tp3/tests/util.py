@@ -0,0 +1,57 @@
+import heapq
+from grafo import Grafo
+
+INFINITO = float("inf")
+
+def grafo_aleatorio(azar, n, m, peso_maximo=10, dirigido=False):
+    """Recibe un generador de números aleatorios y devuelve un grafo con
+    n vértices ("V0" a "Vn-1"), a lo sumo m aristas sin repetir y tres
+    pesos enteros entre 1 y peso_maximo en cada una. Si n es chico
+    respecto de m hay muchos caminos mínimos empatados, y si m es chico
+    respecto de n el grafo queda en varias componentes."""
+    grafo = Grafo(dirigido)
+    for v in range(n):
+        grafo.agregar_vertice("V{}".format(v), None)
+    if n < 2:
+        return grafo
+    aristas = set()
+    for _ in range(m):
+        a, b = azar.sample(range(n), 2)
+        if (a, b) in aristas or (not dirigido and (b, a) in aristas):
+            continue
+        aristas.add((a, b))
+        pesos = tuple(azar.randint(1, peso_maximo) for _ in range(3))
+        grafo.agregar_arista("V{}".format(a), "V{}".format(b), pesos)
+    return grafo
+
+def distancias_referencia(grafo, origenes, peso=None):
+    """Dijkstra con heapq desde todos los orígenes a la vez, sobre la
+    API de Grafo. Si no se recibe un peso, cada arista cuenta 1.
+    Devuelve el diccionario de distancias de los vértices alcanzados."""
+    distancias = {v: 0 for v in origenes}
+    heap = [(0, v) for v in origenes]
+    while heap:
+        distancia, v = heapq.heappop(heap)
+        if distancia > distancias[v]:
+            continue
+        for w, pesos in grafo.obtener_adyacentes(v).items():
+            nueva = distancia + (1 if peso is None else pesos[peso])
+            if nueva < distancias.get(w, INFINITO):
+                distancias[w] = nueva
+                heapq.heappush(heap, (nueva, w))
+    return distancias
+
+def distancia_referencia(grafo, origenes, destinos, peso=None):
+    """Devuelve la distancia mínima entre algún origen y algún destino,
+    o INFINITO si no hay camino."""
+    distancias = distancias_referencia(grafo, origenes, peso)
+    return min((distancias.get(v, INFINITO) for v in destinos), default=INFINITO)
+
+def largo_camino(prueba, grafo, camino, peso=None):
+    """Verifica con el TestCase recibido que el camino use aristas del
+    grafo y devuelve su largo."""
+    largo = 0
+    for v, w in zip(camino, camino[1:]):
+        prueba.assertIn(w, grafo.obtener_adyacentes(v))
+        largo += 1 if peso is None else grafo.obtener_peso_union(v, w)[peso]
+    return largo
@@ -0,0 +1,81 @@
+import os
+from biblioteca import camino_minimo_multiple, caminos_minimos_desde, reconstruir_camino
+from grafo_compacto import compactar
+from memoria_compartida import exportar_red, ejecutar_por_fuentes, unir
+
+# Cantidad mínima de búsquedas para repartirlas entre varios procesos
+MINIMO_PARALELO = 64
+
+def mejor_camino(distancias, padres, destinos):
+    """Recibe un árbol de caminos mínimos (distancias, padres) y una
+    lista de vértices destino, y devuelve el camino hasta el destino
+    más cercano, o None si ninguno fue alcanzado."""
+    mejor = None
+    for v in destinos:
+        if v not in distancias:
+            continue
+        if mejor is None or distancias[v] < distancias[mejor]:
+            mejor = v
+    if mejor is None:
+        return None
+    return reconstruir_camino(mejor, padres)
+
+def caminos_desde(grafo, origenes, grupos, peso=None):
+    """Recibe un grafo, una lista de vértices origen, una lista de
+    listas de vértices destino y opcionalmente un peso. Devuelve, para
+    cada lista de destinos, el mejor camino desde algún origen hasta
+    alguno de ellos (o None). Con una sola lista la búsqueda termina al
+    alcanzarla; con varias, se calcula una única vez el árbol completo."""
+    if len(grupos) == 1:
+        camino, _ = camino_minimo_multiple(grafo, origenes, grupos[0], peso)
+        return [camino]
+    distancias, padres = caminos_minimos_desde(grafo, origenes, peso)
+    return [mejor_camino(distancias, padres, destinos) for destinos in grupos]
+
+def _resolver(red, busquedas, peso):
+    """Tarea de ejecutar_por_fuentes: resuelve un bloque de búsquedas
+    (numero, origenes, grupos), con ids de vértices, sobre el grafo de
+    una RedCompartida. Devuelve un diccionario numero: caminos."""
+    grafo = red.grafo()
+    return {numero: caminos_desde(grafo, origenes, grupos, peso)
+            for numero, origenes, grupos in busquedas}
+
+def _en_paralelo(grafo, busquedas, peso, procesos):
+    """Resuelve las búsquedas (origenes, grupos, peso) repartiéndolas
+    entre los procesos, que acceden al grafo mediante memoria compartida
+    y trabajan con ids de vértices. Devuelve la lista de resultados de
+    caminos_desde, en el orden de las búsquedas."""
+    compacto = compactar(grafo)
+    por_ids = [(numero, [compacto.indice(v) for v in origenes],
+                [[compacto.indice(v) for v in destinos] for destinos in grupos])
+               for numero, (origenes, grupos, _) in enumerate(busquedas)]
+    with exportar_red(compacto) as red:
+        resultados = ejecutar_por_fuentes(red, _resolver, por_ids, unir, (peso,), procesos)
+    return [[None if camino is None else [compacto.clave(v) for v in camino]
+             for camino in resultados[numero]]
+            for numero in range(len(busquedas))]
+
+def caminos_por_tramos(grafo, tramos, peso=None, procesos=None):
+    """Recibe un grafo, una lista de tramos (origenes, destinos), cada
+    uno con listas de vértices, opcionalmente un peso y la cantidad de
+    procesos a utilizar (por defecto, uno por procesador). Devuelve la
+    lista con el mejor camino de cada tramo, o None si no tiene. Los
+    tramos que parten de los mismos orígenes comparten una búsqueda, y
+    si hay suficientes búsquedas se reparten entre los procesos, que
+    comparten el grafo mediante memoria compartida."""
+    grupos = {}
+    for i, (origenes, _) in enumerate(tramos):
+        grupos.setdefault(tuple(origenes), []).append(i)
+    busquedas = [(list(origenes), [tramos[i][1] for i in indices], peso)
+                 for origenes, indices in grupos.items()]
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    if procesos <= 1 or len(busquedas) < MINIMO_PARALELO:
+        resultados = [caminos_desde(grafo, *busqueda) for busqueda in busquedas]
+    else:
+        resultados = _en_paralelo(grafo, busquedas, peso, procesos)
+    caminos = [None] * len(tramos)
+    for indices, encontrados in zip(grupos.values(), resultados):
+        for i, camino in zip(indices, encontrados):
+            caminos[i] = camino
+    return caminos
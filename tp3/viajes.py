@@ -0,0 +1,100 @@
+import time
+import perfil
+from grafo_compacto import compactar
+from bfs import bfs_compacto
+
+# Cantidad de vértices expandidos entre cada control del tiempo
+PERIODO_CONTROL = 1024
+
+class PresupuestoAgotado(Exception):
+    """Se levanta cuando una búsqueda agota su presupuesto de tiempo o
+    de vértices sin encontrar una solución ni descartar que exista."""
+
+class Bitset:
+    """Conjunto de enteros 0 .. n - 1 representado con un bit por
+    elemento."""
+
+    def __init__(self, n):
+        """Constructor de la clase Bitset. Recibe la cantidad de
+        elementos posibles."""
+        self.bits = bytearray((n >> 3) + 1)
+
+    def agregar(self, x):
+        """Agrega x al conjunto."""
+        self.bits[x >> 3] |= 1 << (x & 7)
+
+    def quitar(self, x):
+        """Quita x del conjunto."""
+        self.bits[x >> 3] &= ~(1 << (x & 7))
+
+    def __contains__(self, x):
+        """Devuelve True si x pertenece al conjunto."""
+        return self.bits[x >> 3] >> (x & 7) & 1 == 1
+
+def _escalas_hasta(compacto, destino):
+    """Aplica un único bfs (sobre las aristas invertidas si el grafo es
+    dirigido) y devuelve un arreglo con la cantidad mínima de escalas
+    desde cada vértice hasta destino, o -1 si no lo alcanza."""
+    escalas, _, _, _ = bfs_compacto(compacto, [destino], invertido=True)
+    return escalas
+
+def buscar_viaje(grafo, origen, n, max_nodos=None, max_segundos=None):
+    """Recibe un grafo, la clave del vértice origen, un número entero n
+    y opcionalmente un presupuesto: la cantidad máxima de vértices a
+    expandir y los segundos disponibles. Busca, en profundidad y de
+    manera iterativa, un viaje que visita n lugares distintos y vuelve
+    a origen. Devuelve la lista de claves del viaje, o None si no
+    existe. Levanta PresupuestoAgotado si se termina el presupuesto
+    antes de saberlo."""
+    if n < 1:
+        return None
+    compacto = compactar(grafo)
+    inicio, destinos = compacto.inicio, compacto.destinos
+    s = compacto.indice(origen)
+    escalas = _escalas_hasta(compacto, s)
+    if n == 1:
+        return [origen, origen] if compacto.posicion_arista(s, s) != -1 else None
+    limite = None if max_segundos is None else time.monotonic() + max_segundos
+    visitados = Bitset(len(compacto))
+    visitados.agregar(s)
+
+    def candidatos(v, largo):
+        """Devuelve los vértices no visitados a los que conviene ir desde
+        v, estando en la posición largo del recorrido: los que todavía
+        pueden volver a origen con las escalas que quedan, empezando
+        por los de menor grado (regla de Warnsdorff)."""
+        restantes = n - largo
+        adyacentes = [w for w in destinos[inicio[v]:inicio[v + 1]]
+                      if w not in visitados and 0 <= escalas[w] <= restantes]
+        adyacentes.sort(key=compacto.grado)
+        return iter(adyacentes)
+
+    recorrido = [s]
+    pila = [candidatos(s, 1)]
+    nodos = 0
+    try:
+        while pila:
+            w = next(pila[-1], None)
+            if w is None:
+                pila.pop()
+                visitados.quitar(recorrido.pop())
+                continue
+            nodos += 1
+            if max_nodos is not None and nodos > max_nodos:
+                raise PresupuestoAgotado()
+            if limite is not None and nodos % PERIODO_CONTROL == 0 and time.monotonic() > limite:
+                raise PresupuestoAgotado()
+            recorrido.append(w)
+            visitados.agregar(w)
+            if len(recorrido) < n:
+                pila.append(candidatos(w, len(recorrido)))
+                continue
+            if compacto.posicion_arista(w, s) != -1:
+                recorrido.append(s)
+                return [compacto.clave(v) for v in recorrido]
+            recorrido.pop()
+            visitados.quitar(w)
+        return None
+    finally:
+        if perfil.activo:
+            perfil.contar(viaje_expandidos=nodos)